@@ -142,11 +142,11 @@ class PlayerWindow(QMainWindow):
         self.db_manager = DatabaseManager()
         self.story_manager = StoryManager()
         
-        # Connect signals
-        self.story_manager.variables.add_observer(self.on_variable_changed)
-
         # 3. UI Setup
         self._init_ui()
+
+        # Connect signals (after the HUD exists: subscriptions target its labels)
+        self._subscribe_to_variables()
         
         # 4. Sliding Menu (Overlay)
         # 4. Game Menu (Central Overlay)
@@ -449,26 +449,31 @@ class PlayerWindow(QMainWindow):
         self.scroll_choices.setWidget(self.choices_container)
         self.content_layout.addWidget(self.scroll_choices, 0) # Stretch 0 to let it adapt to content size, handled in refreshes
 
-    def on_variable_changed(self, name, value):
-        """Met à jour l'interface quand une variable change."""
-        if name in self.stat_labels:
-            self.stat_labels[name].setText(str(value))
-        elif name == "xp" or name == "level" or name == "xp_next":
-            self.update_xp_hud()
-        elif name == "max_health":
-             pass
-        elif name == "player_coordinates":
-            # We wait for 'location_text' for the display, but we can keep this for debug or fallback
-            pass
-        elif name == "location_text" or name.startswith("location_"):
-            self.update_location_label()
-        elif name == "active_quest_offer":
-            if value:
-                self.show_quest_offer(value)
-        elif name == "active_quests" or name == "completed_quests":
-            # State of quests changed, choices might need update (e.g. "Rendre la quête")
-            self.refresh_choices_only()
-
+    def _subscribe_to_variables(self):
+        """
+        Abonnements par variable : chaque partie du HUD ne reçoit que les
+        changements qui la concernent (une mise à jour de 'visit_counts'
+        ne réveille pas le HUD des stats). Les abonnements 'batch' ne
+        rafraîchissent qu'une fois par transaction.
+        """
+        variables = self.story_manager.variables
+        variables.subscribe(list(self.stat_labels), self._on_stat_changed)
+        variables.subscribe(["xp", "level", "xp_next"], lambda changes: self.update_xp_hud(), batch=True)
+        variables.subscribe("location_*", lambda changes: self.update_location_label(), batch=True)
+        variables.subscribe("active_quest_offer", self._on_quest_offer_changed)
+        # State of quests changed, choices might need update (e.g. "Rendre la quête")
+        variables.subscribe(["active_quests", "completed_quests"],
+                            lambda changes: self.refresh_choices_only(), batch=True)
+        variables.subscribe("*", self._on_variables_changed_menu, batch=True)
+
+    def _on_stat_changed(self, name, value):
+        self.stat_labels[name].setText(str(value))
+
+    def _on_quest_offer_changed(self, name, value):
+        if value:
+            self.show_quest_offer(value)
+
+    def _on_variables_changed_menu(self, changes):
         # Refresh menu if open
         if hasattr(self, 'game_menu') and self.game_menu.isVisible():
             self.game_menu.refresh_current_view()
@@ -1,6 +1,8 @@
 import json
 import os
 
+from src.core.graph_analysis import iter_target_slots
+
 PROJECT_FILE = "test.json"
 
 def migrate_project():
@@ -28,47 +30,16 @@ def migrate_project():
 
     # 2. Iterate and Update
     for node_data in nodes_list:
-        content = node_data.get("content", {})
-        choices = content.get("choices", [])
-        
-        for choice in choices:
-            target = choice.get("target_node_id")
-            
+        # Choix, remplacements et macros à cible (goto, button, movePnj...) : mêmes emplacements que l'analyse du graphe
+        for kind, container, key in iter_target_slots(node_data.get("content", {}), node_data.get("logic", {})):
+            target = container[key]
             if target in title_to_id:
                 new_id = title_to_id[target]
                 if new_id != target:
-                    print(f"Migrating choice in '{node_data.get('title')}' : '{target}' -> '{new_id}'")
-                    choice["target_node_id"] = new_id
-                    updated_count += 1
-            
-            # Also check replacement data if any
-            rep_data = choice.get("replacement_data", {})
-            rep_target = rep_data.get("target_node_id")
-            if rep_target in title_to_id:
-                new_id = title_to_id[rep_target]
-                if new_id != rep_target:
-                    print(f"Migrating replacement in '{node_data.get('title')}' : '{rep_target}' -> '{new_id}'")
-                    rep_data["target_node_id"] = new_id
+                    print(f"Migrating {kind} in '{node_data.get('title')}' : '{target}' -> '{new_id}'")
+                    container[key] = new_id
                     updated_count += 1
 
-        # 3. Update Macros (spawn, movePnj, goto, button)
-        logic = node_data.get("logic", {})
-        events = logic.get("on_enter", [])
-        
-        # Helper to update events recursively if needed (though usually flat)
-        for event in events:
-            params = event.get("parameters", {})
-            macro_type = event.get("type")
-            
-            if macro_type in ["spawn", "movePnj", "goto", "button"]:
-                target = params.get("target")
-                if target in title_to_id:
-                    new_id = title_to_id[target]
-                    if new_id != target:
-                        print(f"Migrating macro '{macro_type}' in '{node_data.get('title')}' : '{target}' -> '{new_id}'")
-                        params["target"] = new_id
-                        updated_count += 1
-
     if updated_count > 0:
         with open(PROJECT_FILE, "w", encoding="utf-8") as f:
             json.dump(data, f, indent=4)
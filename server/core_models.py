@@ -1,3 +1,5 @@
+import heapq
+import math
 import uuid
 import logging
 from enum import Enum
@@ -188,17 +190,139 @@ class Location(BaseModel):
         )
 
 
+class TravelRoute(BaseModel):
+    """Itinéraire calculé par WorldGraph : étapes (départ inclus) et durée de chaque tronçon."""
+    path: List[str]
+    leg_times: List[int] = Field(default_factory=list)
+
+    @property
+    def total_seconds(self) -> int:
+        return sum(self.leg_times)
+
+
+class LocationGrid:
+    """
+    Index spatial d'un continent : grille uniforme de cellules carrées.
+    Une requête ne lit que les cellules proches du point (anneaux de plus en
+    plus larges) au lieu de mesurer la distance à tous les lieux du monde.
+    Les égalités de distance sont départagées par l'ordre d'ajout des lieux,
+    comme l'ancien parcours linéaire.
+    """
+
+    # Nombre moyen de lieux visé par cellule
+    TARGET_PER_CELL = 4
+    # Au-delà de (cellules occupées x ce facteur) cellules lues, parcours linéaire
+    MAX_SCAN_FACTOR = 4
+
+    def __init__(self, locations: List[Location]):
+        self.locations = list(locations)
+        self.cells: Dict[Tuple[int, int], List[int]] = {}
+        self.cell_size = self._auto_cell_size(self.locations)
+
+        for rank, loc in enumerate(self.locations):
+            self.cells.setdefault(self._cell(loc.x, loc.y), []).append(rank)
+
+        # Emprise en cellules : au-delà, les anneaux sont vides
+        keys = list(self.cells) or [(0, 0)]
+        self.min_cell = (min(k[0] for k in keys), min(k[1] for k in keys))
+        self.max_cell = (max(k[0] for k in keys), max(k[1] for k in keys))
+
+    @classmethod
+    def _auto_cell_size(cls, locations: List[Location]) -> float:
+        if len(locations) < 2:
+            return 1.0
+        xs = [loc.x for loc in locations]
+        ys = [loc.y for loc in locations]
+        width, height = max(xs) - min(xs), max(ys) - min(ys)
+        span = max(width, height)
+        if span <= 0:
+            # Lieux tous confondus : une seule cellule
+            return 1.0
+        size = (width * height * cls.TARGET_PER_CELL / len(locations)) ** 0.5
+        # Lieux alignés : on ne découpe que la plus grande dimension
+        return max(size, span * cls.TARGET_PER_CELL / len(locations))
+
+    def _cell(self, x: float, y: float) -> Tuple[int, int]:
+        return math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+
+    def nearest(self, x: float, y: float, k: int = 1,
+                max_distance: Optional[float] = None) -> List[Tuple[Location, float]]:
+        """Les `k` lieux les plus proches, triés par distance : [(lieu, distance), ...]."""
+        if not self.locations or k <= 0:
+            return []
+        ci, cj = self._cell(x, y)
+        max_ring = max(abs(ci - self.min_cell[0]), abs(ci - self.max_cell[0]),
+                       abs(cj - self.min_cell[1]), abs(cj - self.max_cell[1]))
+        scan_limit = self.MAX_SCAN_FACTOR * len(self.cells) + 9
+        found = []
+        ring = 0
+        while ring <= max_ring:
+            if (2 * ring + 1) ** 2 > scan_limit:
+                # Point loin de la grille (ou continent minuscule) : parcours linéaire
+                return self._linear_nearest(x, y, k, max_distance)
+            for key in self._ring_cells(ci, cj, ring):
+                for rank in self.cells.get(key, ()):
+                    loc = self.locations[rank]
+                    # Distance euclidienne simple
+                    dist = ((loc.x - x) ** 2 + (loc.y - y) ** 2) ** 0.5
+                    if max_distance is None or dist <= max_distance:
+                        found.append((dist, rank))
+            # Tout lieu hors des anneaux 0..ring est à plus de ring * cell_size
+            if len(found) >= k:
+                found.sort()
+                if found[k - 1][0] < ring * self.cell_size:
+                    break
+            if max_distance is not None and ring * self.cell_size > max_distance:
+                break
+            ring += 1
+        found.sort()
+        return [(self.locations[rank], dist) for dist, rank in found[:k]]
+
+    def _linear_nearest(self, x: float, y: float, k: int,
+                        max_distance: Optional[float]) -> List[Tuple[Location, float]]:
+        found = []
+        for rank, loc in enumerate(self.locations):
+            dist = ((loc.x - x) ** 2 + (loc.y - y) ** 2) ** 0.5
+            if max_distance is None or dist <= max_distance:
+                found.append((dist, rank))
+        found.sort()
+        return [(self.locations[rank], dist) for dist, rank in found[:k]]
+
+    @staticmethod
+    def _ring_cells(ci: int, cj: int, ring: int):
+        if ring == 0:
+            yield ci, cj
+            return
+        for i in range(ci - ring, ci + ring + 1):
+            yield i, cj - ring
+            yield i, cj + ring
+        for j in range(cj - ring + 1, cj + ring):
+            yield ci - ring, j
+            yield ci + ring, j
+
+
 class WorldGraph:
     """
     La Vérité Terrain de la géographie du jeu.
     Gère le pathfinding (recherche de chemin) et la validation des déplacements.
     """
 
+    # Nombre maximal d'itinéraires (départ, arrivée) gardés en cache
+    ROUTE_CACHE_SIZE = 4096
+
     def __init__(self):
         self.locations: Dict[str, Location] = {}
+        # Continent (en minuscules) -> LocationGrid ; None = à reconstruire
+        self._spatial_index: Optional[Dict[str, LocationGrid]] = None
+        # Caches du pathfinding (vidés par invalidate_routes)
+        self._routes: Dict[Tuple[str, str], Optional[Tuple[Tuple[str, ...], Tuple[int, ...]]]] = {}
+        self._trees: Dict[str, Tuple[Dict[str, int], Dict[str, str]]] = {}  # départ -> (durées, prédécesseurs)
+        self._heuristic_scale: Optional[float] = None
 
     def add_location(self, loc: Location):
         self.locations[loc.loc_id] = loc
+        self._spatial_index = None
+        self.invalidate_routes()
 
     def get_location(self, loc_id: str) -> Optional[Location]:
         return self.locations.get(loc_id)
@@ -216,6 +340,27 @@ class WorldGraph:
             return conn.travel_time_seconds
         return None
 
+    def add_connection(self, start_id: str, end_id: str, time_sec: int,
+                       locked: bool = False, key_id: str = None) -> bool:
+        """Ajoute (ou remplace) la route start_id -> end_id. Retourne False si le départ est inconnu."""
+        loc = self.locations.get(start_id)
+        if not loc:
+            return False
+        loc.add_connection(end_id, time_sec, locked=locked, key_id=key_id)
+        self.invalidate_routes()
+        return True
+
+    def set_connection_locked(self, start_id: str, end_id: str, locked: bool) -> bool:
+        """Verrouille / déverrouille un passage sans condition de clé (scripts, événements)."""
+        loc = self.locations.get(start_id)
+        conn = loc.connections.get(end_id) if loc else None
+        if not conn:
+            return False
+        if conn.is_locked != locked:
+            conn.is_locked = locked
+            self.invalidate_routes()
+        return True
+
     def unlock_path(self, start_id: str, end_id: str, key_item: GameItem) -> bool:
         """Tentative de déverrouillage d'un passage."""
         loc = self.locations.get(start_id)
@@ -223,27 +368,176 @@ class WorldGraph:
             conn = loc.connections[end_id]
             if conn.is_locked and conn.key_id_required == key_item.item_id:
                 conn.is_locked = False
+                # Un passage ouvert peut raccourcir n'importe quel itinéraire
+                self.invalidate_routes()
                 return True
         return False
 
-    def find_nearest_location(self, x: float, y: float, continent: str) -> Tuple[Optional[Location], float]:
+    # --- PATHFINDING (VOYAGES MULTI-ÉTAPES) ---
+    def invalidate_routes(self):
         """
-        Trouve le lieu connu le plus proche des coordonnées données (GPS Serveur).
-        C'est CRITIQUE pour ancrer le PNJ quand le client est dans une zone 'vide'.
+        Vide les caches d'itinéraires de ce graphe. Appelé par ses mutateurs
+        (add_location, add_connection, set_connection_locked, unlock_path) ;
+        à rappeler après toute modification directe d'un Location ou d'une
+        connexion (Location.add_connection, is_locked, travel_time_seconds).
         """
-        best_loc = None
-        min_dist = float('inf')
+        self._routes.clear()
+        self._trees.clear()
+        self._heuristic_scale = None
+
+    def _open_connections(self, loc_id: str):
+        """Tronçons praticables depuis un lieu : (cible, durée). Ignore les voies verrouillées."""
+        loc = self.locations.get(loc_id)
+        if not loc: return
+        for target_id, conn in loc.connections.items():
+            if not conn.is_locked and target_id in self.locations:
+                yield target_id, conn.travel_time_seconds
+
+    def _get_heuristic_scale(self) -> float:
+        """
+        Secondes par unité de carte pour l'heuristique A* : le plus petit
+        rapport durée / distance à vol d'oiseau sur toutes les connexions.
+        Aucun chemin ne peut donc être plus rapide que scale * distance
+        (heuristique admissible). 0 si une connexion est plus rapide que la
+        géométrie ne le permet (A* se ramène alors à Dijkstra).
+        """
+        if self._heuristic_scale is None:
+            scale = float('inf')
+            for loc in self.locations.values():
+                for target_id, conn in loc.connections.items():
+                    target = self.locations.get(target_id)
+                    if not target: continue
+                    dist = ((target.x - loc.x) ** 2 + (target.y - loc.y) ** 2) ** 0.5
+                    if dist > 0:
+                        scale = min(scale, conn.travel_time_seconds / dist)
+            self._heuristic_scale = scale if scale != float('inf') else 0.0
+        return self._heuristic_scale
+
+    def travel_times_from(self, start_id: str) -> Dict[str, int]:
+        """
+        Durée du plus court voyage depuis `start_id` vers chaque lieu accessible
+        (Dijkstra complet). L'arbre des plus courts chemins est mis en cache :
+        les itinéraires suivants depuis ce lieu sont lus directement.
+        """
+        if start_id not in self.locations:
+            return {}
+        tree = self._trees.get(start_id)
+        if tree is None:
+            times: Dict[str, int] = {start_id: 0}
+            previous: Dict[str, str] = {}
+            heap = [(0, start_id)]
+            while heap:
+                cost, loc_id = heapq.heappop(heap)
+                if cost > times[loc_id]: continue
+                for target_id, leg in self._open_connections(loc_id):
+                    new_cost = cost + leg
+                    if new_cost < times.get(target_id, float('inf')):
+                        times[target_id] = new_cost
+                        previous[target_id] = loc_id
+                        heapq.heappush(heap, (new_cost, target_id))
+            tree = self._trees[start_id] = (times, previous)
+        return dict(tree[0])
+
+    def _search_route(self, start_id: str, end_id: str) -> Optional[Tuple[str, ...]]:
+        """A* de start_id à end_id, heuristique : distance à vol d'oiseau x échelle."""
+        goal = self.locations[end_id]
+        scale = self._get_heuristic_scale()
+
+        def estimate(loc_id: str) -> float:
+            if not scale: return 0.0  # Heuristique nulle : Dijkstra arrêté à l'arrivée
+            loc = self.locations[loc_id]
+            return scale * ((loc.x - goal.x) ** 2 + (loc.y - goal.y) ** 2) ** 0.5
+
+        costs: Dict[str, int] = {start_id: 0}
+        previous: Dict[str, str] = {}
+        heap = [(estimate(start_id), 0, start_id)]
+        while heap:
+            _, cost, loc_id = heapq.heappop(heap)
+            if loc_id == end_id:
+                return self._unwind(previous, start_id, end_id)
+            if cost > costs[loc_id]: continue
+            for target_id, leg in self._open_connections(loc_id):
+                new_cost = cost + leg
+                if new_cost < costs.get(target_id, float('inf')):
+                    costs[target_id] = new_cost
+                    previous[target_id] = loc_id
+                    heapq.heappush(heap, (new_cost + estimate(target_id), new_cost, target_id))
+        return None
 
-        for loc in self.locations.values():
-            # On filtre grossièrement par continent pour éviter les aberrations
-            if loc.continent.lower() != continent.lower():
-                continue
+    @staticmethod
+    def _unwind(previous: Dict[str, str], start_id: str, end_id: str) -> Tuple[str, ...]:
+        path = [end_id]
+        while path[-1] != start_id:
+            path.append(previous[path[-1]])
+        return tuple(reversed(path))
 
-            # Distance euclidienne simple
-            dist = ((loc.x - x) ** 2 + (loc.y - y) ** 2) ** 0.5
+    def find_route(self, start_id: str, end_id: str) -> Optional[TravelRoute]:
+        """
+        Plus court itinéraire (en temps) de start_id à end_id, en plusieurs
+        étapes si besoin. Retourne None si aucun chemin praticable.
+        """
+        if start_id not in self.locations or end_id not in self.locations:
+            return None
+        key = (start_id, end_id)
+        if key not in self._routes:
+            tree = self._trees.get(start_id)
+            if start_id == end_id:
+                path = (start_id,)
+            elif tree is not None:
+                path = self._unwind(tree[1], start_id, end_id) if end_id in tree[0] else None
+            else:
+                path = self._search_route(start_id, end_id)
+
+            if len(self._routes) >= self.ROUTE_CACHE_SIZE:
+                # Éviction du plus ancien itinéraire (ordre d'insertion du dict)
+                del self._routes[next(iter(self._routes))]
+            legs = None if path is None else tuple(
+                self.locations[a].connections[b].travel_time_seconds for a, b in zip(path, path[1:]))
+            self._routes[key] = None if path is None else (path, legs)
+
+        cached = self._routes[key]
+        if cached is None:
+            return None
+        return TravelRoute(path=list(cached[0]), leg_times=list(cached[1]))
+
+    def get_route_cost(self, start_id: str, end_id: str) -> Optional[int]:
+        """Durée totale du plus court itinéraire (None si inaccessible)."""
+        route = self.find_route(start_id, end_id)
+        return route.total_seconds if route else None
+
+    # --- GPS SERVEUR (INDEX SPATIAL) ---
+    def build_spatial_index(self):
+        """
+        Construit une grille par continent. Appelé une fois après le chargement
+        de la géographie ; ensuite reconstruit à la demande après add_location.
+        À rappeler si les coordonnées d'un lieu existant sont modifiées.
+        """
+        by_continent: Dict[str, List[Location]] = {}
+        for loc in self.locations.values():
+            by_continent.setdefault(loc.continent.lower(), []).append(loc)
+        self._spatial_index = {name: LocationGrid(locs) for name, locs in by_continent.items()}
+        logger.info(f"Index spatial : {len(self.locations)} lieux sur {len(by_continent)} continents.")
 
-            if dist < min_dist:
-                min_dist = dist
-                best_loc = loc
+    def find_nearest_locations(self, x: float, y: float, continent: str, k: int = 1,
+                               max_distance: Optional[float] = None) -> List[Tuple[Location, float]]:
+        """
+        Les `k` lieux connus les plus proches des coordonnées données, sur le
+        même continent (comparaison insensible à la casse), triés par distance.
+        """
+        if self._spatial_index is None:
+            self.build_spatial_index()
+        grid = self._spatial_index.get(continent.lower())
+        if grid is None:
+            return []
+        return grid.nearest(x, y, k, max_distance)
 
-        return best_loc, min_dist
\ No newline at end of file
+    def find_nearest_location(self, x: float, y: float, continent: str) -> Tuple[Optional[Location], float]:
+        """
+        Trouve le lieu connu le plus proche des coordonnées données (GPS Serveur).
+        C'est CRITIQUE pour ancrer le PNJ quand le client est dans une zone 'vide'.
+        """
+        # On filtre par continent pour éviter les aberrations
+        nearest = self.find_nearest_locations(x, y, continent, k=1)
+        if not nearest:
+            return None, float('inf')
+        return nearest[0]
@@ -64,10 +64,8 @@ class NPCServer:
                         dist = route.get("distance_km", 1)
                         time_cost = int(dist * 10)
                         if start_id and end_id:
-                            loc_a = self.world.get_location(start_id)
-                            loc_b = self.world.get_location(end_id)
-                            if loc_a: loc_a.add_connection(end_id, time_cost)
-                            if loc_b: loc_b.add_connection(start_id, time_cost)
+                            self.world.add_connection(start_id, end_id, time_cost)
+                            self.world.add_connection(end_id, start_id, time_cost)
 
             except Exception as e:
                 logger.error(f"Erreur lecture géo {file_path.name}: {e}")
@@ -77,6 +75,9 @@ class NPCServer:
         else:
             logger.info(f"🌍 Géographie chargée : {node_count} lieux.")
 
+        # Index spatial par continent : construit une fois ici plutôt qu'à chaque /chat
+        self.world.build_spatial_index()
+
     def _load_npcs(self):
         if not PNJ_DIR.exists(): os.makedirs(PNJ_DIR, exist_ok=True)
         default_spawn = next(iter(self.world.locations.keys()), "world_default")
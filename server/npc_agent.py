@@ -2,7 +2,7 @@ import time
 import uuid
 import logging
 from enum import Enum
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 from pydantic import BaseModel
 
 # Import des systèmes Core
@@ -53,6 +53,8 @@ class GameAwareNPC:
         # Gestion du Voyage
         self.destination_id: Optional[str] = None
         self.arrival_time: float = 0.0
+        # Étapes restantes du voyage : (lieu, heure d'arrivée à ce lieu)
+        self.travel_plan: List[Tuple[str, float]] = []
         self.last_update_tick: float = time.time()
 
     def update(self):
@@ -64,41 +66,63 @@ class GameAwareNPC:
         self.last_update_tick = now
 
         if self.state == NPCState.MOVING:
+            # Le PNJ passe par chaque étape à son heure d'arrivée
+            while self.travel_plan and now >= self.travel_plan[0][1]:
+                self.current_location_id = self.travel_plan.pop(0)[0]
             if now >= self.arrival_time:
                 self._complete_travel()
 
     def start_travel(self, target_loc_id: str) -> str:
         """
-        Commande impérative de voyage.
+        Commande impérative de voyage (plus court itinéraire, en plusieurs étapes si besoin).
         Retourne un message système décrivant l'action.
         """
         if self.state != NPCState.IDLE:
             return f"SYSTEM: {self.name} est occupé ({self.state.value}) et ne peut pas voyager."
 
-        cost = self.world.get_travel_cost(self.current_location_id, target_loc_id)
+        route = self.world.find_route(self.current_location_id, target_loc_id)
 
-        if cost is None:
+        if route is None:
             # Vérification si c'est verrouillé
             loc = self.world.get_location(self.current_location_id)
-            conn = loc.connections.get(target_loc_id)
+            conn = loc.connections.get(target_loc_id) if loc else None
             if conn and conn.is_locked:
                 return "SYSTEM: La voie est verrouillée."
-            return f"SYSTEM: Pas de chemin direct vers {target_loc_id}."
+            return f"SYSTEM: Aucun chemin praticable vers {target_loc_id}."
 
-        # Transition d'État
         target_loc = self.world.get_location(target_loc_id)
+        if len(route.path) < 2:
+            return f"SYSTEM: {self.name} est déjà à {target_loc.name}."
+
+        # Transition d'État : heure d'arrivée à chaque étape
+        now = time.time()
+        self.travel_plan = []
+        elapsed = 0
+        for waypoint, leg in zip(route.path[1:], route.leg_times):
+            elapsed += leg
+            self.travel_plan.append((waypoint, now + elapsed))
+        cost = route.total_seconds
         self.state = NPCState.MOVING
         self.destination_id = target_loc_id
-        self.arrival_time = time.time() + cost
-
-        logger.info(f"{self.name} commence à marcher vers {target_loc.name} (Durée: {cost}s).")
-        return f"ACTION: Vous commencez à marcher vers {target_loc.name}. Cela prendra {cost} secondes."
+        self.arrival_time = now + cost
+
+        logger.info(f"{self.name} commence à marcher vers {target_loc.name} "
+                    f"({len(route.leg_times)} étapes, Durée: {cost}s).")
+        if len(route.path) == 2:
+            return f"ACTION: Vous commencez à marcher vers {target_loc.name}. Cela prendra {cost} secondes."
+        stops = []
+        for lid in route.path[1:-1]:
+            stop = self.world.get_location(lid)
+            stops.append(stop.name if stop else lid)
+        return (f"ACTION: Vous partez pour {target_loc.name} en passant par {', '.join(stops)}. "
+                f"Cela prendra {cost} secondes.")
 
     def _complete_travel(self):
         """Finalisation interne du voyage."""
         self.current_location_id = self.destination_id
         self.state = NPCState.IDLE
         self.destination_id = None
+        self.travel_plan = []
         logger.info(f"{self.name} est arrivé à destination.")
 
     def construct_context_prompt(self, nearby_player: Optional[PlayerEntity] = None,
@@ -158,6 +182,9 @@ class GameAwareNPC:
                 dest_name = dest.name if dest else "Destination inconnue"
                 remaining = int(self.arrival_time - time.time())
                 loc_context = f"SITUATION: En voyage vers {dest_name}. Arrivée dans {remaining}s."
+                if len(self.travel_plan) > 1:
+                    next_stop = self.world.get_location(self.travel_plan[0][0])
+                    loc_context += f" Prochaine étape : {next_stop.name if next_stop else self.travel_plan[0][0]}."
             else:
                 exits = []
                 for lid in loc.connections:
@@ -0,0 +1,320 @@
+# src/core/graph_analysis.py
+"""
+Analyse statique du graphe de l'histoire.
+
+Le graphe orienté est construit en une seule passe sur le projet :
+choix (`content.choices[*].target_node_id`), choix de remplacement
+(`replacement_data.target_node_id`), liens legacy (`project.edges`) et
+macros à argument 'node_select' (`goto`, `button`, `movePnj`) des scripts
+on_enter / on_exit et des événements de choix.
+Les analyses sont en O(nœuds + liens) :
+
+    graph = StoryGraph.from_project(project)
+    report = graph.analyze()
+    print(report.format_summary(project.nodes))
+
+Partagé par l'éditeur (NodeScene.refresh_connections), migrate_targets.py
+et la vérification en ligne de commande (tools/analyze_story.py).
+"""
+import re
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from src.core.definitions import MACRO_DEFINITIONS, NodeType
+
+# Nature d'un lien
+LINK_CHOICE = "choice"
+LINK_REPLACEMENT = "replacement"
+LINK_EDGE = "edge"
+LINK_GOTO = "goto"
+LINK_BUTTON = "button"
+# Macro désignant un nœud sans y naviguer (ex: movePnj) : vérifiée, mais hors parcours
+LINK_REFERENCE = "reference"
+
+NAVIGATION_LINK_KINDS = {"goto": LINK_GOTO, "button": LINK_BUTTON}
+SCRIPT_KEYS = ("on_enter", "on_exit")
+
+
+def _node_target_macros() -> Dict[str, Tuple[str, str, int]]:
+    """Macros ayant un argument 'node_select' : nom normalisé -> (nature, paramètre, position)."""
+    macros = {}
+    for name, definition in MACRO_DEFINITIONS.items():
+        for position, arg in enumerate(definition.get("args", [])):
+            if arg.get("type") == "node_select":
+                key = name.replace("_", "").lower()
+                macros[key] = (NAVIGATION_LINK_KINDS.get(key, LINK_REFERENCE), arg["name"], position)
+                break
+    # Ancienne macro encore présente dans des projets existants
+    macros.setdefault("spawn", (LINK_REFERENCE, "target", 0))
+    return macros
+
+
+NODE_TARGET_MACROS = _node_target_macros()
+
+# Macro texte : <<goto "Cible">> / <<button "Texte" Cible>>
+SCRIPT_MACRO_PATTERN = re.compile(r'^<<\s*(\w+)(.*)>>$')
+SCRIPT_TOKEN_PATTERN = re.compile(r'(?:[^\s"]+|"[^"]*")+')
+
+
+def _target_macro(macro_type: Any) -> Optional[Tuple[str, str, int]]:
+    if not isinstance(macro_type, str):
+        return None
+    return NODE_TARGET_MACROS.get(macro_type.replace("_", "").lower())
+
+
+def _iter_event_slots(events: Any) -> Iterator[Tuple[str, Dict[str, Any], str]]:
+    for event in events if isinstance(events, list) else ():
+        if not isinstance(event, dict):
+            continue
+        macro = _target_macro(event.get("type"))
+        params = event.get("parameters")
+        if macro and isinstance(params, dict) and params.get(macro[1]):
+            yield macro[0], params, macro[1]
+
+
+def iter_target_slots(content: Dict[str, Any], logic: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, Any], str]]:
+    """
+    Emplacements des cibles d'un nœud (données brutes) : (nature du lien,
+    dictionnaire conteneur, clé). `container[key]` est l'id cible, modifiable
+    sur place (ex: migration titre -> id). Les scripts texte sont lus par
+    `iter_script_targets` (pas réécrits).
+    """
+    for choice in (content or {}).get("choices", None) or ():
+        if not isinstance(choice, dict):
+            continue
+        if choice.get("target_node_id"):
+            yield LINK_CHOICE, choice, "target_node_id"
+        replacement = choice.get("replacement_data")
+        if isinstance(replacement, dict) and replacement.get("target_node_id"):
+            yield LINK_REPLACEMENT, replacement, "target_node_id"
+        yield from _iter_event_slots(choice.get("events"))
+
+    for key in SCRIPT_KEYS:
+        yield from _iter_event_slots((logic or {}).get(key))
+
+
+def iter_script_targets(logic: Dict[str, Any]) -> Iterator[Tuple[str, str]]:
+    """Cibles (nature, id) des macros à cible écrites en texte (scripts legacy)."""
+    for key in SCRIPT_KEYS:
+        lines = (logic or {}).get(key)
+        for line in lines if isinstance(lines, list) else ():
+            if not isinstance(line, str):
+                continue
+            match = SCRIPT_MACRO_PATTERN.match(line.strip())
+            if not match:
+                continue
+            macro = _target_macro(match.group(1))
+            if not macro:
+                continue
+            kind, _, position = macro
+            args = [arg.strip('"') for arg in SCRIPT_TOKEN_PATTERN.findall(match.group(2))]
+            if len(args) > position and args[position]:
+                yield kind, args[position]
+
+
+@dataclass(frozen=True)
+class StoryLink:
+    """Lien orienté source -> cible (`label` : id du choix ou de la macro)."""
+    source: str
+    target: str
+    kind: str
+    label: Optional[str] = None
+
+
+@dataclass
+class GraphReport:
+    """Résultat de `StoryGraph.analyze`."""
+    start_ids: List[str] = field(default_factory=list)
+    unreachable: List[str] = field(default_factory=list)
+    missing_targets: List[StoryLink] = field(default_factory=list)
+    # Composantes fortement connexes contenant un cycle (taille > 1 ou boucle sur soi)
+    cyclic_components: List[List[str]] = field(default_factory=list)
+    # Cycles sans sortie : aucun lien ne quitte la composante et aucun nœud END
+    closed_cycles: List[List[str]] = field(default_factory=list)
+
+    @property
+    def is_clean(self) -> bool:
+        return not (self.unreachable or self.missing_targets or self.closed_cycles)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "start_ids": self.start_ids,
+            "unreachable": self.unreachable,
+            "missing_targets": [[l.source, l.target, l.kind, l.label] for l in self.missing_targets],
+            "cyclic_components": self.cyclic_components,
+            "closed_cycles": self.closed_cycles,
+        }
+
+    def format_summary(self, nodes: Optional[Dict[str, Any]] = None) -> str:
+        nodes = nodes or {}
+
+        def name(node_id: str) -> str:
+            node = nodes.get(node_id)
+            return f"{node.title} ({node_id})" if node else node_id
+
+        lines = [
+            f"Départ : {', '.join(name(n) for n in self.start_ids) or 'aucun'}",
+            f"Nœuds inaccessibles : {len(self.unreachable)}",
+        ]
+        lines += [f"  {name(n)}" for n in self.unreachable]
+        lines.append(f"Liens vers des nœuds inexistants : {len(self.missing_targets)}")
+        lines += [f"  {name(l.source)} -[{l.kind}{' ' + l.label if l.label else ''}]-> {l.target}"
+                  for l in self.missing_targets]
+        lines.append(f"Composantes cycliques : {len(self.cyclic_components)}, dont sans sortie : {len(self.closed_cycles)}")
+        lines += [f"  {' -> '.join(name(n) for n in cycle)}" for cycle in self.closed_cycles]
+        return "\n".join(lines)
+
+
+class StoryGraph:
+    """
+    Graphe orienté de l'histoire. `successors` ne contient que les cibles
+    existantes (dans l'ordre de découverte, sans doublon) ; les liens vers
+    des nœuds absents sont dans `missing_links`. Les références (movePnj)
+    sont vérifiées mais ne comptent pas comme des successeurs.
+    """
+
+    def __init__(self, nodes: Dict[str, Any], edges: Iterable[Any] = ()):
+        self.nodes = nodes
+        self.links: List[StoryLink] = []
+        self.missing_links: List[StoryLink] = []
+        self.successors: Dict[str, Dict[str, None]] = {node_id: {} for node_id in nodes}
+        self._pairs: Dict[Tuple[str, str], Set[str]] = {}
+
+        for node_id, node in nodes.items():
+            content, logic = node.content, node.logic
+            for kind, container, key in iter_target_slots(content, logic):
+                label = container.get("id") if kind in (LINK_CHOICE, LINK_REPLACEMENT) else None
+                self._add(StoryLink(node_id, container[key], kind, label))
+            for kind, target in iter_script_targets(logic):
+                self._add(StoryLink(node_id, target, kind))
+
+        for edge in edges:
+            if edge.start_node_id in nodes:
+                self._add(StoryLink(edge.start_node_id, edge.end_node_id, LINK_EDGE, edge.id))
+
+    @staticmethod
+    def from_project(project) -> 'StoryGraph':
+        return StoryGraph(project.nodes, project.edges)
+
+    def _add(self, link: StoryLink):
+        self.links.append(link)
+        if link.target not in self.nodes:
+            self.missing_links.append(link)
+            return
+        if link.kind == LINK_REFERENCE:
+            return
+        self.successors[link.source][link.target] = None
+        self._pairs.setdefault((link.source, link.target), set()).add(link.kind)
+
+    # --- Requêtes ---
+    def has_link(self, source: str, target: str, kinds: Optional[Iterable[str]] = None) -> bool:
+        """Vrai s'il existe un lien source -> cible (éventuellement d'une des natures données), en O(1)."""
+        found = self._pairs.get((source, target))
+        if not found:
+            return False
+        return kinds is None or not found.isdisjoint(kinds)
+
+    def iter_pairs(self, kinds: Optional[Iterable[str]] = None) -> Iterator[Tuple[str, str]]:
+        """Paires (source, cible) distinctes vers des nœuds existants, dans l'ordre des nœuds."""
+        kinds = set(kinds) if kinds is not None else None
+        for source, targets in self.successors.items():
+            for target in targets:
+                if kinds is None or not self._pairs[(source, target)].isdisjoint(kinds):
+                    yield source, target
+
+    def start_ids(self) -> List[str]:
+        """Nœuds START (sinon le premier nœud du projet, comme le StoryManager)."""
+        starts = [node_id for node_id, node in self.nodes.items() if node.type == NodeType.START]
+        if not starts and self.nodes:
+            starts = [next(iter(self.nodes))]
+        return starts
+
+    def reachable_from(self, start_ids: Iterable[str]) -> Set[str]:
+        """Parcours en largeur depuis les nœuds de départ."""
+        seen = set(node_id for node_id in start_ids if node_id in self.successors)
+        queue = deque(seen)
+        while queue:
+            for target in self.successors[queue.popleft()]:
+                if target not in seen:
+                    seen.add(target)
+                    queue.append(target)
+        return seen
+
+    def strongly_connected_components(self) -> List[List[str]]:
+        """Composantes fortement connexes (Tarjan itératif, sans récursion)."""
+        successors = self.successors
+        index: Dict[str, int] = {}
+        low: Dict[str, int] = {}
+        stack: List[str] = []
+        on_stack: Set[str] = set()
+        components: List[List[str]] = []
+        counter = 0
+
+        for root in successors:
+            if root in index:
+                continue
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(successors[root]))]
+
+            while work:
+                node, children = work[-1]
+                for child in children:
+                    if child not in index:
+                        index[child] = low[child] = counter
+                        counter += 1
+                        stack.append(child)
+                        on_stack.add(child)
+                        work.append((child, iter(successors[child])))
+                        break
+                    if child in on_stack and index[child] < low[node]:
+                        low[node] = index[child]
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        if low[node] < low[parent]:
+                            low[parent] = low[node]
+                    if low[node] == index[node]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component.append(member)
+                            if member == node:
+                                break
+                        component.reverse()
+                        components.append(component)
+        return components
+
+    def _is_cyclic(self, component: List[str]) -> bool:
+        return len(component) > 1 or component[0] in self.successors[component[0]]
+
+    def _has_exit(self, component: List[str]) -> bool:
+        members = set(component)
+        for node_id in component:
+            if self.nodes[node_id].type == NodeType.END:
+                return True
+            for target in self.successors[node_id]:
+                if target not in members:
+                    return True
+        return False
+
+    def analyze(self, start_ids: Optional[Iterable[str]] = None) -> GraphReport:
+        starts = list(start_ids) if start_ids is not None else self.start_ids()
+        reachable = self.reachable_from(starts)
+        report = GraphReport(
+            start_ids=starts,
+            unreachable=[node_id for node_id in self.nodes if node_id not in reachable],
+            missing_targets=list(self.missing_links),
+        )
+        for component in self.strongly_connected_components():
+            if not self._is_cyclic(component):
+                continue
+            report.cyclic_components.append(component)
+            if not self._has_exit(component):
+                report.closed_cycles.append(component)
+        return report
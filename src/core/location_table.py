@@ -0,0 +1,230 @@
+# src/core/location_table.py
+"""
+Stockage en colonnes des lieux du lore.
+
+Un lieu n'est plus un dict de dix clés mais une ligne de table :
+coordonnées dans deux `array('d')`, chaînes répétitives (continent, ville,
+type, échelle...) codées par une table de chaînes internées, chaînes
+uniques (id, nom, lieu) concaténées avec un tableau de décalages.
+Les appelants reçoivent des `LocationRecord`, vues en lecture seule qui se
+lisent comme l'ancien dict (`loc["x"]`, `loc.get("city")`).
+
+Si NumPy est installé, `distances` calcule les distances d'un continent
+entier en un seul appel vectorisé sur les colonnes (sans copie).
+"""
+import math
+import sys
+from array import array
+from collections.abc import Mapping, Sequence
+from typing import Any, Dict, Iterable, List, Optional
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+LOCATION_FIELDS = ("id", "name", "x", "y", "continent", "city", "place", "type", "scale", "main_location_name")
+# Colonnes à faible cardinalité : codées (array('I')) dans une table de chaînes
+CODED_FIELDS = ("continent", "city", "type", "scale", "main_location_name")
+# Colonnes de chaînes (presque) uniques : texte concaténé + décalages (TextColumn)
+TEXT_FIELDS = ("id", "name", "place")
+
+
+class TextColumn:
+    """
+    Chaînes uniques stockées bout à bout dans une seule chaîne, avec un
+    tableau de décalages : ~1 octet par caractère au lieu d'un objet str
+    (~50 octets d'en-tête) par valeur. Les valeurs non-str (None) sont
+    gardées à part.
+    """
+
+    def __init__(self):
+        self._data = ""
+        self._pending: List[str] = []
+        self._ends = array('I')
+        self._others: Dict[int, Any] = {}
+
+    def append(self, value: Any):
+        if type(value) is not str:
+            self._others[len(self._ends)] = value
+            value = ""
+        self._pending.append(value)
+        self._ends.append((self._ends[-1] if self._ends else 0) + len(value))
+
+    def flush(self):
+        """Concatène les valeurs ajoutées depuis la dernière lecture."""
+        if self._pending:
+            self._data += "".join(self._pending)
+            self._pending = []
+
+    def __getitem__(self, row: int) -> Any:
+        if row in self._others:
+            return self._others[row]
+        self.flush()
+        start = self._ends[row - 1] if row else 0
+        return self._data[start:self._ends[row]]
+
+    def __len__(self) -> int:
+        return len(self._ends)
+
+    def memory_usage(self) -> int:
+        return sys.getsizeof(self._data) + self._ends.itemsize * len(self._ends) + sys.getsizeof(self._others)
+
+
+class StringTable:
+    """Table de chaînes : valeur <-> code entier (None est une valeur comme une autre)."""
+
+    def __init__(self):
+        self.values: List[Any] = []
+        self._codes: Dict[Any, int] = {}
+
+    def code(self, value: Any) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self._codes[value] = code
+            self.values.append(sys.intern(value) if type(value) is str else value)
+        return code
+
+    def find(self, value: Any) -> Optional[int]:
+        return self._codes.get(value)
+
+
+class LocationRecord(Mapping):
+    """Vue en lecture seule sur une ligne de la table (se lit comme l'ancien dict de lieu)."""
+    __slots__ = ("_table", "_row")
+
+    def __init__(self, table: 'LocationTable', row: int):
+        self._table = table
+        self._row = row
+
+    @property
+    def row(self) -> int:
+        return self._row
+
+    def __getitem__(self, field: str) -> Any:
+        return self._table.value(self._row, field)
+
+    def __iter__(self):
+        return iter(LOCATION_FIELDS)
+
+    def __len__(self) -> int:
+        return len(LOCATION_FIELDS)
+
+    def __repr__(self) -> str:
+        return f"LocationRecord({dict(self)!r})"
+
+
+class LocationTable(Sequence):
+    """
+    Lieux en colonnes, dans l'ordre d'ajout (l'ordre départage les égalités
+    de distance). S'utilise comme une liste en lecture seule de
+    LocationRecord, plus `append` / `extend` de dicts.
+    """
+
+    def __init__(self, locations: Iterable[Mapping] = ()):
+        self.xs = array('d')
+        self.ys = array('d')
+        self._strings = StringTable()
+        self._coded = {name: array('I') for name in CODED_FIELDS}
+        self._text = {name: TextColumn() for name in TEXT_FIELDS}
+        self._records: List[Optional[LocationRecord]] = []
+        # Lignes par code de continent (calculées à la demande)
+        self._rows_by_continent: Dict[int, array] = {}
+        self.extend(locations)
+
+    # --- Ajout ---
+    def append(self, location: Mapping):
+        self.xs.append(float(location.get("x", 0.0)))
+        self.ys.append(float(location.get("y", 0.0)))
+        code = self._strings.code
+        for name, column in self._coded.items():
+            column.append(code(location.get(name)))
+        for name, column in self._text.items():
+            column.append(location.get(name))
+        self._records.append(None)
+        self._rows_by_continent.clear()
+
+    def extend(self, locations: Iterable[Mapping]):
+        for location in locations:
+            self.append(location)
+        for column in self._text.values():
+            column.flush()
+
+    # --- Lecture ---
+    def value(self, row: int, field: str) -> Any:
+        if field == "x":
+            return self.xs[row]
+        if field == "y":
+            return self.ys[row]
+        column = self._coded.get(field)
+        if column is not None:
+            return self._strings.values[column[row]]
+        column = self._text.get(field)
+        if column is None:
+            raise KeyError(field)
+        return column[row]
+
+    def __len__(self) -> int:
+        return len(self.xs)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[row] for row in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        record = self._records[index]
+        if record is None:
+            record = self._records[index] = LocationRecord(self, index)
+        return record
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, (LocationTable, list, tuple)):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"LocationTable({len(self)} lieux)"
+
+    # --- Requêtes en colonnes ---
+    def rows_of(self, continent: Any) -> array:
+        """Lignes d'un continent (array('I'), ordre de la table)."""
+        code = self._strings.find(continent)
+        if code is None:
+            return array('I')
+        rows = self._rows_by_continent.get(code)
+        if rows is None:
+            codes = self._coded["continent"]
+            rows = array('I', (row for row in range(len(codes)) if codes[row] == code))
+            self._rows_by_continent[code] = rows
+        return rows
+
+    def distances(self, x: float, y: float, rows: Optional[Sequence[int]] = None):
+        """
+        Distances de (x, y) aux lignes données (toutes par défaut), dans le
+        même ordre : tableau NumPy si disponible, sinon array('d').
+        """
+        if np is not None:
+            xs = np.frombuffer(self.xs, dtype=np.float64)
+            ys = np.frombuffer(self.ys, dtype=np.float64)
+            if rows is not None:
+                index = np.frombuffer(rows, dtype=np.uint32) if isinstance(rows, array) else np.asarray(rows, dtype=np.intp)
+                xs, ys = xs[index], ys[index]
+            return np.sqrt((xs - x) ** 2 + (ys - y) ** 2)
+        xs, ys = self.xs, self.ys
+        if rows is None:
+            rows = range(len(xs))
+        return array('d', (math.sqrt((xs[row] - x) ** 2 + (ys[row] - y) ** 2) for row in rows))
+
+    def memory_usage(self) -> int:
+        """Taille approximative des colonnes (octets, hors chaînes partagées)."""
+        size = self.xs.itemsize * len(self.xs) * 2
+        size += sum(column.itemsize * len(column) for column in self._coded.values())
+        size += sum(column.memory_usage() for column in self._text.values())
+        size += sys.getsizeof(self._records)
+        return size
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        return [dict(record) for record in self]
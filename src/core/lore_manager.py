@@ -1,16 +1,129 @@
+import hashlib
 import json
 import os
-import math
+from concurrent.futures import ProcessPoolExecutor
+
+from src.core.location_table import LocationTable
+from src.core.spatial_index import SpatialGrid
 
 print(f"DEBUG: Loading LoreManager from {__file__}")
 
+# Modes de chargement du dossier de lore
+LORE_EAGER = "eager"   # tous les fichiers lus au démarrage
+LORE_LAZY = "lazy"     # en-têtes seulement ; un continent est lu à sa première requête
+
+# Index des en-têtes (continents, nombre de lieux, emprise) par fichier de lore,
+# rangé dans le cache utilisateur (un fichier par dossier de lore)
+LORE_INDEX_FILE = "lore_index_{}.json"
+CACHE_SUBDIR = "narrative_engine"
+MACRO_LORE_FILE = "velkarum.json"
+
+# Lecture sur un pool de processus seulement au-delà de ce volume : l'analyse
+# JSON tourne à ~27 Mo/s par cœur, alors que démarrer le pool coûte de 25 ms
+# (fork) à 0,7 s (spawn, Windows) et que les lieux reviennent sérialisés.
+# Le dossier livré (~0,3 Mo, 6 fichiers) se lit en ~15 ms en série.
+PARALLEL_MIN_BYTES = 32 * 1024 * 1024
+PARALLEL_MIN_FILES = 4
+
+
+def default_cache_dir():
+    """Dossier de cache utilisateur ($XDG_CACHE_HOME, sinon ~/.cache)."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, CACHE_SUBDIR)
+
+
+def parse_lore_file(filepath, scale):
+    """Lit un fichier de lore et retourne ses lieux (dans l'ordre du fichier)."""
+    locations = []
+    try:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+            if "nodes" in data:
+                for key, node in data["nodes"].items():
+                    # Ensure required fields
+                    if "x" in node and "y" in node and "continent" in node:
+                        locations.append({
+                            "id": key,
+                            "name": node.get("name", key),
+                            "x": float(node["x"]),
+                            "y": float(node["y"]),
+                            "continent": node["continent"],
+                            "city": node.get("city") or "",
+                            "place": node.get("place") or "",
+                            "type": node.get("type", "Unknown"),
+                            "scale": scale,
+                            "main_location_name": node.get("main_location_name")
+                        })
+    except Exception as e:
+        print(f"Error loading {filepath}: {e}")
+    return locations
+
+
+def _file_header(locations):
+    """En-tête d'un fichier : continent -> {'count': n, 'bbox': [min_x, min_y, max_x, max_y]}."""
+    continents = {}
+    for loc in locations:
+        header = continents.get(loc["continent"])
+        if header is None:
+            continents[loc["continent"]] = {"count": 1, "bbox": [loc["x"], loc["y"], loc["x"], loc["y"]]}
+            continue
+        header["count"] += 1
+        bbox = header["bbox"]
+        bbox[0], bbox[1] = min(bbox[0], loc["x"]), min(bbox[1], loc["y"])
+        bbox[2], bbox[3] = max(bbox[2], loc["x"]), max(bbox[3], loc["y"])
+    return continents
+
+
 class LoreManager:
-    def __init__(self, lore_directory=None):
+    """
+    Lieux du lore (fichiers JSON du dossier de lore, ou lieux du projet),
+    stockés en colonnes (LocationTable) ; chaque lieu se lit comme un dict.
+
+    Mode LORE_EAGER : tous les fichiers sont lus au chargement, en série
+    tant que le dossier reste sous PARALLEL_MIN_BYTES / PARALLEL_MIN_FILES,
+    sinon sur un pool de processus (un par cœur ; l'analyse JSON monopolise
+    le GIL, des threads n'apporteraient rien). `workers` impose la taille du
+    pool (1 : toujours en série).
+    Mode LORE_LAZY : seuls les en-têtes sont lus (index rangé dans
+    `cache_dir`, recalculé pour les fichiers modifiés ; ignoré si le cache
+    n'est pas accessible en écriture) ; les fichiers d'un continent sont lus
+    à la première requête sur ce continent. Accéder à `locations` charge
+    tout le reste.
+    """
+
+    def __init__(self, lore_directory=None, mode=LORE_EAGER, workers=None, cache_dir=None):
         self.lore_directory = lore_directory
-        self.locations = []
+        self.mode = mode
+        self.workers = workers
+        self.cache_dir = cache_dir or default_cache_dir()
+        self._locations = LocationTable()
+        # Index spatial par continent (grille), reconstruit par set_project / load_lore
+        self._grids = {}
+        self._index_stamp = None
+        # Facettes (continents, types) et vues triées par (continent, type), voir _get_facets
+        self._facets = None
+        self._facets_stamp = None
+        # Mode paresseux : fichiers (ordre de chargement), en-têtes, lieux déjà lus
+        self._files = []
+        self._headers = {}
+        self._file_locations = {}
+        self._pending_continents = {}
         if lore_directory:
             self.load_lore()
 
+    @property
+    def locations(self):
+        if self._locations is None:
+            self._load_all()
+        return self._locations
+
+    @locations.setter
+    def locations(self, locations):
+        """Accepte une LocationTable ou n'importe quelle suite de dicts de lieux (convertie en table)."""
+        self._locations = locations if isinstance(locations, LocationTable) else LocationTable(locations)
+        self._pending_continents = {}
+        self._facets = None
+
     def set_project(self, project):
         """Charge les données de lore depuis le projet."""
         self.locations = []
@@ -29,65 +142,157 @@ class LoreManager:
                 "scale": "micro", # Default to micro for project locations
                 "main_location_name": ""
             })
+        self._rebuild_index()
 
     def load_lore(self):
         self.locations = []
+        self._file_locations = {}
         if not os.path.exists(self.lore_directory):
             print(f"Warning: Lore directory not found: {self.lore_directory}")
             return
 
-        # 1. Load Macro (Velkarum)
-        velkarum_path = os.path.join(self.lore_directory, "velkarum.json")
+        # 1. Macro (Velkarum) puis 2. Micro (Regional)
+        self._files = []
+        velkarum_path = os.path.join(self.lore_directory, MACRO_LORE_FILE)
         if os.path.exists(velkarum_path):
-            self._load_file(velkarum_path, scale="macro")
-
-        # 2. Load Micro (Regional)
+            self._files.append((velkarum_path, "macro"))
         for filename in os.listdir(self.lore_directory):
-            if filename.endswith(".json") and filename != "velkarum.json":
-                filepath = os.path.join(self.lore_directory, filename)
-                self._load_file(filepath, scale="micro")
+            if filename.endswith(".json") and filename != MACRO_LORE_FILE:
+                self._files.append((os.path.join(self.lore_directory, filename), "micro"))
+
+        if self.mode == LORE_LAZY:
+            self._load_headers()
+            self._locations = None
+            self._grids = {}
+            return
+
+        self._parse_files([path for path, _ in self._files])
+        self._locations = LocationTable(loc for path, _ in self._files for loc in self._file_locations[path])
+        # Les lieux bruts ne servent plus : seule la table en colonnes est gardée
+        self._file_locations = {}
+        self._rebuild_index()
+
+    def _parse_files(self, paths, parallel=True):
+        """Lit les fichiers demandés (pas encore lus), en parallèle si le volume le justifie."""
+        scales = dict(self._files)
+        paths = [path for path in paths if path not in self._file_locations]
+        workers = min(self._pool_size(paths), len(paths)) if parallel else 1
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(parse_lore_file, paths, [scales[path] for path in paths]))
+        else:
+            results = [parse_lore_file(path, scales[path]) for path in paths]
+        for path, locations in zip(paths, results):
+            self._file_locations[path] = LocationTable(locations)
+
+    def _pool_size(self, paths):
+        if self.workers:
+            return self.workers
+        if len(paths) < PARALLEL_MIN_FILES or sum(os.path.getsize(path) for path in paths) < PARALLEL_MIN_BYTES:
+            return 1
+        return os.cpu_count() or 1
 
-    def _load_file(self, filepath, scale):
+    # --- Mode paresseux ---
+    def _index_path(self):
+        """Index des en-têtes de ce dossier de lore, dans le cache utilisateur."""
+        key = hashlib.sha1(os.path.abspath(self.lore_directory).encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.cache_dir, LORE_INDEX_FILE.format(key))
+
+    def _load_headers(self):
+        index_path = self._index_path()
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                if "nodes" in data:
-                    for key, node in data["nodes"].items():
-                        # Ensure required fields
-                        if "x" in node and "y" in node and "continent" in node:
-                            self.locations.append({
-                                "id": key,
-                                "name": node.get("name", key),
-                                "x": float(node["x"]),
-                                "y": float(node["y"]),
-                                "continent": node["continent"],
-                                "city": node.get("city") or "",
-                                "place": node.get("place") or "",
-                                "type": node.get("type", "Unknown"),
-                                "scale": scale,
-                                "main_location_name": node.get("main_location_name")
-                            })
-        except Exception as e:
-            print(f"Error loading {filepath}: {e}")
+            with open(index_path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            cached = {}
+
+        self._headers = {}
+        stale = []
+        for path, _ in self._files:
+            stat = os.stat(path)
+            header = cached.get(os.path.basename(path))
+            if header and header.get("mtime") == stat.st_mtime_ns and header.get("size") == stat.st_size:
+                self._headers[path] = header
+            else:
+                stale.append((path, stat))
+
+        if stale:
+            # Fichiers nouveaux ou modifiés : lus une fois (gardés en mémoire) pour recalculer leur en-tête
+            self._parse_files([path for path, _ in stale])
+            for path, stat in stale:
+                self._headers[path] = {"mtime": stat.st_mtime_ns, "size": stat.st_size,
+                                       "continents": _file_header(self._file_locations[path])}
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                with open(index_path, 'w', encoding='utf-8') as f:
+                    json.dump({os.path.basename(path): header for path, header in self._headers.items()}, f)
+            except OSError as e:
+                print(f"Warning: Lore index not written ({e})")
+
+        self._pending_continents = {}
+        for path, _ in self._files:
+            for continent in self._headers[path]["continents"]:
+                self._pending_continents.setdefault(continent, []).append(path)
+
+    def get_lore_headers(self):
+        """En-têtes du mode paresseux : {fichier: {continent: {'count', 'bbox'}}}."""
+        return {os.path.basename(path): header["continents"] for path, header in self._headers.items()}
+
+    def _load_continent(self, continent):
+        paths = self._pending_continents.pop(continent)
+        # Un ou deux fichiers, sur le chemin d'une requête : pas de pool à démarrer
+        self._parse_files(paths, parallel=False)
+        table = LocationTable(loc for path in paths
+                              for loc in self._file_locations[path] if loc["continent"] == continent)
+        self._grids[continent] = (SpatialGrid((table.xs[row], table.ys[row], row) for row in range(len(table))), table)
+
+    def _load_all(self):
+        self._parse_files([path for path, _ in self._files])
+        self._locations = LocationTable(loc for path, _ in self._files for loc in self._file_locations[path])
+        self._file_locations = {}
+        self._pending_continents = {}
+        self._rebuild_index()
+
+    def _rebuild_index(self):
+        """
+        Regroupe les lieux par continent dans une grille spatiale (ordre de la
+        table conservé). La grille ne retient que les numéros de ligne :
+        `_grids[continent] = (grille, table)`.
+        """
+        table = self.locations
+        by_continent = {}
+        for row in range(len(table)):
+            by_continent.setdefault(table.value(row, "continent"), []).append((table.xs[row], table.ys[row], row))
+        self._grids = {continent: (SpatialGrid(points), table) for continent, points in by_continent.items()}
+        self._index_stamp = (id(self.locations), len(self.locations))
+
+    def _grid(self, continent):
+        if self._locations is None:
+            # Mode paresseux : seul le continent demandé est lu
+            if continent in self._pending_continents:
+                self._load_continent(continent)
+            return self._grids.get(continent)
+        # La liste a pu être remplacée ou complétée directement : index reconstruit
+        if self._index_stamp != (id(self.locations), len(self.locations)):
+            self._rebuild_index()
+        return self._grids.get(continent)
 
     def get_location_at(self, x, y, continent, tolerance=0.1):
         """
         Trouve le lieu le plus proche aux coordonnées données.
         Priorise les lieux 'micro' sur les 'macro'.
+        Seules les cellules de la grille du continent qui recouvrent le rayon sont lues.
         """
-        candidates = []
-        for loc in self.locations:
-            if loc["continent"] == continent:
-                dist = math.sqrt((loc["x"] - x)**2 + (loc["y"] - y)**2)
-                if dist <= tolerance:
-                    candidates.append((dist, loc))
-        
+        indexed = self._grid(continent)
+        if not indexed:
+            return None
+        # Lieux dans le rayon, triés par distance (ordre de la liste en cas d'égalité)
+        grid, table = indexed
+        candidates = [(dist, table[row]) for dist, row in grid.within(x, y, tolerance)]
+
         if not candidates:
             return None
-            
-        # Sort by distance first
-        candidates.sort(key=lambda x: x[0])
-        
+
         # Filter for best match logic
         # If we have very close matches (e.g. exact overlap), prefer Micro
         best_dist = candidates[0][0]
@@ -101,25 +306,65 @@ class LoreManager:
             
         return candidates[0][1]
 
+    def get_nearest_locations(self, x, y, continent, k=1, max_distance=None):
+        """Les `k` lieux les plus proches sur un continent : [(distance, lieu), ...] triés par distance."""
+        indexed = self._grid(continent)
+        if not indexed:
+            return []
+        grid, table = indexed
+        return [(dist, table[row]) for dist, row in grid.nearest(x, y, k, max_distance)]
+
+    def _get_facets(self):
+        """
+        Facettes et vues triées, calculées une fois par jeu de lieux :
+        un seul tri (ville, lieu), puis répartition par (continent, type)
+        qui conserve l'ordre. Invalidées par set_project / load_lore.
+        """
+        stamp = (id(self.locations), len(self.locations))
+        if self._facets is not None and self._facets_stamp == stamp:
+            return self._facets
+
+        # Sort by City then Place for better readability
+        ordered = sorted(self.locations, key=lambda x: (x.get("city") or "", x.get("place") or x.get("name") or ""))
+        views = {(None, None): []}
+        for loc in ordered:
+            continent = loc.get("continent") or None
+            loc_type = loc.get("type") or None
+            keys = {(None, None), (continent, None), (None, loc_type), (continent, loc_type)}
+            for key in keys:
+                views.setdefault(key, []).append(loc)
+
+        self._facets = {
+            "continents": tuple(sorted(set(loc["continent"] for loc in self.locations if loc.get("continent")))),
+            "types": tuple(sorted(set(loc.get("type", "Unknown") for loc in self.locations))),
+            "views": {key: tuple(view) for key, view in views.items()},
+        }
+        self._facets_stamp = stamp
+        return self._facets
+
+    def get_distances(self, x, y, continent):
+        """
+        Distances de (x, y) à tous les lieux d'un continent, en un seul calcul
+        sur les colonnes (vectorisé si NumPy est installé).
+        Retourne (lignes, distances) : `self.locations[ligne]` donne le lieu.
+        """
+        table = self.locations
+        rows = table.rows_of(continent)
+        return rows, table.distances(x, y, rows)
+
     def get_continents(self):
-        return sorted(list(set(loc["continent"] for loc in self.locations if loc.get("continent"))))
+        """Continents connus, triés (en mode paresseux : lus dans les en-têtes, sans charger les lieux)."""
+        if self._locations is None:
+            return sorted(set(c for header in self._headers.values() for c in header["continents"] if c))
+        return list(self._get_facets()["continents"])
 
     def get_location_types(self):
         """Returns a sorted list of unique location types."""
-        return sorted(list(set(loc.get("type", "Unknown") for loc in self.locations)))
+        return list(self._get_facets()["types"])
 
     def get_locations(self, continent=None, type_filter=None):
-        """Returns a list of locations filtered by continent and type."""
-        filtered = self.locations
-        
-        if continent:
-            filtered = [loc for loc in filtered if loc.get("continent") == continent]
-            
-        if type_filter:
-            filtered = [loc for loc in filtered if loc.get("type") == type_filter]
-            
-        # Sort by City then Place for better readability
-        filtered.sort(key=lambda x: (x.get("city") or "", x.get("place") or x.get("name") or ""))
-        return filtered
-
-
+        """
+        Returns a list of locations filtered by continent and type, sorted by city then place.
+        Copie d'une vue précalculée (sans nouveau tri) : l'appelant peut la modifier.
+        """
+        return list(self._get_facets()["views"].get((continent or None, type_filter or None), ()))
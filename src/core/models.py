@@ -225,24 +225,205 @@ class ProjectModel:
     quests: Dict[str, QuestModel] = field(default_factory=dict)
     locations: Dict[str, LocationModel] = field(default_factory=dict)
 
+    # Index incrémentaux (type -> ids, liens sortants / entrants par nœud).
+    # Maintenus par add_node / remove_node / add_edge / remove_edge ; si nodes
+    # ou edges sont ajoutés / retirés directement, ils sont reconstruits à la
+    # lecture. Une modification sur place (lien reciblé, choix édité, type de
+    # nœud changé) n'est pas détectable : appeler mark_modified().
+    _nodes_by_type: Dict[NodeType, Dict[str, None]] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _outgoing: Dict[str, Dict[int, List[EdgeModel]]] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _incoming: Dict[str, List[EdgeModel]] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _index_stamp: Optional[tuple] = field(default=None, init=False, repr=False, compare=False)
+    # Index scène de retour -> quêtes (construit à la première lecture)
+    _quests_by_return_scene: Dict[str, Dict[str, None]] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _quest_return_scene: Dict[str, str] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _quest_index_stamp: Optional[tuple] = field(default=None, init=False, repr=False, compare=False)
+    _quest_index_version: int = field(default=0, init=False, repr=False, compare=False)
+    # Révision du projet : incrémentée par chaque mutateur et par mark_modified()
+    _revision: int = field(default=0, init=False, repr=False, compare=False)
+
     def add_node(self, node: NodeModel):
+        in_sync = self._indexes_in_sync()
+        previous = self.nodes.get(node.id)
         self.nodes[node.id] = node
-        self.last_modified = time.time()
+        if in_sync:
+            if previous is not None:
+                self._nodes_by_type.get(previous.type, {}).pop(previous.id, None)
+            self._nodes_by_type.setdefault(node.type, {})[node.id] = None
+            self._stamp_indexes()
+        self._touch()
 
     def remove_node(self, node_id: str):
         if node_id in self.nodes:
-            del self.nodes[node_id]
-            # Supprimer aussi les liens associés
-            self.edges = [
-                e for e in self.edges
-                if e.start_node_id != node_id and e.end_node_id != node_id
-            ]
-            self.last_modified = time.time()
+            self._ensure_indexes()
+            node = self.nodes.pop(node_id)
+            self._nodes_by_type.get(node.type, {}).pop(node_id, None)
+
+            # Supprimer aussi les liens associés (seulement ceux du nœud, via les index)
+            attached = [e for edges in self._outgoing.get(node_id, {}).values() for e in edges]
+            attached += [e for e in self._incoming.get(node_id, []) if e.start_node_id != node_id]
+            for edge in attached:
+                self._unindex_edge(edge)
+                self.edges.remove(edge)
+            self._stamp_indexes()
+            self._touch()
 
     def add_edge(self, edge: EdgeModel):
+        in_sync = self._indexes_in_sync()
         self.edges.append(edge)
+        if in_sync:
+            self._index_edge(edge)
+            self._stamp_indexes()
+        self._touch()
+
+    def remove_edge(self, edge: EdgeModel):
+        if edge in self.edges:
+            in_sync = self._indexes_in_sync()
+            self.edges.remove(edge)
+            if in_sync:
+                self._unindex_edge(edge)
+                self._stamp_indexes()
+            self._touch()
+
+    # --- Requêtes indexées ---
+    def get_nodes_by_type(self, node_type: NodeType) -> List[NodeModel]:
+        self._ensure_indexes()
+        return [self.nodes[node_id] for node_id in self._nodes_by_type.get(node_type, ())]
+
+    def get_start_node(self) -> Optional[NodeModel]:
+        """Premier nœud START (sinon le premier nœud du projet, sinon None)."""
+        self._ensure_indexes()
+        for node_id in self._nodes_by_type.get(NodeType.START, ()):
+            return self.nodes[node_id]
+        return next(iter(self.nodes.values()), None)
+
+    def get_outgoing_edges(self, node_id: str, socket_index: Optional[int] = None) -> List[EdgeModel]:
+        """Liens sortants d'un nœud, triés par socket (ou ceux d'un socket donné)."""
+        self._ensure_indexes()
+        by_socket = self._outgoing.get(node_id)
+        if not by_socket:
+            return []
+        if socket_index is not None:
+            return list(by_socket.get(socket_index, ()))
+        return [e for socket in sorted(by_socket) for e in by_socket[socket]]
+
+    def get_incoming_edges(self, node_id: str) -> List[EdgeModel]:
+        self._ensure_indexes()
+        return list(self._incoming.get(node_id, ()))
+
+    def get_quests_returned_at(self, node_id: str) -> List[QuestModel]:
+        """Quêtes dont la scène de validation (return_scene_id) est ce nœud."""
+        self._ensure_quest_index()
+        quests = []
+        for quest_id in self._quests_by_return_scene.get(node_id, ()):
+            quest = self.quests.get(quest_id)
+            if quest is not None and quest.return_scene_id == node_id:
+                quests.append(quest)
+        return quests
+
+    def reindex_quest(self, quest_id: str):
+        """Met à jour l'index des scènes de retour pour une quête modifiée, ajoutée ou supprimée."""
+        self._revision += 1
+        if self._quest_index_stamp != self._current_quest_stamp():
+            self._quest_index_stamp = None
+            self._quest_index_version += 1
+            return
+        previous = self._quest_return_scene.pop(quest_id, None)
+        if previous:
+            self._quests_by_return_scene.get(previous, {}).pop(quest_id, None)
+        quest = self.quests.get(quest_id)
+        if quest is not None and quest.return_scene_id:
+            self._quest_return_scene[quest_id] = quest.return_scene_id
+            self._quests_by_return_scene.setdefault(quest.return_scene_id, {})[quest_id] = None
+        self._quest_index_stamp = self._current_quest_stamp()
+        self._quest_index_version += 1
+
+    def invalidate_quest_index(self):
+        """Force la reconstruction de l'index des quêtes (ex: après un Undo/Redo)."""
+        self._quest_index_stamp = None
+        self._quest_index_version += 1
+        self._revision += 1
+
+    @property
+    def quest_index_version(self) -> int:
+        """Change à chaque modification connue de l'index des quêtes."""
+        self._ensure_quest_index()
+        return self._quest_index_version
+
+    @property
+    def revision(self) -> int:
+        """Change à chaque modification connue du projet (mutateurs, mark_modified)."""
+        return self._revision
+
+    def mark_modified(self):
+        """
+        Signale une modification faite sur place (lien reciblé, choix ou quête
+        édités) : index reconstruits à la prochaine lecture, et les caches qui
+        suivent `revision` (choix du StoryManager) sont invalidés.
+        """
+        self._index_stamp = None
+        self.invalidate_quest_index()
         self.last_modified = time.time()
 
+    def _touch(self):
+        self._revision += 1
+        self.last_modified = time.time()
+
+    # --- Maintenance des index ---
+    def _current_stamp(self) -> tuple:
+        return (len(self.nodes), len(self.edges), id(self.nodes), id(self.edges))
+
+    def _indexes_in_sync(self) -> bool:
+        return self._index_stamp == self._current_stamp()
+
+    def _stamp_indexes(self):
+        self._index_stamp = self._current_stamp()
+
+    def _ensure_indexes(self):
+        if not self._indexes_in_sync():
+            self.rebuild_indexes()
+
+    def rebuild_indexes(self):
+        """Reconstruit tous les index (O(N + E)) ; appelé automatiquement si nécessaire."""
+        self._nodes_by_type = {}
+        for node in self.nodes.values():
+            self._nodes_by_type.setdefault(node.type, {})[node.id] = None
+        self._outgoing = {}
+        self._incoming = {}
+        for edge in self.edges:
+            self._index_edge(edge)
+        self._stamp_indexes()
+
+    def _current_quest_stamp(self) -> tuple:
+        return (len(self.quests), id(self.quests))
+
+    def _ensure_quest_index(self):
+        if self._quest_index_stamp == self._current_quest_stamp():
+            return
+        self._quests_by_return_scene = {}
+        self._quest_return_scene = {}
+        for quest in self.quests.values():
+            if quest.return_scene_id:
+                self._quest_return_scene[quest.id] = quest.return_scene_id
+                self._quests_by_return_scene.setdefault(quest.return_scene_id, {})[quest.id] = None
+        self._quest_index_stamp = self._current_quest_stamp()
+        self._quest_index_version += 1
+
+    def _index_edge(self, edge: EdgeModel):
+        self._outgoing.setdefault(edge.start_node_id, {}).setdefault(edge.start_socket_index, []).append(edge)
+        self._incoming.setdefault(edge.end_node_id, []).append(edge)
+
+    def _unindex_edge(self, edge: EdgeModel):
+        by_socket = self._outgoing.get(edge.start_node_id, {})
+        socket_edges = by_socket.get(edge.start_socket_index, [])
+        if edge in socket_edges:
+            socket_edges.remove(edge)
+            if not socket_edges:
+                del by_socket[edge.start_socket_index]
+        incoming = self._incoming.get(edge.end_node_id, [])
+        if edge in incoming:
+            incoming.remove(edge)
+
     def add_group(self, group: GroupModel):
         self.groups[group.id] = group
         self.last_modified = time.time()
@@ -299,6 +480,9 @@ class ProjectModel:
             edge = EdgeModel.from_dict(edge_dict)
             project.edges.append(edge)
 
+        # Index construits une fois au chargement (puis maintenus incrémentalement)
+        project.rebuild_indexes()
+
         # Reconstitution des groupes
         for group_dict in graph_data.get("groups", []):
             group = GroupModel.from_dict(group_dict)
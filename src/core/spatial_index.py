@@ -0,0 +1,160 @@
+# src/core/spatial_index.py
+import math
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Nombre moyen de points visé par cellule de la grille
+TARGET_POINTS_PER_CELL = 4
+# Au-delà de (cellules occupées x ce facteur) cellules à lire, un parcours
+# direct des cellules occupées (ou des points) coûte moins cher
+MAX_SCAN_FACTOR = 4
+
+
+class SpatialGrid:
+    """
+    Grille uniforme : cellule (i, j) -> rangs d'insertion des points
+    (array('I')) ; coordonnées en colonnes array('d'), valeurs dans une liste
+    (ou un array('q') si ce sont des entiers, ex: numéros de ligne).
+
+    La taille de cellule est déduite de l'emprise et du nombre de points
+    (~TARGET_POINTS_PER_CELL par cellule) : une recherche dans un rayon ne lit
+    que les cellules qui recouvrent le cercle, et la recherche du plus proche
+    parcourt des anneaux de cellules de plus en plus larges. Pour des lieux
+    répartis sur une carte, le coût par requête ne dépend plus du nombre total
+    de points.
+
+    Les distances sont celles de l'ancien parcours linéaire
+    (math.sqrt(dx**2 + dy**2)) et les égalités sont départagées par l'ordre
+    d'insertion, comme un tri stable sur la liste d'origine.
+    """
+
+    def __init__(self, points: Iterable[Tuple[float, float, Any]] = (), cell_size: Optional[float] = None):
+        points = list(points)
+        self._xs = array('d', (p[0] for p in points))
+        self._ys = array('d', (p[1] for p in points))
+        self._values = [p[2] for p in points]
+        if all(type(value) is int for value in self._values):
+            # Numéros de ligne d'une table : tableau compact
+            self._values = array('q', self._values)
+        self._cells: Dict[Tuple[int, int], array] = {}
+        self._count = len(points)
+        self.cell_size = cell_size or self._auto_cell_size(points)
+        # Emprise en cellules : borne la recherche du plus proche
+        self._min_cell = self._max_cell = (0, 0)
+
+        size = self.cell_size
+        for rank in range(self._count):
+            key = (math.floor(self._xs[rank] / size), math.floor(self._ys[rank] / size))
+            cell = self._cells.get(key)
+            if cell is None:
+                cell = self._cells[key] = array('I')
+            cell.append(rank)
+        if self._cells:
+            xs = [key[0] for key in self._cells]
+            ys = [key[1] for key in self._cells]
+            self._min_cell = (min(xs), min(ys))
+            self._max_cell = (max(xs), max(ys))
+
+    @staticmethod
+    def _auto_cell_size(points: List[Tuple[float, float, Any]]) -> float:
+        if len(points) < 2:
+            return 1.0
+        xs = [p[0] for p in points]
+        ys = [p[1] for p in points]
+        width, height = max(xs) - min(xs), max(ys) - min(ys)
+        span = max(width, height)
+        if span <= 0:
+            # Points tous confondus : une seule cellule
+            return 1.0
+        size = math.sqrt(width * height * TARGET_POINTS_PER_CELL / len(points))
+        # Points alignés (surface nulle ou presque) : découpage de la plus grande
+        # dimension seulement, jamais plus fin que ~TARGET_POINTS_PER_CELL par cellule
+        return max(size, span * TARGET_POINTS_PER_CELL / len(points))
+
+    def _scan_limit(self) -> int:
+        return MAX_SCAN_FACTOR * len(self._cells) + 9
+
+    def __len__(self) -> int:
+        return self._count
+
+    def within(self, x: float, y: float, radius: float) -> List[Tuple[float, Any]]:
+        """Points à une distance <= radius, triés par (distance, rang d'insertion) : [(distance, valeur), ...]."""
+        size = self.cell_size
+        found = []
+        cells, xs, ys = self._cells, self._xs, self._ys
+        i0, i1 = math.floor((x - radius) / size), math.floor((x + radius) / size)
+        j0, j1 = math.floor((y - radius) / size), math.floor((y + radius) / size)
+        if (i1 - i0 + 1) * (j1 - j0 + 1) > self._scan_limit():
+            # Rayon immense devant la grille : on ne lit que les cellules occupées
+            keys = [key for key in cells if i0 <= key[0] <= i1 and j0 <= key[1] <= j1]
+        else:
+            keys = [(i, j) for i in range(i0, i1 + 1) for j in range(j0, j1 + 1)]
+        for key in keys:
+            for rank in cells.get(key, ()):
+                dist = math.sqrt((xs[rank] - x) ** 2 + (ys[rank] - y) ** 2)
+                if dist <= radius:
+                    found.append((dist, rank))
+        found.sort()
+        values = self._values
+        return [(dist, values[rank]) for dist, rank in found]
+
+    def nearest(self, x: float, y: float, k: int = 1,
+                max_distance: Optional[float] = None) -> List[Tuple[float, Any]]:
+        """
+        Les `k` points les plus proches (optionnellement à distance <= max_distance),
+        triés par (distance, rang d'insertion).
+        """
+        if not self._cells or k <= 0:
+            return []
+        size = self.cell_size
+        ci, cj = math.floor(x / size), math.floor(y / size)
+        # Anneau au-delà duquel il n'y a plus aucune cellule occupée
+        max_ring = max(abs(ci - self._min_cell[0]), abs(ci - self._max_cell[0]),
+                       abs(cj - self._min_cell[1]), abs(cj - self._max_cell[1]))
+        found = []
+        xs, ys = self._xs, self._ys
+        ring = 0
+        while ring <= max_ring:
+            if (2 * ring + 1) ** 2 > self._scan_limit():
+                # Point loin de la grille : les anneaux seraient presque tous vides
+                return self._linear_nearest(x, y, k, max_distance)
+            for key in self._ring_cells(ci, cj, ring):
+                for rank in self._cells.get(key, ()):
+                    dist = math.sqrt((xs[rank] - x) ** 2 + (ys[rank] - y) ** 2)
+                    if max_distance is None or dist <= max_distance:
+                        found.append((dist, rank))
+            # Tout point hors des anneaux 0..ring est à plus de ring * size
+            if len(found) >= k:
+                found.sort()
+                if found[k - 1][0] < ring * size:
+                    break
+            if max_distance is not None and ring * size > max_distance:
+                break
+            ring += 1
+        found.sort()
+        values = self._values
+        return [(dist, values[rank]) for dist, rank in found[:k]]
+
+    def _linear_nearest(self, x: float, y: float, k: int,
+                        max_distance: Optional[float]) -> List[Tuple[float, Any]]:
+        xs, ys = self._xs, self._ys
+        found = []
+        for rank in range(self._count):
+            dist = math.sqrt((xs[rank] - x) ** 2 + (ys[rank] - y) ** 2)
+            if max_distance is None or dist <= max_distance:
+                found.append((dist, rank))
+        found.sort()
+        values = self._values
+        return [(dist, values[rank]) for dist, rank in found[:k]]
+
+    @staticmethod
+    def _ring_cells(ci: int, cj: int, ring: int):
+        if ring == 0:
+            yield (ci, cj)
+            return
+        for i in range(ci - ring, ci + ring + 1):
+            yield (i, cj - ring)
+            yield (i, cj + ring)
+        for j in range(cj - ring + 1, cj + ring):
+            yield (ci - ring, j)
+            yield (ci + ring, j)
@@ -13,6 +13,7 @@ from src.editor.graph.edge_item import EdgeItem
 from src.editor.graph.group_item import GroupItem
 from src.core.models import ProjectModel, NodeModel, GroupModel
 from src.core.commands import MoveNodeCommand
+from src.core.graph_analysis import StoryGraph, LINK_CHOICE
 
 
 class NodeScene(QGraphicsScene):
@@ -130,54 +131,38 @@ class NodeScene(QGraphicsScene):
 
         if not self.project:
             return
+        # Les choix ont pu être édités sur place (cible, condition) : index et caches à jour
+        self.project.mark_modified()
 
-        # 2. Analyser les connexions requises
-        # Set of (id1, id2) tuples to track created connections and avoid duplicates
-        connections = set()
-        
-        # Helper to get sorted pair
-        def get_pair(id1, id2):
-            return tuple(sorted((id1, id2)))
+        # 2. Analyser les connexions requises (graphe partagé avec l'analyse statique)
+        graph = StoryGraph.from_project(self.project)
+        link_kinds = (LINK_CHOICE,)
 
-        # Collect all directed links: A -> B
-        directed_links = [] # List of (source_id, target_id)
-        
-        for node_id, node_model in self.project.nodes.items():
-            choices = node_model.content.get("choices", [])
-            for choice in choices:
-                target_id = choice.get("target_node_id")
-                if target_id and target_id in self.project.nodes:
-                    directed_links.append((node_id, target_id))
-
-        # Process links
+        # Process links (une seule flèche par paire, bidirectionnelle si A -> B et B -> A)
         processed_pairs = set()
-        
-        for src_id, dst_id in directed_links:
+
+        for src_id, dst_id in graph.iter_pairs(link_kinds):
             if src_id == dst_id: continue # Ignore self-loops for now or handle differently
-            
-            pair = get_pair(src_id, dst_id)
+
+            pair = tuple(sorted((src_id, dst_id)))
             if pair in processed_pairs:
                 continue
-            
-            # Check if it's bidirectional
-            # It is if there is also a link dst_id -> src_id
-            is_bi = (dst_id, src_id) in directed_links and (src_id, dst_id) in directed_links
-            
+
+            is_bi = graph.has_link(dst_id, src_id, link_kinds)
+
             src_item = self.node_map.get(src_id)
             dst_item = self.node_map.get(dst_id)
-            
+
             if src_item and dst_item:
                 edge = EdgeItem(src_item, dst_item, is_bidirectional=is_bi)
                 self.addItem(edge)
                 self.edges.append(edge)
-                
+
                 src_item.add_edge(edge)
                 dst_item.add_edge(edge)
-            
+
             processed_pairs.add(pair)
-            
 
-            
         # 3. Update all node previews (to reflect potential title changes in targets)
         for item in self.node_map.values():
             item.update_preview()
@@ -24,6 +24,9 @@ class DatabasePanel(QWidget):
 
     def on_data_changed(self):
         """Called when Undo/Redo operations modify the data."""
+        # Undo/Redo peut remplacer n'importe quelle quête : index reconstruit à la prochaine lecture
+        if self.project_model:
+            self.project_model.invalidate_quest_index()
         self._refresh_items_list()
         self._refresh_quests_list()
         self._refresh_locations_list()
@@ -446,6 +449,7 @@ class DatabasePanel(QWidget):
              scene_id = self.quest_return_scene.currentText()
 
         quest.return_scene_id = scene_id
+        self.project_model.reindex_quest(quest.id)
         
         quest.loot["xp"] = self.loot_xp.value()
         quest.loot["gold"] = self.loot_gold.value()
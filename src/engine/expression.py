@@ -0,0 +1,334 @@
+# src/engine/expression.py
+import ast
+import operator
+import re
+from collections.abc import Mapping, Sequence
+from typing import Any, Callable, FrozenSet
+
+
+# Motifs de pré-traitement des conditions ($var et ${var} -> var)
+BRACED_VAR_PATTERN = re.compile(r'\$\{([a-zA-Z0-9_]+)\}')
+DOLLAR_VAR_PATTERN = re.compile(r'\$([a-zA-Z0-9_]+)')
+
+# Exposant maximal accepté pour '**' (évite les calculs démesurés)
+MAX_POWER_EXPONENT = 64
+# Taille maximale (en bits) d'un entier produit par '**' : les puissances
+# enchaînées ((10**64)**64)**64 restent sous l'exposant maximal
+MAX_POWER_BITS = 4096
+# Longueur maximale d'une chaîne / liste produite par répétition ('*')
+MAX_REPEAT_LENGTH = 100_000
+
+
+class ExpressionError(Exception):
+    """Expression invalide ou construction non autorisée."""
+
+
+_BIN_OPS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+}
+
+_UNARY_OPS = {
+    ast.Not: operator.not_,
+    ast.USub: operator.neg,
+    ast.UAdd: operator.pos,
+}
+
+_COMPARE_OPS = {
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+    ast.In: lambda a, b: a in b,
+    ast.NotIn: lambda a, b: a not in b,
+    ast.Is: operator.is_,
+    ast.IsNot: operator.is_not,
+}
+
+
+def _power(base, exponent):
+    if isinstance(exponent, (int, float)) and abs(exponent) > MAX_POWER_EXPONENT:
+        raise ExpressionError(f"Exposant trop grand : {exponent}")
+    if isinstance(base, int) and isinstance(exponent, int) and abs(base).bit_length() * exponent > MAX_POWER_BITS:
+        raise ExpressionError(f"Puissance trop grande : {abs(base).bit_length()} bits ** {exponent}")
+    return base ** exponent
+
+
+def _multiply(left, right):
+    # "a" * n, [0] * n : taille du résultat bornée (le pliage de constantes
+    # l'évaluerait dès la compilation)
+    for seq, count in ((left, right), (right, left)):
+        if isinstance(seq, (str, bytes, list, tuple)) and isinstance(count, int):
+            if len(seq) * count > MAX_REPEAT_LENGTH:
+                raise ExpressionError(f"Répétition trop grande : {len(seq)} x {count}")
+    return left * right
+
+
+_BIN_OPS[ast.Pow] = _power
+_BIN_OPS[ast.Mult] = _multiply
+
+
+def _get_item(container, key):
+    """Accès indexé : dictionnaires (clé), listes / tuples / chaînes (index)."""
+    if isinstance(container, (Mapping, Sequence)):
+        return container[key]
+    raise ExpressionError(f"Accès indexé non supporté sur {type(container).__name__}")
+
+
+def _get_field(container, name):
+    """Accès 'attribut' : uniquement une clé de dictionnaire (coords.x -> coords['x'])."""
+    if isinstance(container, Mapping):
+        return container[name]
+    raise ExpressionError(f"Attribut '{name}' non supporté sur {type(container).__name__}")
+
+
+class _Node:
+    """Nœud compilé : fonction d'évaluation + variables lues (+ valeur si constante)."""
+    __slots__ = ("fn", "names", "is_constant", "value")
+
+    def __init__(self, fn, names=frozenset(), is_constant=False, value=None):
+        self.fn = fn
+        self.names = names
+        self.is_constant = is_constant
+        self.value = value
+
+
+def _constant(value) -> _Node:
+    return _Node(lambda lookup: value, frozenset(), True, value)
+
+
+def _fold(node: _Node) -> _Node:
+    """Pliage de constantes : un sous-arbre sans variable est évalué à la compilation."""
+    if node.names or node.is_constant:
+        return node
+    try:
+        return _constant(node.fn(None))
+    except Exception:
+        # L'erreur (ex: division par zéro) sera levée à l'évaluation
+        return node
+
+
+class CompiledExpression:
+    """
+    Expression analysée une seule fois.
+    `evaluate(lookup)` ne fait plus que lire les variables (via `lookup(nom)`)
+    et exécuter l'arbre, en court-circuitant 'and' / 'or'.
+    """
+    __slots__ = ("source", "names", "is_constant", "_fn")
+
+    def __init__(self, source: str, node: _Node):
+        self.source = source
+        self.names: FrozenSet[str] = node.names
+        self.is_constant = node.is_constant
+        self._fn = node.fn
+
+    def evaluate(self, lookup: Callable[[str], Any]) -> Any:
+        return self._fn(lookup)
+
+
+class _Compiler:
+    def build(self, node) -> _Node:
+        method = getattr(self, f"_build_{type(node).__name__}", None)
+        if method is None:
+            raise ExpressionError(f"Construction non autorisée : {type(node).__name__}")
+        return method(node)
+
+    def _build_Expression(self, node):
+        return self.build(node.body)
+
+    def _build_Constant(self, node):
+        return _constant(node.value)
+
+    def _build_Name(self, node):
+        name = node.id
+        return _Node(lambda lookup: lookup(name), frozenset((name,)))
+
+    def _build_BoolOp(self, node):
+        is_and = isinstance(node.op, ast.And)
+        operands = []
+        for value in node.values:
+            built = self.build(value)
+            if built.is_constant:
+                decisive = (not built.value) if is_and else bool(built.value)
+                if decisive:
+                    # Les opérandes suivants ne seront jamais évalués
+                    operands.append(built)
+                    break
+                if value is not node.values[-1]:
+                    # Opérande neutre : ignoré, sauf s'il est le dernier
+                    continue
+            operands.append(built)
+
+        if len(operands) == 1:
+            return operands[0]
+
+        fns = tuple(op.fn for op in operands)
+        names = frozenset().union(*(op.names for op in operands))
+
+        if is_and:
+            def fn(lookup):
+                result = True
+                for f in fns:
+                    result = f(lookup)
+                    if not result:
+                        return result
+                return result
+        else:
+            def fn(lookup):
+                result = False
+                for f in fns:
+                    result = f(lookup)
+                    if result:
+                        return result
+                return result
+
+        if all(op.is_constant for op in operands):
+            return _fold(_Node(fn))
+        return _Node(fn, names)
+
+    def _build_UnaryOp(self, node):
+        op = _UNARY_OPS.get(type(node.op))
+        if op is None:
+            raise ExpressionError(f"Opérateur non autorisé : {type(node.op).__name__}")
+        operand = self.build(node.operand)
+        operand_fn = operand.fn
+        return _fold(_Node(lambda lookup: op(operand_fn(lookup)), operand.names))
+
+    def _build_BinOp(self, node):
+        op = _BIN_OPS.get(type(node.op))
+        if op is None:
+            raise ExpressionError(f"Opérateur non autorisé : {type(node.op).__name__}")
+        left, right = self.build(node.left), self.build(node.right)
+        left_fn, right_fn = left.fn, right.fn
+        return _fold(_Node(lambda lookup: op(left_fn(lookup), right_fn(lookup)), left.names | right.names))
+
+    def _build_Compare(self, node):
+        ops = []
+        for op_node in node.ops:
+            op = _COMPARE_OPS.get(type(op_node))
+            if op is None:
+                raise ExpressionError(f"Comparaison non autorisée : {type(op_node).__name__}")
+            ops.append(op)
+
+        operands = [self.build(node.left)] + [self.build(c) for c in node.comparators]
+        names = frozenset().union(*(o.names for o in operands))
+        fns = tuple(o.fn for o in operands)
+
+        if len(ops) == 1:
+            op, left_fn, right_fn = ops[0], fns[0], fns[1]
+            return _fold(_Node(lambda lookup: op(left_fn(lookup), right_fn(lookup)), names))
+
+        pairs = tuple(zip(ops, fns[1:]))
+        first_fn = fns[0]
+
+        def fn(lookup):
+            # Comparaisons chaînées : a < b < c, chaque opérande évalué une fois
+            left = first_fn(lookup)
+            for op, right_fn in pairs:
+                right = right_fn(lookup)
+                if not op(left, right):
+                    return False
+                left = right
+            return True
+
+        return _fold(_Node(fn, names))
+
+    def _build_IfExp(self, node):
+        test, body, orelse = self.build(node.test), self.build(node.body), self.build(node.orelse)
+        if test.is_constant:
+            return body if test.value else orelse
+        test_fn, body_fn, orelse_fn = test.fn, body.fn, orelse.fn
+        return _Node(lambda lookup: body_fn(lookup) if test_fn(lookup) else orelse_fn(lookup),
+                     test.names | body.names | orelse.names)
+
+    def _build_Attribute(self, node):
+        if node.attr.startswith("_"):
+            raise ExpressionError(f"Attribut privé non autorisé : {node.attr}")
+        value = self.build(node.value)
+        value_fn, attr = value.fn, node.attr
+        return _fold(_Node(lambda lookup: _get_field(value_fn(lookup), attr), value.names))
+
+    def _build_Subscript(self, node):
+        value, key = self.build(node.value), self.build(node.slice)
+        value_fn, key_fn = value.fn, key.fn
+        return _fold(_Node(lambda lookup: _get_item(value_fn(lookup), key_fn(lookup)), value.names | key.names))
+
+    def _build_Call(self, node):
+        # Seule exception aux appels : dict.get(clé[, défaut]), idiome courant des conditions
+        func = node.func
+        if (not isinstance(func, ast.Attribute) or func.attr != "get"
+                or node.keywords or not 1 <= len(node.args) <= 2):
+            raise ExpressionError("Appel de fonction non autorisé (seul dict.get(clé, défaut) est accepté)")
+
+        container = self.build(func.value)
+        args = [self.build(a) for a in node.args]
+        container_fn = container.fn
+        arg_fns = tuple(a.fn for a in args)
+        names = container.names.union(*(a.names for a in args))
+
+        def fn(lookup):
+            target = container_fn(lookup)
+            if not isinstance(target, Mapping):
+                raise ExpressionError(f".get() non supporté sur {type(target).__name__}")
+            return target.get(*(f(lookup) for f in arg_fns))
+
+        return _fold(_Node(fn, names))
+
+    def _build_Index(self, node):
+        # Python < 3.9 : l'index est enveloppé dans ast.Index
+        return self.build(node.value)
+
+    def _build_sequence(self, node, factory):
+        items = [self.build(e) for e in node.elts]
+        fns = tuple(i.fn for i in items)
+        names = frozenset().union(*(i.names for i in items))
+        return _fold(_Node(lambda lookup: factory(f(lookup) for f in fns), names))
+
+    def _build_List(self, node):
+        return self._build_sequence(node, list)
+
+    def _build_Tuple(self, node):
+        return self._build_sequence(node, tuple)
+
+    def _build_Set(self, node):
+        return self._build_sequence(node, frozenset)
+
+    def _build_Dict(self, node):
+        # {"a": 1} ; {**flags} (clé None) fusionne un dictionnaire
+        keys = [None if k is None else self.build(k) for k in node.keys]
+        values = [self.build(v) for v in node.values]
+        pairs = tuple((None if k is None else k.fn, v.fn) for k, v in zip(keys, values))
+        names = frozenset().union(*(v.names for v in values), *(k.names for k in keys if k is not None))
+
+        def fn(lookup):
+            result = {}
+            for key_fn, value_fn in pairs:
+                if key_fn is None:
+                    result.update(value_fn(lookup))
+                else:
+                    result[key_fn(lookup)] = value_fn(lookup)
+            return result
+
+        return _fold(_Node(fn, names))
+
+
+def preprocess_condition(condition: str) -> str:
+    """Accepte la syntaxe $var et ${var} en plus du nom nu."""
+    clean_condition = BRACED_VAR_PATTERN.sub(r'\1', condition)
+    return DOLLAR_VAR_PATTERN.sub(r'\1', clean_condition).strip()
+
+
+def compile_expression(condition: str) -> CompiledExpression:
+    """
+    Analyse une condition en arbre évaluable.
+    Lève SyntaxError (syntaxe) ou ExpressionError (construction interdite :
+    appels de fonction, lambdas, compréhensions...).
+    """
+    tree = ast.parse(preprocess_condition(condition), mode="eval")
+    return CompiledExpression(condition, _Compiler().build(tree))
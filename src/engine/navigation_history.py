@@ -0,0 +1,180 @@
+# src/engine/navigation_history.py
+import sys
+from collections import deque
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+# Profondeur par défaut de l'historique (nombre de nœuds retenus)
+DEFAULT_HISTORY_DEPTH = 1000
+# Longueur maximale d'un motif répété détecté (A -> B -> A -> B... : motif de 2)
+MAX_PATTERN_LENGTH = 4
+
+
+class NavigationHistory:
+    """
+    Historique de navigation borné (pile du bouton "Retour").
+
+    Tampon circulaire de `max_depth` nœuds : au-delà, les plus anciens sont
+    oubliés. Stockage compressé par plages : chaque entrée est un motif
+    (tuple d'ids internés) répété N fois, ce qui réduit les allers-retours
+    entre nœuds pivots (A, B, A, B... -> ((A, B), n)) à une seule entrée.
+
+    S'utilise comme une liste : append, pop, len, itération, index, égalité
+    avec une liste ; le format de sauvegarde reste la liste des ids
+    (`to_list`).
+    """
+
+    def __init__(self, node_ids: Iterable[str] = (), max_depth: Optional[int] = DEFAULT_HISTORY_DEPTH):
+        self._runs: "deque[List]" = deque()  # [motif, répétitions]
+        self._length = 0
+        self._max_depth = max_depth
+        for node_id in node_ids:
+            self.append(node_id)
+
+    # --- Configuration ---
+    @property
+    def max_depth(self) -> Optional[int]:
+        return self._max_depth
+
+    @max_depth.setter
+    def max_depth(self, value: Optional[int]):
+        self._max_depth = value
+        self._trim()
+
+    # --- Pile ---
+    def append(self, node_id: str):
+        node_id = sys.intern(node_id) if type(node_id) is str else node_id
+        runs = self._runs
+        last = runs[-1] if runs else None
+        if last is not None and len(last[0]) == 1 and last[0][0] == node_id:
+            last[1] += 1
+        else:
+            runs.append([(node_id,), 1])
+            self._fold_pattern()
+        self._length += 1
+        self._trim()
+
+    def _fold_pattern(self):
+        """Replie les dernières entrées isolées si elles répètent un motif (période 2 à MAX_PATTERN_LENGTH)."""
+        runs = self._runs
+        for size in range(2, MAX_PATTERN_LENGTH + 1):
+            if len(runs) < size + 1:
+                return
+            tail = [runs[-i] for i in range(size, 0, -1)]
+            if any(run[1] != 1 or len(run[0]) != 1 for run in tail):
+                continue
+            pattern = tuple(run[0][0] for run in tail)
+            previous = runs[-size - 1]
+            if previous[0] == pattern:
+                # ...(A, B) x n, A, B -> (A, B) x n+1
+                for _ in range(size):
+                    runs.pop()
+                previous[1] += 1
+                return
+            if len(runs) >= 2 * size:
+                before = [runs[-i] for i in range(2 * size, size, -1)]
+                if all(run[1] == 1 and len(run[0]) == 1 for run in before) \
+                        and tuple(run[0][0] for run in before) == pattern:
+                    # A, B, A, B -> (A, B) x 2
+                    for _ in range(2 * size):
+                        runs.pop()
+                    runs.append([pattern, 2])
+                    return
+
+    def pop(self) -> str:
+        """Retire et retourne le dernier nœud (bouton "Retour")."""
+        if not self._runs:
+            raise IndexError("pop from empty history")
+        runs = self._runs
+        pattern, count = runs[-1]
+        if count > 1:
+            runs[-1][1] -= 1
+        else:
+            runs.pop()
+        if len(pattern) > 1:
+            # Le dernier passage du motif est déplié, moins son dernier élément
+            runs.extend([(node_id,), 1] for node_id in pattern[:-1])
+        self._length -= 1
+        return pattern[-1]
+
+    def peek(self) -> Optional[str]:
+        """Dernier nœud de l'historique (None si vide)."""
+        return self._runs[-1][0][-1] if self._runs else None
+
+    def truncate(self, length: int):
+        """Ramène l'historique à ses `length` premiers nœuds (annulation d'une transition)."""
+        while self._length > max(0, length):
+            self.pop()
+
+    def clear(self):
+        self._runs.clear()
+        self._length = 0
+
+    def _trim(self):
+        if self._max_depth is None:
+            return
+        runs = self._runs
+        while self._length > self._max_depth:
+            pattern, count = runs[0]
+            if len(pattern) == 1:
+                excess = min(count, self._length - self._max_depth)
+                if excess == count:
+                    runs.popleft()
+                else:
+                    runs[0][1] -= excess
+                self._length -= excess
+                continue
+            # Premier élément d'un motif répété : le reste du motif est déplié
+            if count > 1:
+                runs[0][1] -= 1
+            else:
+                runs.popleft()
+            runs.extendleft([(node_id,), 1] for node_id in reversed(pattern[1:]))
+            self._length -= 1
+
+    # --- Lecture (compatibilité liste) ---
+    def __len__(self) -> int:
+        return self._length
+
+    def __bool__(self) -> bool:
+        return self._length > 0
+
+    def __iter__(self) -> Iterator[str]:
+        for pattern, count in self._runs:
+            for _ in range(count):
+                yield from pattern
+
+    def __reversed__(self) -> Iterator[str]:
+        for pattern, count in reversed(self._runs):
+            for _ in range(count):
+                yield from reversed(pattern)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.to_list()[index]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("history index out of range")
+        for pattern, count in self._runs:
+            span = len(pattern) * count
+            if index < span:
+                return pattern[index % len(pattern)]
+            index -= span
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, NavigationHistory):
+            return self._length == other._length and self.to_list() == other.to_list()
+        if isinstance(other, (list, tuple)):
+            return self._length == len(other) and self.to_list() == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"NavigationHistory({self.to_list()!r}, max_depth={self._max_depth})"
+
+    def to_list(self) -> List[str]:
+        """Format de sauvegarde : liste des ids, du plus ancien au plus récent."""
+        return list(self)
+
+    def runs(self) -> List[Tuple[Tuple[str, ...], int]]:
+        """Représentation compressée : [(motif, répétitions), ...]."""
+        return [(pattern, count) for pattern, count in self._runs]
@@ -0,0 +1,491 @@
+# src/engine/persistent.py
+"""
+Collections persistantes (immuables, à partage structurel) pour le VariableStore.
+
+- PMap : table de hachage HAMT (Hash Array Mapped Trie), 32 branches par niveau.
+- PVector : vecteur persistant (trie de 32 branches + tampon de queue).
+
+Une mise à jour renvoie une nouvelle collection en O(log32 n) en ne recopiant
+que le chemin modifié ; l'ancienne valeur reste valide et inchangée (observers,
+annulation, journal de modifications).
+
+Compromis : pour une petite table, recopier un dict (en C) est plus rapide
+qu'un chemin de HAMT (~0,5 µs contre ~4-7 µs par écriture jusqu'à quelques
+centaines de clés ; le point d'équilibre est vers 1000 clés). Une PMap de
+SMALL_MAP_SIZE clés au plus est donc un simple dict recopié à chaque
+écriture (jamais modifié sur place : instantanés toujours en O(1)) ; elle
+passe en HAMT au-delà. Le gain du HAMT porte sur les grosses tables
+(visites d'une longue partie) et sur le coût des instantanés / annulations,
+qui partagent la structure au lieu de recopier les collections.
+"""
+from collections.abc import Mapping, Sequence
+from typing import Any, Iterator
+
+_BITS = 5
+_WIDTH = 1 << _BITS
+_MASK = _WIDTH - 1
+_HASH_MASK = (1 << 64) - 1
+
+try:
+    _popcount = int.bit_count
+except AttributeError:  # Python < 3.10
+    def _popcount(value: int) -> int:
+        return bin(value).count("1")
+
+_MISSING = object()
+
+# Taille maximale d'une PMap stockée comme dict recopié (au-delà : HAMT)
+SMALL_MAP_SIZE = 512
+
+
+# --- PMap (HAMT) ---
+
+class _BitmapNode:
+    """Nœud interne : bitmap des fragments présents + entrées (paire (clé, valeur) ou sous-nœud)."""
+    __slots__ = ("bitmap", "entries")
+
+    def __init__(self, bitmap: int, entries: tuple):
+        self.bitmap = bitmap
+        self.entries = entries
+
+    def find(self, shift: int, h: int, key):
+        bit = 1 << ((h >> shift) & _MASK)
+        if not self.bitmap & bit:
+            return _MISSING
+        entry = self.entries[_popcount(self.bitmap & (bit - 1))]
+        if type(entry) is tuple:
+            k, v = entry
+            return v if (k is key or k == key) else _MISSING
+        return entry.find(shift + _BITS, h, key)
+
+    def assoc(self, shift: int, h: int, key, value):
+        """Retourne (nouveau nœud, clé ajoutée ?). Le nœud est inchangé si la valeur l'est."""
+        bit = 1 << ((h >> shift) & _MASK)
+        idx = _popcount(self.bitmap & (bit - 1))
+        entries = self.entries
+
+        if not self.bitmap & bit:
+            new_entries = entries[:idx] + ((key, value),) + entries[idx:]
+            return _BitmapNode(self.bitmap | bit, new_entries), True
+
+        entry = entries[idx]
+        if type(entry) is tuple:
+            k, v = entry
+            if k is key or k == key:
+                if v is value:
+                    return self, False
+                new_entry = (key, value)
+                added = False
+            else:
+                new_entry = _merge_pairs(shift + _BITS, entry, _hash(k), (key, value), h)
+                added = True
+        else:
+            new_entry, added = entry.assoc(shift + _BITS, h, key, value)
+            if new_entry is entry:
+                return self, False
+
+        return _BitmapNode(self.bitmap, entries[:idx] + (new_entry,) + entries[idx + 1:]), added
+
+    def without(self, shift: int, h: int, key):
+        """Retourne le nœud sans la clé (inchangé si absente, None s'il devient vide)."""
+        bit = 1 << ((h >> shift) & _MASK)
+        if not self.bitmap & bit:
+            return self
+        idx = _popcount(self.bitmap & (bit - 1))
+        entries = self.entries
+        entry = entries[idx]
+
+        if type(entry) is tuple:
+            k = entry[0]
+            if not (k is key or k == key):
+                return self
+            new_entry = None
+        else:
+            new_entry = entry.without(shift + _BITS, h, key)
+            if new_entry is entry:
+                return self
+            # Un sous-nœud réduit à une seule paire remonte dans le parent
+            single = new_entry.single_pair() if new_entry is not None else None
+            if single is not None:
+                new_entry = single
+
+        if new_entry is None:
+            bitmap = self.bitmap & ~bit
+            if not bitmap:
+                return None
+            return _BitmapNode(bitmap, entries[:idx] + entries[idx + 1:])
+        return _BitmapNode(self.bitmap, entries[:idx] + (new_entry,) + entries[idx + 1:])
+
+    def single_pair(self):
+        if len(self.entries) == 1 and type(self.entries[0]) is tuple:
+            return self.entries[0]
+        return None
+
+    def iter_pairs(self):
+        for entry in self.entries:
+            if type(entry) is tuple:
+                yield entry
+            else:
+                yield from entry.iter_pairs()
+
+
+class _CollisionNode:
+    """Clés distinctes ayant exactement le même hash."""
+    __slots__ = ("hash", "pairs")
+
+    def __init__(self, h: int, pairs: tuple):
+        self.hash = h
+        self.pairs = pairs
+
+    def _index(self, key) -> int:
+        for i, (k, _) in enumerate(self.pairs):
+            if k is key or k == key:
+                return i
+        return -1
+
+    def find(self, shift: int, h: int, key):
+        idx = self._index(key) if h == self.hash else -1
+        return self.pairs[idx][1] if idx >= 0 else _MISSING
+
+    def assoc(self, shift: int, h: int, key, value):
+        if h != self.hash:
+            # Le hash diverge : on insère ce nœud dans un nœud bitmap
+            node = _BitmapNode(1 << ((self.hash >> shift) & _MASK), (self,))
+            return node.assoc(shift, h, key, value)
+        idx = self._index(key)
+        if idx < 0:
+            return _CollisionNode(h, self.pairs + ((key, value),)), True
+        if self.pairs[idx][1] is value:
+            return self, False
+        return _CollisionNode(h, self.pairs[:idx] + ((key, value),) + self.pairs[idx + 1:]), False
+
+    def without(self, shift: int, h: int, key):
+        idx = self._index(key) if h == self.hash else -1
+        if idx < 0:
+            return self
+        pairs = self.pairs[:idx] + self.pairs[idx + 1:]
+        return _CollisionNode(h, pairs) if pairs else None
+
+    def single_pair(self):
+        return self.pairs[0] if len(self.pairs) == 1 else None
+
+    def iter_pairs(self):
+        return iter(self.pairs)
+
+
+def _hash(key) -> int:
+    return hash(key) & _HASH_MASK
+
+
+def _merge_pairs(shift: int, pair1, h1: int, pair2, h2: int):
+    """Crée le plus petit sous-arbre contenant deux paires de clés différentes."""
+    if h1 == h2:
+        return _CollisionNode(h1, (pair1, pair2))
+    frag1 = (h1 >> shift) & _MASK
+    frag2 = (h2 >> shift) & _MASK
+    if frag1 == frag2:
+        return _BitmapNode(1 << frag1, (_merge_pairs(shift + _BITS, pair1, h1, pair2, h2),))
+    if frag1 < frag2:
+        return _BitmapNode((1 << frag1) | (1 << frag2), (pair1, pair2))
+    return _BitmapNode((1 << frag1) | (1 << frag2), (pair2, pair1))
+
+
+_EMPTY_NODE = _BitmapNode(0, ())
+
+
+class PMap(Mapping):
+    """
+    Dictionnaire persistant. S'utilise en lecture comme un dict (get, [], in,
+    items...) ; les écritures renvoient une nouvelle PMap :
+        inv2 = inv.set("sword", 2)   # inv est inchangé
+    Jusqu'à SMALL_MAP_SIZE clés, `_small` est un dict recopié à chaque écriture ;
+    au-delà, `_small` vaut None et les paires sont dans le HAMT `_root`.
+    """
+    __slots__ = ("_root", "_size", "_small")
+
+    def __init__(self, initial: Any = None):
+        self._root = _EMPTY_NODE
+        self._size = 0
+        self._small = {}
+        if initial:
+            small = dict(initial.items() if isinstance(initial, Mapping) else initial)
+            if len(small) <= SMALL_MAP_SIZE:
+                self._small, self._size = small, len(small)
+            else:
+                self._root, self._size = self._build_root(small.items())
+                self._small = None
+
+    @staticmethod
+    def _build_root(items):
+        root, size = _EMPTY_NODE, 0
+        for key, value in items:
+            root, added = root.assoc(0, _hash(key), key, value)
+            size += added
+        return root, size
+
+    @classmethod
+    def _make(cls, root, size) -> 'PMap':
+        pmap = cls.__new__(cls)
+        pmap._root = root
+        pmap._size = size
+        pmap._small = None
+        return pmap
+
+    @classmethod
+    def _make_small(cls, small: dict) -> 'PMap':
+        pmap = cls.__new__(cls)
+        pmap._root = _EMPTY_NODE
+        pmap._size = len(small)
+        pmap._small = small
+        return pmap
+
+    # Lecture
+    def __getitem__(self, key):
+        if self._small is not None:
+            return self._small[key]
+        value = self._root.find(0, _hash(key), key)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def get(self, key, default=None):
+        if self._small is not None:
+            return self._small.get(key, default)
+        value = self._root.find(0, _hash(key), key)
+        return default if value is _MISSING else value
+
+    def __contains__(self, key) -> bool:
+        if self._small is not None:
+            return key in self._small
+        return self._root.find(0, _hash(key), key) is not _MISSING
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator:
+        if self._small is not None:
+            yield from self._small
+            return
+        for key, _ in self._root.iter_pairs():
+            yield key
+
+    def items(self):
+        if self._small is not None:
+            return list(self._small.items())
+        return list(self._root.iter_pairs())
+
+    # Écriture persistante
+    def set(self, key, value) -> 'PMap':
+        small = self._small
+        if small is not None:
+            if small.get(key, _MISSING) is value:
+                return self
+            if key in small or len(small) < SMALL_MAP_SIZE:
+                small = small.copy()
+                small[key] = value
+                return PMap._make_small(small)
+            # La table dépasse SMALL_MAP_SIZE : passage en HAMT
+            root, size = self._build_root(small.items())
+            root, added = root.assoc(0, _hash(key), key, value)
+            return PMap._make(root, size + added)
+        root, added = self._root.assoc(0, _hash(key), key, value)
+        if root is self._root:
+            return self
+        return PMap._make(root, self._size + added)
+
+    def delete(self, key) -> 'PMap':
+        """Retourne une PMap sans la clé (identique si la clé est absente)."""
+        small = self._small
+        if small is not None:
+            if key not in small:
+                return self
+            small = small.copy()
+            del small[key]
+            return PMap._make_small(small)
+        root = self._root.without(0, _hash(key), key)
+        if root is self._root:
+            return self
+        return PMap._make(root if root is not None else _EMPTY_NODE, self._size - 1)
+
+    def update(self, mapping) -> 'PMap':
+        result = self
+        for key, value in (mapping.items() if isinstance(mapping, Mapping) else mapping):
+            result = result.set(key, value)
+        return result
+
+    def to_dict(self) -> dict:
+        if self._small is not None:
+            return self._small.copy()
+        return dict(self._root.iter_pairs())
+
+    def __eq__(self, other):
+        if other is self:
+            return True
+        if isinstance(other, Mapping):
+            if len(other) != self._size:
+                return False
+            if self._small is not None and isinstance(other, dict):
+                return self._small == other
+            return all(other.get(k, _MISSING) == v for k, v in self.items())
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"PMap({self.to_dict()!r})"
+
+    def __str__(self) -> str:
+        return str(self.to_dict())
+
+    def __reduce__(self):
+        return (PMap, (self.to_dict(),))
+
+
+# --- PVector ---
+
+class PVector(Sequence):
+    """
+    Liste persistante : append / set en O(log32 n) (amorti O(1) pour append),
+    accès indexé en O(log32 n). Les écritures renvoient un nouveau PVector.
+    """
+    __slots__ = ("_count", "_shift", "_root", "_tail")
+
+    def __init__(self, initial: Any = None):
+        self._count = 0
+        self._shift = _BITS
+        self._root = ()
+        self._tail = ()
+        if initial:
+            vector = self
+            for value in initial:
+                vector = vector.append(value)
+            self._count, self._shift, self._root, self._tail = (
+                vector._count, vector._shift, vector._root, vector._tail)
+
+    @classmethod
+    def _make(cls, count, shift, root, tail) -> 'PVector':
+        vector = cls.__new__(cls)
+        vector._count = count
+        vector._shift = shift
+        vector._root = root
+        vector._tail = tail
+        return vector
+
+    def _tail_offset(self) -> int:
+        return self._count - len(self._tail)
+
+    def _leaf_for(self, index: int) -> tuple:
+        if index >= self._tail_offset():
+            return self._tail
+        node = self._root
+        for level in range(self._shift, 0, -_BITS):
+            node = node[(index >> level) & _MASK]
+        return node
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("PVector index out of range")
+        return self._leaf_for(index)[index & _MASK]
+
+    def __iter__(self) -> Iterator:
+        tail_offset = self._tail_offset()
+        for start in range(0, tail_offset, _WIDTH):
+            yield from self._leaf_for(start)
+        yield from self._tail
+
+    def __contains__(self, value) -> bool:
+        # Recherche feuille par feuille (test 'in' natif sur les tuples)
+        for start in range(0, self._tail_offset(), _WIDTH):
+            if value in self._leaf_for(start):
+                return True
+        return value in self._tail
+
+    def append(self, value) -> 'PVector':
+        if len(self._tail) < _WIDTH:
+            return PVector._make(self._count + 1, self._shift, self._root, self._tail + (value,))
+
+        # Queue pleine : elle descend dans l'arbre
+        shift = self._shift
+        if (self._count >> _BITS) > (1 << shift):
+            root = (self._root, _new_path(shift, self._tail))
+            shift += _BITS
+        else:
+            root = _push_tail(self._count, shift, self._root, self._tail)
+        return PVector._make(self._count + 1, shift, root, (value,))
+
+    def set(self, index: int, value) -> 'PVector':
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("PVector index out of range")
+        if index >= self._tail_offset():
+            pos = index & _MASK
+            tail = self._tail[:pos] + (value,) + self._tail[pos + 1:]
+            return PVector._make(self._count, self._shift, self._root, tail)
+        return PVector._make(self._count, self._shift, _assoc_path(self._shift, self._root, index, value), self._tail)
+
+    def to_list(self) -> list:
+        return list(self)
+
+    def __eq__(self, other):
+        if other is self:
+            return True
+        if isinstance(other, (PVector, list, tuple)):
+            return len(other) == self._count and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"PVector({self.to_list()!r})"
+
+    def __str__(self) -> str:
+        return str(self.to_list())
+
+    def __reduce__(self):
+        return (PVector, (self.to_list(),))
+
+
+def _new_path(level: int, node: tuple) -> tuple:
+    while level > 0:
+        node = (node,)
+        level -= _BITS
+    return node
+
+
+def _push_tail(count: int, level: int, parent: tuple, tail: tuple) -> tuple:
+    sub_index = ((count - 1) >> level) & _MASK
+    if level == _BITS:
+        inserted = tail
+    elif sub_index < len(parent):
+        inserted = _push_tail(count, level - _BITS, parent[sub_index], tail)
+    else:
+        inserted = _new_path(level - _BITS, tail)
+
+    if sub_index < len(parent):
+        return parent[:sub_index] + (inserted,) + parent[sub_index + 1:]
+    return parent + (inserted,)
+
+
+def _assoc_path(level: int, node: tuple, index: int, value) -> tuple:
+    pos = (index >> level) & _MASK
+    if level == 0:
+        return node[:pos] + (value,) + node[pos + 1:]
+    child = _assoc_path(level - _BITS, node[pos], index, value)
+    return node[:pos] + (child,) + node[pos + 1:]
+
+
+def thaw(value: Any) -> Any:
+    """Convertit (récursivement) les collections persistantes en dict / list JSON-friendly."""
+    if isinstance(value, PMap):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, PVector):
+        return [thaw(v) for v in value]
+    return value
@@ -0,0 +1,118 @@
+# src/engine/quest_log.py
+from typing import Dict, Iterable, List, Mapping, Optional
+
+QUEST_ACTIVE = "active"
+QUEST_COMPLETED = "completed"
+QUEST_RETURNED = "returned"
+
+# Statut -> variable liste du VariableStore (format des sauvegardes)
+QUEST_LIST_KEYS = {
+    QUEST_ACTIVE: "active_quests",
+    QUEST_COMPLETED: "completed_quests",
+    QUEST_RETURNED: "returned_quests",
+}
+QUEST_STATUS_BY_KEY = {key: status for status, key in QUEST_LIST_KEYS.items()}
+
+
+class QuestLog:
+    """
+    État des quêtes : statut et étape de chaque quête (dictionnaires, O(1)),
+    plus une vue ordonnée par statut (dict utilisé comme ensemble ordonné,
+    retrait en O(1) au lieu de list.remove).
+    Les listes 'active_quests' / 'completed_quests' / 'returned_quests'
+    restent le format de sauvegarde : voir `to_lists` / `load_lists`.
+    """
+
+    def __init__(self):
+        self._status: Dict[str, str] = {}
+        self._steps: Dict[str, int] = {}
+        self._ordered: Dict[str, Dict[str, None]] = {status: {} for status in QUEST_LIST_KEYS}
+
+    # --- Lecture ---
+    def status(self, quest_id: str) -> Optional[str]:
+        """Statut de la quête (QUEST_ACTIVE, QUEST_COMPLETED, QUEST_RETURNED) ou None."""
+        return self._status.get(quest_id)
+
+    def is_known(self, quest_id: str) -> bool:
+        """Vrai si la quête a déjà été démarrée (quel que soit son statut)."""
+        return quest_id in self._status
+
+    def get_step(self, quest_id: str) -> int:
+        return self._steps.get(quest_id, 0)
+
+    def ids(self, status: str) -> List[str]:
+        """Identifiants des quêtes d'un statut, dans l'ordre des transitions."""
+        return list(self._ordered[status])
+
+    # --- Transitions ---
+    def start(self, quest_id: str) -> bool:
+        if quest_id in self._status:
+            return False
+        self._move(quest_id, QUEST_ACTIVE)
+        self._steps[quest_id] = 0
+        return True
+
+    def complete(self, quest_id: str) -> bool:
+        if self._status.get(quest_id) != QUEST_ACTIVE:
+            return False
+        self._move(quest_id, QUEST_COMPLETED)
+        return True
+
+    def mark_returned(self, quest_id: str) -> bool:
+        if self._status.get(quest_id) != QUEST_COMPLETED:
+            return False
+        self._move(quest_id, QUEST_RETURNED)
+        return True
+
+    def advance(self, quest_id: str) -> Optional[int]:
+        """Passe à l'étape suivante d'une quête active ; retourne la nouvelle étape."""
+        if self._status.get(quest_id) != QUEST_ACTIVE:
+            return None
+        self._steps[quest_id] = self._steps.get(quest_id, 0) + 1
+        return self._steps[quest_id]
+
+    def _move(self, quest_id: str, status: str):
+        previous = self._status.get(quest_id)
+        if previous is not None:
+            self._ordered[previous].pop(quest_id, None)
+        self._status[quest_id] = status
+        self._ordered[status][quest_id] = None
+
+    def _drop(self, quest_id: str):
+        previous = self._status.pop(quest_id, None)
+        if previous is not None:
+            self._ordered[previous].pop(quest_id, None)
+
+    # --- Synchronisation avec le format liste ---
+    def sync_list(self, status: str, quest_ids: Optional[Iterable[str]]):
+        """
+        Une liste a été écrite directement (set_var, script 'set') :
+        les quêtes de ce statut absentes de la liste sont retirées,
+        celles de la liste prennent ce statut (la dernière écriture l'emporte).
+        """
+        wanted = dict.fromkeys(quest_ids or ())
+        for quest_id in list(self._ordered[status]):
+            if quest_id not in wanted:
+                self._drop(quest_id)
+        for quest_id in wanted:
+            if self._status.get(quest_id) != status:
+                self._move(quest_id, status)
+
+    def sync_steps(self, steps: Optional[Mapping[str, int]]):
+        self._steps = dict(steps.items()) if steps else {}
+
+    def load_lists(self, active: Iterable[str] = (), completed: Iterable[str] = (),
+                   returned: Iterable[str] = (), steps: Optional[Mapping[str, int]] = None):
+        """Reconstruit l'état depuis le format liste (sauvegardes existantes)."""
+        self._status.clear()
+        for ordered in self._ordered.values():
+            ordered.clear()
+        # Ordre de priorité si une quête apparaît dans plusieurs listes : rendue > terminée > active
+        for status, quest_ids in ((QUEST_ACTIVE, active), (QUEST_COMPLETED, completed), (QUEST_RETURNED, returned)):
+            for quest_id in quest_ids or ():
+                self._move(quest_id, status)
+        self.sync_steps(steps)
+
+    def to_lists(self) -> Dict[str, List[str]]:
+        """Format sauvegarde : {'active_quests': [...], 'completed_quests': [...], 'returned_quests': [...]}."""
+        return {key: self.ids(status) for status, key in QUEST_LIST_KEYS.items()}
@@ -22,9 +22,41 @@ class SaveSystem:
             "timestamp": time.time(),
             "current_node_id": manager.current_node.id,
             "variables": manager.variables.get_all(),
-            "history": manager.history
+            "history": manager.history.to_list()
         }
 
+    @staticmethod
+    def capture_state(manager: StoryManager) -> dict:
+        """
+        Capture en mémoire pour l'autosave / le retour arrière : les variables sont
+        un instantané delta du VariableStore (coût proportionnel aux changements
+        depuis le dernier checkpoint, pas à la taille de la partie).
+        """
+        if not manager.current_node:
+            return {}
+
+        return {
+            "timestamp": time.time(),
+            "current_node_id": manager.current_node.id,
+            "variables": manager.variables.snapshot(),
+            "history": manager.history.to_list()
+        }
+
+    @staticmethod
+    def restore_state(manager: StoryManager, state: dict) -> bool:
+        """Revient à un état capturé par capture_state (sans rejouer les scripts on_enter)."""
+        if not state or not manager.project:
+            return False
+
+        node = manager.project.nodes.get(state.get("current_node_id"))
+        if not node:
+            return False
+
+        manager.variables.restore(state["variables"])
+        manager.history = state.get("history", [])
+        manager.current_node = node
+        return True
+
     @staticmethod
     def save_game(manager: StoryManager, filepath: str) -> bool:
         """Ecrit la sauvegarde sur le disque (avec un encodage léger)."""
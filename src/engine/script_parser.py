@@ -1,7 +1,176 @@
 # src/engine/script_parser.py
+import copy
 import re
-from typing import Any, Dict, List
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+from src.core.definitions import MACRO_DEFINITIONS
 from src.engine.variable_store import VariableStore
+from src.engine.expression import BRACED_VAR_PATTERN, ExpressionError, compile_expression
+# Jetons d'une macro texte : mot ou "chaine avec espaces"
+MACRO_TOKEN_PATTERN = re.compile(r'(?:[^\s"]+|"[^"]*")+')
+
+
+class CompiledCache(ABC):
+    """
+    Cache LRU borné : texte source -> forme compilée.
+    Les sous-classes fournissent `_compile` (classe abstraite). Une erreur de compilation est
+    mise en cache (sans sa pile d'appels) puis relevée à chaque appel sous
+    forme d'une copie neuve : l'exception en cache n'accumule pas de frames.
+    """
+
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, source: str):
+        entry = self._entries.get(source)
+        if entry is not None:
+            self.hits += 1
+            self._entries.move_to_end(source)
+        else:
+            self.misses += 1
+            entry = self._compile(source)
+            if isinstance(entry, Exception):
+                entry = entry.with_traceback(None)
+            self._entries[source] = entry
+            if len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+        if isinstance(entry, Exception):
+            raise copy.copy(entry)
+        return entry
+
+    @abstractmethod
+    def _compile(self, source: str):
+        """Forme compilée de `source`, ou l'exception à relever pour ce texte."""
+
+    def invalidate(self, source: str):
+        """Retire une entrée (ex: texte modifié dans l'éditeur)."""
+        self._entries.pop(source, None)
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+class ConditionCache(CompiledCache):
+    """
+    Conditions compilées (texte source -> CompiledExpression).
+    Une condition n'est analysée qu'une seule fois ; les appels suivants ne
+    font plus que lire les variables nécessaires et exécuter l'arbre.
+    """
+
+    def _compile(self, condition: str):
+        try:
+            return compile_expression(condition)
+        except (SyntaxError, ExpressionError) as e:
+            return e
+
+
+class TextTemplate:
+    """
+    Texte pré-découpé en segments littéraux et emplacements de variables.
+    "Bonjour ${player_name} !" -> literals ["Bonjour ", " !"], names ["player_name"]
+    """
+    __slots__ = ("literals", "names")
+
+    def __init__(self, text: str):
+        pieces = BRACED_VAR_PATTERN.split(text)
+        self.literals = pieces[0::2]
+        self.names = pieces[1::2]
+
+    def render(self, resolve) -> str:
+        """Assemble le texte ; `resolve(nom)` fournit la valeur (str) d'un emplacement."""
+        if not self.names:
+            return self.literals[0]
+        literals = self.literals
+        parts = [literals[0]]
+        for i, name in enumerate(self.names):
+            parts.append(resolve(name))
+            parts.append(literals[i + 1])
+        return "".join(parts)
+
+
+class TemplateCache(CompiledCache):
+    """Textes compilés (nœuds, variantes, `new_scene_text`)."""
+
+    def _compile(self, text: str):
+        return TextTemplate(text)
+
+
+class ScriptCache(CompiledCache):
+    """
+    Scripts texte pré-analysés : tuple de lignes -> tuple de commandes.
+    `compile_line` (fourni par le ScriptParser, qui connaît les macros)
+    retourne une commande ou None pour une ligne invalide.
+    """
+
+    def __init__(self, compile_line: Callable[[str], Optional[tuple]], max_size: int = 1024):
+        super().__init__(max_size)
+        self.compile_line = compile_line
+
+    def _compile(self, lines: tuple):
+        commands = (self.compile_line(line) for line in lines)
+        return tuple(command for command in commands if command)
+
+
+def normalize_macro_name(name: str) -> str:
+    """Clé de registre d'une macro : 'add_item', 'addItem' -> 'additem'."""
+    return name.replace("_", "").lower()
+
+
+class MacroHandler:
+    """
+    Gestionnaire d'une macro : fonction + signature + compteurs d'appels.
+    La fonction reçoit un dictionnaire de paramètres nommés, que la macro
+    vienne d'un script texte (<<addItem sword 2>>) ou d'un événement structuré.
+    """
+    __slots__ = ("name", "func", "arg_names", "min_args", "parsers", "calls", "total_time")
+
+    def __init__(self, name: str, func: Callable[[Dict[str, Any]], None],
+                 arg_names=(), min_args: int = 0, parsers: Optional[Dict[str, Callable]] = None):
+        self.name = name
+        self.func = func
+        self.arg_names = tuple(arg_names)
+        self.min_args = min_args
+        # Conversions appliquées aux arguments textuels (ex: {"qty": int})
+        self.parsers = parsers or {}
+        self.calls = 0
+        self.total_time = 0.0
+
+    def __call__(self, params: Dict[str, Any]):
+        start = time.perf_counter()
+        try:
+            self.func(params)
+        finally:
+            self.calls += 1
+            self.total_time += time.perf_counter() - start
+
+    def bind_args(self, args: list) -> Optional[Dict[str, Any]]:
+        """
+        Associe les arguments positionnels d'une commande texte aux noms de la signature.
+        Retourne None s'il manque des arguments obligatoires.
+        """
+        if len(args) < self.min_args:
+            return None
+        params = {}
+        for name, value in zip(self.arg_names, args):
+            parser = self.parsers.get(name)
+            params[name] = parser(value) if parser else value
+        return params
 
 
 class ScriptParser:
@@ -14,7 +183,21 @@ class ScriptParser:
         self.store = variable_store
         self.project = None # Pour accéder aux définitions de quêtes/items
         # Regex pour trouver les motifs ${nom_variable}
-        self.var_pattern = re.compile(r'\$\{([a-zA-Z0-9_]+)\}')
+        self.var_pattern = BRACED_VAR_PATTERN
+        # Conditions et textes compilés, indexés par leur texte source :
+        # un contenu modifié dans l'éditeur produit simplement une nouvelle entrée.
+        self.conditions = ConditionCache()
+        self.templates = TemplateCache(max_size=4096)
+        # Conditions en erreur à l'évaluation : condition -> nombre d'erreurs
+        self.condition_errors: Dict[str, int] = {}
+
+        # Registre des macros : nom normalisé -> MacroHandler
+        self.handlers: Dict[str, MacroHandler] = {}
+        # Scripts texte pré-analysés (lignes -> commandes)
+        self.scripts = ScriptCache(self._compile_line, max_size=4096)
+        self._unbound_warned = set()
+        self._register_builtin_macros()
+        self._register_declared_macros()
 
     def set_project(self, project):
         """Injecte le modèle projet pour accéder aux données statiques (Quêtes, Items)."""
@@ -28,16 +211,16 @@ class ScriptParser:
         if not text:
             return ""
 
-        def replacer(match):
-            var_name = match.group(1)
+        template = self.templates.get(text)
+        store = self.store
+
+        def resolve(var_name):
             # Check extra_context first
             if extra_context and var_name in extra_context:
                 return str(extra_context[var_name])
-            
-            val = self.store.get_var(var_name, f"ERR:{var_name}")
-            return str(val)
+            return str(store.get_var(var_name, f"ERR:{var_name}"))
 
-        return self.var_pattern.sub(replacer, text)
+        return template.render(resolve)
 
     def evaluate_condition(self, condition: str, extra_context: Dict[str, Any] = None) -> bool:
         """
@@ -47,67 +230,125 @@ class ScriptParser:
         if not condition or condition.strip() == "":
             return True
 
-        # On crée un contexte local contenant uniquement les variables du jeu
-        # Cela permet d'utiliser "gold" directement au lieu de "variables['gold']"
-        context = self.store.get_all()
-        
-        # Merge extra context (e.g. local variables like 'visits')
-        if extra_context:
-            context.update(extra_context)
+        # Vue en lecture seule : contexte local superposé aux variables du jeu,
+        # sans copie du store ; seules les variables utiles sont lues.
+        context = self.store.view(extra_context)
 
         try:
-            # Pre-process condition to allow $variable syntax (replace $var with var)
-            # We use the same regex pattern but replace with group 1
-            # Note: var_pattern expects ${var}, but conditions usually use $var
-            # Let's handle both $var and ${var}
-            
-            # Replace ${var} -> var
-            clean_condition = re.sub(r'\$\{([a-zA-Z0-9_]+)\}', r'\1', condition)
-            # Replace $var -> var
-            clean_condition = re.sub(r'\$([a-zA-Z0-9_]+)', r'\1', clean_condition)
-
-            # ATTENTION : eval() est puissant mais dangereux.
-            # Ici, nous limitons le contexte aux seules variables du jeu.
-            # Pour une sécurité totale en prod, il faudrait un parser custom,
-            # mais pour un outil desktop créateur, eval restreint est acceptable.
-            result = eval(clean_condition, {"__builtins__": {}}, context)
-            return bool(result)
+            # Analyse unique : appels de fonction et autres constructions
+            # dangereuses sont refusés à la compilation (plus d'eval()).
+            expression = self.conditions.get(condition)
+            return bool(expression.evaluate(context.resolve))
         except Exception as e:
+            self.condition_errors[condition] = self.condition_errors.get(condition, 0) + 1
             print(f"[ScriptParser] Erreur d'évaluation '{condition}': {e}")
             return False
 
+    def get_condition_dependencies(self, condition: str) -> frozenset:
+        """Noms des variables lues par une condition (vide si invalide ou constante)."""
+        if not condition or not condition.strip():
+            return frozenset()
+        try:
+            return self.conditions.get(condition).names
+        except (SyntaxError, ExpressionError):
+            return frozenset()
+
+    def get_condition_stats(self) -> Dict[str, int]:
+        """Statistiques du cache de conditions (taille, hits, misses)."""
+        return self.conditions.stats()
+
+    def get_template_stats(self) -> Dict[str, int]:
+        """Statistiques du cache de textes compilés."""
+        return self.templates.stats()
+
+    def get_script_stats(self) -> Dict[str, int]:
+        """Statistiques du cache de scripts pré-analysés."""
+        return self.scripts.stats()
+
+    def precompile_text(self, text: str):
+        """Compile un texte à l'avance (chargement du projet)."""
+        if text and isinstance(text, str):
+            self.templates.get(text)
+
+    def precompile_condition(self, condition: str):
+        """Compile une condition à l'avance ; les erreurs seront signalées à l'évaluation."""
+        if condition and isinstance(condition, str) and condition.strip():
+            try:
+                self.conditions.get(condition)
+            except (SyntaxError, ExpressionError):
+                pass
+
+    def invalidate_text(self, text: str):
+        """Oublie la forme compilée d'un texte modifié."""
+        if text:
+            self.templates.invalidate(text)
+
+    def clear_caches(self):
+        """Vide les caches de conditions, textes et scripts (nouveau projet)."""
+        self.conditions.clear()
+        self.templates.clear()
+        self.scripts.clear()
+
     def execute_script(self, script_lines: list):
         """
         Exécute une liste de commandes (lignes de texte).
         Supporte les macros Twine-like : <<command arg1 arg2>>
+        Les lignes sont compilées une seule fois (voir compile_script).
         """
         if not script_lines:
             return
 
-        for line in script_lines:
-            if not line or not isinstance(line, str):
-                continue
-            
-            line = line.strip()
-            if not line.startswith("<<") or not line.endswith(">>"):
+        for key, params, line in self.compile_script(script_lines):
+            handler = self.handlers.get(key)
+            if handler is None:
+                print(f"[ScriptParser] Commande inconnue : {line}")
                 continue
+            try:
+                handler(params)
+            except Exception as e:
+                print(f"[ScriptParser] Erreur exécution commande '{line}': {e}")
 
-            # Extraction du contenu : <<addItem "Sword" 1>> -> addItem "Sword" 1
-            content = line[2:-2].strip()
-            
-            # Parsing basique (séparation par espaces, en respectant les guillemets)
-            # Regex pour capturer : mot ou "chaine avec espaces"
-            # parts = [p.strip('"') for p in re.findall(r'(?:[^\s"]+|"[^"]*")+', content)]
-            # Correction regex to handle quotes properly
-            parts = [p.strip('"') for p in re.findall(r'(?:[^\s"]+|"[^"]*")+', content)]
-            
-            if not parts:
-                continue
+    def compile_script(self, script_lines: list) -> tuple:
+        """
+        Transforme des lignes <<macro ...>> en commandes pré-analysées :
+        tuple de (clé de macro, paramètres typés, ligne source).
+        Le résultat est mis en cache par contenu ; les lignes invalides sont
+        signalées une seule fois, lors de la compilation.
+        """
+        return self.scripts.get(tuple(line for line in script_lines if isinstance(line, str)))
+
+    def _compile_line(self, line: str):
+        line = line.strip()
+        if not line:
+            return None
+        if not line.startswith("<<") or not line.endswith(">>"):
+            print(f"[ScriptParser] Ligne de script invalide (attendu <<macro ...>>) : {line}")
+            return None
+
+        # Extraction du contenu : <<addItem "Sword" 1>> -> addItem "Sword" 1
+        content = line[2:-2].strip()
+        parts = [p.strip('"') for p in MACRO_TOKEN_PATTERN.findall(content)]
+        if not parts:
+            print(f"[ScriptParser] Ligne de script vide : {line}")
+            return None
+
+        command, args = parts[0], parts[1:]
+        key = normalize_macro_name(command)
+        handler = self.handlers.get(key)
+        if handler is None:
+            print(f"[ScriptParser] Commande inconnue : {command}")
+            return None
 
-            command = parts[0]
-            args = parts[1:]
+        try:
+            params = handler.bind_args(args)
+        except (TypeError, ValueError) as e:
+            print(f"[ScriptParser] Arguments invalides pour '{line}': {e}")
+            return None
+        if params is None:
+            print(f"[ScriptParser] Arguments manquants pour '{line}'")
+            return None
 
-            self._dispatch_command(command, args)
+        return key, params, line
 
     def execute_events(self, events: List[Dict]):
         """Exécute une liste d'événements structurés."""
@@ -124,105 +365,149 @@ class ScriptParser:
             if ev_type:
                 self._dispatch_event(ev_type, params)
 
+    # --- Registre des macros ---
+
+    def register_handler(self, name: str, func: Callable[[Dict[str, Any]], None],
+                         arg_names=None, parsers: Optional[Dict[str, Callable]] = None,
+                         aliases=()):
+        """
+        Associe une macro à sa fonction. La signature (noms, arguments obligatoires,
+        conversions 'int') est lue dans MACRO_DEFINITIONS si elle n'est pas fournie.
+        Un enregistrement remplace le gestionnaire existant (ex: 'goto' par le StoryManager).
+        """
+        definition = MACRO_DEFINITIONS.get(name, {})
+        args_def = definition.get("args", [])
+        conversions = {arg["name"]: int for arg in args_def if arg.get("type") == "int"}
+        if parsers:
+            conversions.update(parsers)
+
+        if arg_names is None:
+            arg_names = [arg["name"] for arg in args_def]
+            min_args = sum(1 for arg in args_def if "default" not in arg)
+        else:
+            min_args = len(arg_names)
+
+        handler = MacroHandler(name, func, arg_names, min_args, conversions)
+        for key in (name,) + tuple(aliases):
+            self.handlers[normalize_macro_name(key)] = handler
+        return handler
+
+    def get_handler(self, name: str) -> Optional[MacroHandler]:
+        return self.handlers.get(normalize_macro_name(name))
+
+    def get_macro_stats(self) -> Dict[str, Dict[str, float]]:
+        """Appels et temps cumulé par macro (les plus coûteuses en premier)."""
+        stats = {}
+        for handler in set(self.handlers.values()):
+            if handler.calls:
+                stats[handler.name] = {
+                    "calls": handler.calls,
+                    "total_time": handler.total_time,
+                    "avg_time": handler.total_time / handler.calls,
+                }
+        return dict(sorted(stats.items(), key=lambda kv: kv[1]["total_time"], reverse=True))
+
+    def reset_macro_stats(self):
+        for handler in self.handlers.values():
+            handler.calls = 0
+            handler.total_time = 0.0
+
+    def _register_builtin_macros(self):
+        self.register_handler("set", self._macro_set, parsers={"value": self._parse_value},
+                              aliases=("setVariable", "set_variable"))
+        self.register_handler("addItem", self._macro_add_item)
+        self.register_handler("removeItem", self._macro_remove_item)
+        self.register_handler("startQuest", self._macro_start_quest)
+        self.register_handler("completeQuest", self._macro_complete_quest)
+        self.register_handler("advanceQuest", self._macro_advance_quest, arg_names=["quest_id"])
+        self.register_handler("showQuest", self._macro_show_quest)
+        self.register_handler("returnQuest", self._macro_return_quest)
+
+    def _register_declared_macros(self):
+        """Les macros déclarées dans MACRO_DEFINITIONS sans gestionnaire restent branchables."""
+        for name in MACRO_DEFINITIONS:
+            if normalize_macro_name(name) not in self.handlers:
+                self.register_handler(name, self._make_unbound_handler(name))
+
+    def _make_unbound_handler(self, name: str):
+        def unbound(params):
+            if name not in self._unbound_warned:
+                self._unbound_warned.add(name)
+                print(f"[ScriptParser] Macro '{name}' sans gestionnaire (ignorée).")
+        return unbound
+
     def _dispatch_command(self, command: str, args: list):
         """Dispatche la commande textuelle vers la bonne action."""
-        try:
-            if command == "setVariable" or command == "set":
-                if len(args) >= 2:
-                    var_name = args[0]
-                    value = self._parse_value(args[1])
-                    self.store.set_var(var_name, value)
-            
-            elif command == "addItem":
-                if len(args) >= 1:
-                    item_id = args[0]
-                    qty = int(args[1]) if len(args) > 1 else 1
-                    self.store.add_item(item_id, qty)
-
-            elif command == "removeItem":
-                if len(args) >= 1:
-                    item_id = args[0]
-                    qty = int(args[1]) if len(args) > 1 else 1
-                    self.store.remove_item(item_id, qty)
-
-            elif command == "startQuest":
-                if len(args) >= 1:
-                    quest_id = args[0]
-                    self.store.start_quest(quest_id)
-                    
-            elif command == "completeQuest":
-                if len(args) >= 1:
-                    quest_id = args[0]
-                    self.store.complete_quest(quest_id)
-
-            elif command == "showQuest":
-                if len(args) >= 1:
-                    quest_id = args[0]
-                    self.store.show_quest(quest_id)
-
-            elif command == "returnQuest":
-                if len(args) >= 1:
-                    quest_id = args[0]
-                    self._handle_return_quest(quest_id)
-                    
-            else:
-                print(f"[ScriptParser] Commande inconnue : {command}")
+        handler = self.handlers.get(normalize_macro_name(command))
+        if handler is None:
+            print(f"[ScriptParser] Commande inconnue : {command}")
+            return
 
+        try:
+            params = handler.bind_args(args)
+            if params is not None:
+                handler(params)
         except Exception as e:
             print(f"[ScriptParser] Erreur exécution commande '{command}': {e}")
 
     def _dispatch_event(self, ev_type: str, params: Dict[str, Any]):
         """Dispatche l'événement structuré vers la bonne action."""
-        try:
-            if ev_type == "set" or ev_type == "set_variable":
-                var_name = params.get("name")
-                value = params.get("value")
-                if var_name:
-                    self.store.set_var(var_name, value)
-            
-            elif ev_type == "addItem" or ev_type == "add_item":
-                item_id = params.get("item_id")
-                qty = params.get("qty", params.get("quantity", 1))
-                if item_id:
-                    self.store.add_item(item_id, qty)
-            
-            elif ev_type == "removeItem" or ev_type == "remove_item":
-                item_id = params.get("item_id")
-                qty = params.get("qty", params.get("quantity", 1))
-                if item_id:
-                    self.store.remove_item(item_id, qty)
-            
-            elif ev_type == "startQuest" or ev_type == "start_quest":
-                quest_id = params.get("quest_id")
-                if quest_id:
-                    self.store.start_quest(quest_id)
-            
-            elif ev_type == "completeQuest" or ev_type == "complete_quest":
-                quest_id = params.get("quest_id")
-                if quest_id:
-                    self.store.complete_quest(quest_id)
-
-            elif ev_type == "advanceQuest" or ev_type == "advance_quest":
-                quest_id = params.get("quest_id")
-                if quest_id:
-                    self.store.advance_quest_step(quest_id)
-
-            elif ev_type == "showQuest" or ev_type == "show_quest":
-                quest_id = params.get("quest_id")
-                if quest_id:
-                    self.store.show_quest(quest_id)
-
-            elif ev_type == "returnQuest" or ev_type == "return_quest":
-                quest_id = params.get("quest_id")
-                if quest_id:
-                    self._handle_return_quest(quest_id)
-                    
-            else:
-                print(f"[ScriptParser] Événement inconnu : {ev_type}")
+        handler = self.handlers.get(normalize_macro_name(ev_type))
+        if handler is None:
+            print(f"[ScriptParser] Événement inconnu : {ev_type}")
+            return
 
+        try:
+            handler(params if isinstance(params, dict) else {})
         except Exception as e:
             print(f"[ScriptParser] Erreur exécution événement '{ev_type}': {e}")
 
+    # --- Macros intégrées ---
+
+    def _macro_set(self, params: Dict[str, Any]):
+        var_name = params.get("name")
+        if var_name:
+            self.store.set_var(var_name, params.get("value"))
+
+    def _macro_add_item(self, params: Dict[str, Any]):
+        item_id = params.get("item_id")
+        qty = params.get("qty", params.get("quantity", 1))
+        if item_id:
+            self.store.add_item(item_id, qty)
+
+    def _macro_remove_item(self, params: Dict[str, Any]):
+        item_id = params.get("item_id")
+        qty = params.get("qty", params.get("quantity", 1))
+        if item_id:
+            self.store.remove_item(item_id, qty)
+
+    def _macro_start_quest(self, params: Dict[str, Any]):
+        quest_id = params.get("quest_id")
+        if quest_id:
+            self.store.start_quest(quest_id)
+
+    def _macro_complete_quest(self, params: Dict[str, Any]):
+        quest_id = params.get("quest_id")
+        if quest_id:
+            self.store.complete_quest(quest_id)
+
+    def _macro_advance_quest(self, params: Dict[str, Any]):
+        quest_id = params.get("quest_id")
+        if quest_id:
+            self.store.advance_quest_step(quest_id)
+
+    def _macro_show_quest(self, params: Dict[str, Any]):
+        quest_id = params.get("quest_id")
+        if quest_id:
+            self.store.show_quest(quest_id)
+
+    def _macro_return_quest(self, params: Dict[str, Any]):
+        quest_id = params.get("quest_id")
+        if quest_id:
+            # Statut + XP + or + objets : une seule notification aux observers
+            with self.store.transaction():
+                self._handle_return_quest(quest_id)
+
     def _handle_return_quest(self, quest_id: str):
         """Gère la logique de rendu de quête (Loot + État)."""
         # 1. Update State
@@ -0,0 +1,331 @@
+# src/engine/simulator.py
+"""
+Simulateur de parties sans interface (pas de Qt) : pilote directement le
+StoryManager pour jouer N parties complètes selon une politique de choix
+(aléatoire, pondérée ou scriptée) et mesurer la couverture de l'histoire.
+
+    simulator = PlaythroughSimulator(project, WeightedPolicy(), seed=42)
+    report = simulator.run(10000)
+    print(report.format_summary(project))
+
+L'état de départ est capturé une fois (instantané delta du VariableStore) et
+restauré avant chaque partie, sans recharger ni recompiler le projet.
+"""
+import os
+import random
+from abc import ABC, abstractmethod
+from collections import Counter
+from contextlib import contextmanager, redirect_stdout
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from src.core.definitions import NodeType
+from src.core.models import ProjectModel
+from src.engine.quest_log import QUEST_COMPLETED, QUEST_RETURNED
+from src.engine.save_system import SaveSystem
+from src.engine.story_manager import StoryManager
+
+# Choix proposés au joueur : (index dans la liste affichée, données du choix)
+EnabledChoices = List[Tuple[int, Dict[str, Any]]]
+
+
+# --- Politiques de choix ---
+
+class ChoicePolicy(ABC):
+    """
+    Choisit un des choix actifs (classe abstraite : `choose` est à fournir) ;
+    `reset` est appelé au début de chaque partie.
+    """
+
+    def reset(self):
+        pass
+
+    @abstractmethod
+    def choose(self, choices: EnabledChoices, manager: StoryManager, rng: random.Random) -> int:
+        """Index (dans la liste des choix du nœud) du choix à jouer."""
+
+
+class RandomPolicy(ChoicePolicy):
+    """Choix uniforme parmi les choix actifs."""
+
+    def choose(self, choices, manager, rng):
+        return rng.choice(choices)[0]
+
+
+class WeightedPolicy(ChoicePolicy):
+    """
+    Tirage pondéré : poids donné par `weights[choice_id]`, sinon par le champ
+    'weight' du choix, sinon `default_weight`.
+    """
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None, default_weight: float = 1.0):
+        self.weights = weights or {}
+        self.default_weight = default_weight
+
+    def _weight(self, choice: Dict[str, Any]) -> float:
+        data = choice.get("data") or choice.get("original_data") or {}
+        choice_id = data.get("id")
+        if choice_id in self.weights:
+            return self.weights[choice_id]
+        return float(data.get("weight", self.default_weight))
+
+    def choose(self, choices, manager, rng):
+        weights = [max(0.0, self._weight(choice)) for _, choice in choices]
+        if not any(weights):
+            return rng.choice(choices)[0]
+        return rng.choices(choices, weights=weights)[0][0]
+
+
+class ScriptedPolicy(ChoicePolicy):
+    """
+    Suit une séquence de décisions : index (parmi les choix actifs), id de
+    choix ou texte affiché. Une fois la séquence épuisée (ou si une décision
+    ne correspond à aucun choix), la politique `fallback` prend le relais.
+    """
+
+    def __init__(self, script: Sequence[Union[int, str]], fallback: Optional[ChoicePolicy] = None):
+        self.script = list(script)
+        self.fallback = fallback or RandomPolicy()
+        self._position = 0
+
+    def reset(self):
+        self._position = 0
+        self.fallback.reset()
+
+    def choose(self, choices, manager, rng):
+        if self._position < len(self.script):
+            decision = self.script[self._position]
+            self._position += 1
+            if isinstance(decision, int):
+                if 0 <= decision < len(choices):
+                    return choices[decision][0]
+            else:
+                for index, choice in choices:
+                    data = choice.get("data") or choice.get("original_data") or {}
+                    if decision == data.get("id") or decision == choice.get("text"):
+                        return index
+        return self.fallback.choose(choices, manager, rng)
+
+
+# --- Rapport ---
+
+class SimulationReport:
+    """Statistiques agrégées d'une série de parties."""
+
+    def __init__(self):
+        self.runs = 0
+        self.steps = 0
+        self.truncated_runs = 0
+        self.node_visits: Counter = Counter()
+        self.endings: Counter = Counter()
+        self.dead_ends: Counter = Counter()
+        # (nœud, cible) -> nombre de clics vers un nœud inexistant
+        self.broken_links: Counter = Counter()
+        self.condition_errors: Counter = Counter()
+        # Choix (nœud, id du choix) proposés au moins une fois
+        self.offered_choices = set()
+        self.all_choices = set()
+        # Nombre de parties ayant atteint chaque nœud (au moins une fois)
+        self.node_reach: Counter = Counter()
+        # Quêtes terminées (ou rendues) en fin de partie, et nombre de quêtes terminées par partie
+        self.quest_completions: Counter = Counter()
+        self.completed_quest_counts: Counter = Counter()
+        # nœud -> variable numérique -> [min, max] observés à l'entrée du nœud
+        self.variable_ranges: Dict[str, Dict[str, List[float]]] = {}
+
+    def merge(self, other: 'SimulationReport') -> 'SimulationReport':
+        """Ajoute les statistiques d'un autre rapport (ex: calculé par un autre processus)."""
+        self.runs += other.runs
+        self.steps += other.steps
+        self.truncated_runs += other.truncated_runs
+        for name in ("node_visits", "endings", "dead_ends", "broken_links", "condition_errors",
+                     "node_reach", "quest_completions", "completed_quest_counts"):
+            getattr(self, name).update(getattr(other, name))
+        self.offered_choices |= other.offered_choices
+        self.all_choices |= other.all_choices
+        for node_id, ranges in other.variable_ranges.items():
+            own = self.variable_ranges.setdefault(node_id, {})
+            for name, (low, high) in ranges.items():
+                if name in own:
+                    own[name] = [min(own[name][0], low), max(own[name][1], high)]
+                else:
+                    own[name] = [low, high]
+        return self
+
+    def reach_probability(self) -> Dict[str, float]:
+        """Probabilité (fréquence sur les parties jouées) d'atteindre chaque nœud."""
+        if not self.runs:
+            return {}
+        return {node_id: count / self.runs for node_id, count in self.node_reach.items()}
+
+    @property
+    def unreachable_choices(self) -> List[Tuple[str, str]]:
+        """Choix jamais proposés au joueur sur l'ensemble des parties."""
+        return sorted(self.all_choices - self.offered_choices)
+
+    def node_coverage(self, project: ProjectModel) -> float:
+        if not project.nodes:
+            return 0.0
+        return len(set(self.node_visits) & set(project.nodes)) / len(project.nodes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "steps": self.steps,
+            "truncated_runs": self.truncated_runs,
+            "node_visits": dict(self.node_visits),
+            "endings": dict(self.endings),
+            "dead_ends": dict(self.dead_ends),
+            "broken_links": [[node_id, target, count] for (node_id, target), count in self.broken_links.items()],
+            "condition_errors": dict(self.condition_errors),
+            "unreachable_choices": [list(key) for key in self.unreachable_choices],
+            "reach_probability": self.reach_probability(),
+            "quest_completions": dict(self.quest_completions),
+            "completed_quest_counts": dict(self.completed_quest_counts),
+            "variable_ranges": self.variable_ranges,
+        }
+
+    def format_summary(self, project: ProjectModel) -> str:
+        lines = [
+            f"Parties : {self.runs} ({self.steps} étapes, {self.truncated_runs} interrompues)",
+            f"Couverture des nœuds : {self.node_coverage(project):.1%} "
+            f"({len(self.node_visits)}/{len(project.nodes)})",
+            f"Choix jamais proposés : {len(self.unreachable_choices)}/{len(self.all_choices)}",
+        ]
+        for label, counter in (("Fins", self.endings), ("Impasses", self.dead_ends),
+                               ("Liens cassés", self.broken_links), ("Conditions en erreur", self.condition_errors)):
+            if counter:
+                lines.append(f"{label} :")
+                for key, count in counter.most_common(10):
+                    lines.append(f"  {key} : {count}")
+        if self.quest_completions:
+            lines.append("Quêtes terminées (part des parties) :")
+            for quest_id, count in self.quest_completions.most_common(10):
+                lines.append(f"  {quest_id} : {count / self.runs:.1%}")
+        return "\n".join(lines)
+
+
+# --- Simulateur ---
+
+class PlaythroughSimulator:
+    """
+    Joue des parties complètes d'un projet, sans interface.
+    Une partie se termine sur un nœud END, une impasse (aucun choix actif),
+    un lien cassé, ou après `max_steps` choix (partie interrompue).
+    `track_variables` : None (désactivé), True (toutes les variables
+    numériques) ou liste de noms dont les bornes sont relevées à chaque nœud.
+    """
+
+    def __init__(self, project: ProjectModel, policy: Optional[ChoicePolicy] = None,
+                 seed: Optional[int] = None, max_steps: int = 500, quiet: bool = True,
+                 track_variables: Union[None, bool, Sequence[str]] = None):
+        self.project = project
+        self.policy = policy or RandomPolicy()
+        self.rng = random.Random(seed)
+        self.max_steps = max_steps
+        self.quiet = quiet
+        self.track_variables = track_variables
+
+        self.manager = StoryManager()
+        with self._output():
+            self.manager.load_project(project)
+        # État initial (après les scripts du nœud de départ), restauré avant chaque partie
+        self._initial_state = SaveSystem.capture_state(self.manager)
+
+        # Données de choix (objet dict du projet) -> clé (nœud, id du choix)
+        self._choice_keys: Dict[int, Tuple[str, str]] = {}
+        for node in project.nodes.values():
+            for index, choice in enumerate(node.content.get("choices", [])):
+                self._choice_keys[id(choice)] = (node.id, choice.get("id") or str(index))
+
+    @contextmanager
+    def _output(self):
+        """Les messages du moteur ([Jeu], [StoryManager]...) sont ignorés en mode silencieux."""
+        if not self.quiet:
+            yield
+            return
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            yield
+
+    def run(self, runs: int, report: Optional[SimulationReport] = None) -> SimulationReport:
+        report = report or SimulationReport()
+        report.all_choices.update(self._choice_keys.values())
+        if not self._initial_state:
+            return report
+
+        self.manager.parser.condition_errors.clear()
+        with self._output():
+            for _ in range(runs):
+                self._play(report)
+        report.condition_errors.update(self.manager.parser.condition_errors)
+        return report
+
+    def _play(self, report: SimulationReport):
+        manager = self.manager
+        SaveSystem.restore_state(manager, self._initial_state)
+        # Chaque partie réévalue ses conditions : erreurs comptées par partie,
+        # quel que soit le découpage des parties entre processus
+        manager.invalidate_choices()
+        self.policy.reset()
+        report.runs += 1
+
+        reached = set()
+        self._walk(report, reached)
+
+        report.node_reach.update(reached)
+        quests = manager.variables.quests
+        completed = quests.ids(QUEST_COMPLETED) + quests.ids(QUEST_RETURNED)
+        report.quest_completions.update(completed)
+        report.completed_quest_counts[len(completed)] += 1
+
+    def _walk(self, report: SimulationReport, reached: set):
+        manager = self.manager
+        for _ in range(self.max_steps):
+            node = manager.current_node
+            report.node_visits[node.id] += 1
+            reached.add(node.id)
+            if self.track_variables:
+                self._record_variables(report, node.id)
+
+            choices = manager.get_available_choices()
+            enabled = [(i, c) for i, c in enumerate(choices) if not c.get("disabled")]
+            for _, choice in enabled:
+                key = self._choice_keys.get(id(choice.get("data") or choice.get("original_data")))
+                if key is not None:
+                    report.offered_choices.add(key)
+
+            if not enabled:
+                if node.type == NodeType.END:
+                    report.endings[node.id] += 1
+                else:
+                    report.dead_ends[node.id] += 1
+                return
+
+            index = self.policy.choose(enabled, manager, self.rng)
+            target_id = choices[index].get("target_id")
+            if target_id and target_id not in self.project.nodes:
+                report.broken_links[(node.id, target_id)] += 1
+                return
+
+            manager.make_choice(index)
+            report.steps += 1
+
+        report.truncated_runs += 1
+
+    def _record_variables(self, report: SimulationReport, node_id: str):
+        view = self.manager.variables.view()
+        if self.track_variables is True:
+            names = view
+        else:
+            names = [name for name in self.track_variables if name in view]
+        ranges = report.variable_ranges.setdefault(node_id, {})
+        for name in names:
+            value = view[name]
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            bounds = ranges.get(name)
+            if bounds is None:
+                ranges[name] = [value, value]
+            elif value < bounds[0]:
+                bounds[0] = value
+            elif value > bounds[1]:
+                bounds[1] = value
@@ -1,13 +1,15 @@
 # src/engine/story_manager.py
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterable
 import math
 import os
 import json
 import glob
 from src.core.models import ProjectModel, NodeModel, EdgeModel
-from src.core.definitions import NodeType, KEY_LOGIC
+from src.core.definitions import KEY_LOGIC
 from src.engine.variable_store import VariableStore
 from src.engine.script_parser import ScriptParser
+from src.engine.quest_log import QUEST_COMPLETED
+from src.engine.navigation_history import NavigationHistory, DEFAULT_HISTORY_DEPTH
 from src.core.lore_manager import LoreManager
 
 
@@ -17,71 +19,100 @@ class StoryManager:
     Gère la navigation entre les nœuds et le cycle de vie du jeu.
     """
 
-    def __init__(self):
+    def __init__(self, history_depth: Optional[int] = DEFAULT_HISTORY_DEPTH):
         self.project: Optional[ProjectModel] = None
         self.current_node: Optional[NodeModel] = None
 
         # Sous-systèmes
         self.variables = VariableStore()
         self.parser = ScriptParser(self.variables)
+        self.parser.register_handler("goto", self._macro_goto)
+        # Cible d'un <<goto>> exécuté pendant un script (appliquée après celui-ci)
+        self._pending_goto: Optional[str] = None
 
-        # Historique pour le bouton "Retour" (Stack)
-        self.history = []
-        
-        # Lore Manager
-        # Hardcoded path for now as per view.py
-        if not self.project:
-            return
+        # Résultats des conditions de choix : condition -> (variables lues, versions, résultat)
+        self._condition_results: Dict[str, tuple] = {}
+        # Dernière liste de choix calculée : (tampon d'état, choix, nœud, liste source)
+        self._choices_cache: Optional[tuple] = None
 
-        # Chercher un nœud de type START
-        start_node = next((n for n in self.project.nodes.values() if n.type == NodeType.START), None)
+        # Historique pour le bouton "Retour" (pile bornée, voir NavigationHistory)
+        self._history = NavigationHistory(max_depth=history_depth)
+        
+        # Lore Manager (lieux du projet, chargés par load_project)
+        self.lore_manager = LoreManager()
 
-        # Sinon, prendre le premier nœud de la liste (fallback)
-        if not start_node and self.project.nodes:
-            start_node = list(self.project.nodes.values())[0]
+    @property
+    def history(self) -> NavigationHistory:
+        return self._history
 
-        if start_node:
-            self.set_current_node(start_node.id)
+    @history.setter
+    def history(self, node_ids: Iterable[str]):
+        """Remplace l'historique (ex: chargement d'une sauvegarde), en gardant la profondeur configurée."""
+        self._history = NavigationHistory(node_ids or (), max_depth=self._history.max_depth)
 
     def load_project(self, project: ProjectModel):
         """Charge un projet et initialise l'état."""
         self.project = project
         self.variables.load_state(project.variables)
         self.parser.set_project(project)
+        self.parser.clear_caches()
+        self._condition_results.clear()
+        self._choices_cache = None
+        self._precompile_project()
         
-        # Initialize LoreManager if it exists
-        if hasattr(self, 'lore_manager'):
-             self.lore_manager.set_project(project)
+        # Initialize LoreManager
+        self.lore_manager.set_project(project)
 
         self.current_node = None
         self.history.clear()
+        self._pending_goto = None
         
-        # Find start node
-        start_node = next((n for n in self.project.nodes.values() if n.type == NodeType.START), None)
-        if not start_node and self.project.nodes:
-            start_node = list(self.project.nodes.values())[0]
-            
+        # Find start node (index du projet : START, sinon premier nœud)
+        start_node = self.project.get_start_node()
         if start_node:
             self.set_current_node(start_node.id)
 
+    def _precompile_project(self):
+        """
+        Compile à l'avance les textes, conditions et scripts legacy de tous les nœuds.
+        Les lignes de script invalides sont signalées ici, une seule fois.
+        """
+        for node in self.project.nodes.values():
+            for hook in ("on_enter", "on_exit"):
+                scripts = node.logic.get(hook, [])
+                if isinstance(scripts, list) and scripts and isinstance(scripts[0], str):
+                    self.parser.compile_script(scripts)
+
+            content = node.content
+            self.parser.precompile_text(content.get("text"))
+
+            for variant in content.get("text_variants", []):
+                self.parser.precompile_condition(variant.get("condition"))
+                self.parser.precompile_text(variant.get("text"))
+
+            for choice in content.get("choices", []):
+                self.parser.precompile_condition(choice.get("condition"))
+                if choice.get("modify_text_enabled"):
+                    self.parser.precompile_text(choice.get("new_scene_text"))
+
     def start_game(self):
         """Démarre le jeu en trouvant le nœud de départ."""
         if not self.project: return
 
-        # Find start node
-        start_node = next((n for n in self.project.nodes.values() if n.type == NodeType.START), None)
-        if not start_node and self.project.nodes:
-            start_node = list(self.project.nodes.values())[0]
-            
+        # Find start node (index du projet : START, sinon premier nœud)
+        start_node = self.project.get_start_node()
         if start_node:
             self.set_current_node(start_node.id)
         else:
             print("[StoryManager] Aucun nœud de départ trouvé.")
 
-    def set_current_node(self, node_id: str):
+    def set_current_node(self, node_id: str, transactional: bool = True):
         """
         Transition vers un nouveau nœud.
         Exécute les scripts de sortie de l'ancien et d'entrée du nouveau.
+        Par défaut la transition est une transaction du VariableStore : les
+        observers (UI) reçoivent un seul lot de changements, et une exception
+        restaure les variables et la position précédentes.
         """
         if not self.project:
             return
@@ -91,6 +122,21 @@ class StoryManager:
             print(f"[StoryManager] Erreur: Nœud {node_id} introuvable.")
             return
 
+        if not transactional:
+            self._enter_node(new_node)
+            return
+
+        previous_node, history_length = self.current_node, len(self.history)
+        try:
+            with self.variables.transaction():
+                self._enter_node(new_node)
+        except Exception:
+            self.current_node = previous_node
+            self.history.truncate(history_length)
+            self._pending_goto = None
+            raise
+
+    def _enter_node(self, new_node: NodeModel):
         # 1. Quitter l'ancien nœud
         if self.current_node:
             exit_scripts = self.current_node.logic.get("on_exit", [])
@@ -118,8 +164,8 @@ class StoryManager:
             city = coords.get("city")
             location_name = coords.get("location_name")
             
-            # Update VariableStore
-            current_coords = self.variables.get_var("player_coordinates", {})
+            # Update VariableStore (nouvelle valeur : les versions/observers voient le changement)
+            current_coords = dict(self.variables.get_var("player_coordinates", {}))
             current_coords["x"] = x
             current_coords["y"] = y
             current_coords["continent"] = continent
@@ -137,6 +183,23 @@ class StoryManager:
         elif isinstance(enter_scripts, list):
             self.parser.execute_events(enter_scripts)
 
+        # 4. Redirection demandée par une macro <<goto>>
+        self._follow_pending_goto()
+
+    def _macro_goto(self, params: Dict[str, Any]):
+        """Macro 'goto' : la navigation est différée jusqu'à la fin du script en cours."""
+        target = params.get("target")
+        if target:
+            self._pending_goto = target
+
+    def _follow_pending_goto(self) -> bool:
+        target = self._pending_goto
+        if not target:
+            return False
+        self._pending_goto = None
+        self.set_current_node(target)
+        return True
+
     def _update_location_description(self, x: float, y: float, continent: str, explicit_city=None, explicit_name=None):
         """Calcule la description du lieu en se basant sur les données Lore (JSON) ou les données explicites."""
         
@@ -230,14 +293,64 @@ class StoryManager:
         raw_text = self.current_node.content.get("text", "")
         return self.parser.parse_text(raw_text, context)
 
+    def _is_condition_met(self, condition: str) -> bool:
+        """
+        Évalue la condition d'un choix en réutilisant le résultat précédent
+        tant qu'aucune des variables qu'elle lit n'a changé de version.
+        """
+        if not condition or not condition.strip():
+            return True
+
+        versions_of = self.variables.get_version
+        cached = self._condition_results.get(condition)
+        if cached is not None:
+            names, versions, result = cached
+            if versions == tuple(versions_of(name) for name in names):
+                return result
+
+        names = tuple(self.parser.get_condition_dependencies(condition))
+        versions = tuple(versions_of(name) for name in names)
+        result = self.parser.evaluate_condition(condition)
+        self._condition_results[condition] = (names, versions, result)
+        return result
+
     def get_available_choices(self) -> List[Dict[str, Any]]:
         """
         Retourne la liste des choix valides pour le nœud actuel.
         Vérifie les conditions et trouve les nœuds cibles via les liens (Edges).
+        La liste est mémorisée : tant que le nœud, ses choix et la version du
+        VariableStore sont inchangés, la même liste est renvoyée sans réévaluation.
         """
         if not self.current_node or not self.project:
             return []
 
+        stamp = self._choices_stamp()
+        cached = self._choices_cache
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+
+        choices = self._compute_available_choices()
+        # Le nœud et la liste de choix sont retenus pour que leurs id() restent valides
+        self._choices_cache = (stamp, choices, self.current_node, self.current_node.content.get("choices"))
+        return choices
+
+    def _choices_stamp(self) -> tuple:
+        """Tampon d'état : nœud courant, liste de choix, version des variables, révision du projet."""
+        node = self.current_node
+        structured_choices = node.content.get("choices")
+        return (id(node), id(structured_choices), len(structured_choices or ()),
+                self.variables.version, len(self.project.edges), self.project.revision,
+                self.project.quest_index_version)
+
+    def invalidate_choices(self):
+        """
+        Vide le cache des choix et des conditions. Une modification sur place
+        du projet signalée par ProjectModel.mark_modified() suffit aussi.
+        """
+        self._choices_cache = None
+        self._condition_results.clear()
+
+    def _compute_available_choices(self) -> List[Dict[str, Any]]:
         choices = []
         structured_choices = self.current_node.content.get("choices", [])
         
@@ -275,7 +388,7 @@ class StoryManager:
 
                 # Condition Check
                 condition = choice_data.get("condition", "")
-                if not self.parser.evaluate_condition(condition):
+                if not self._is_condition_met(condition):
                     continue
                 
                 # --- NEW: Filter startQuest/showQuest events if quest active/done ---
@@ -283,12 +396,8 @@ class StoryManager:
                 quest_event = next((e for e in events if e.get("type") in ["startQuest", "start_quest", "showQuest", "show_quest"]), None)
                 if quest_event:
                     qid = quest_event.get("parameters", {}).get("quest_id")
-                    if qid:
-                        active_q = self.variables.get_var("active_quests", [])
-                        completed_q = self.variables.get_var("completed_quests", [])
-                        returned_q = self.variables.get_var("returned_quests", [])
-                        if qid in active_q or qid in completed_q or qid in returned_q:
-                            continue
+                    if qid and self.variables.quests.is_known(qid):
+                        continue
 
                 # Add Choice
                 disable_choice = False
@@ -302,13 +411,8 @@ class StoryManager:
 
         else:
             # Mode Legacy (Déduction depuis les Edges)
-            outgoing_edges = [
-                e for e in self.project.edges
-                if e.start_node_id == self.current_node.id
-            ]
-            outgoing_edges.sort(key=lambda x: x.start_socket_index)
-
-            for edge in outgoing_edges:
+            # (liens sortants indexés par nœud, déjà triés par socket)
+            for edge in self.project.get_outgoing_edges(self.current_node.id):
                 target_node = self.project.nodes.get(edge.end_node_id)
                 if not target_node:
                     continue
@@ -326,19 +430,12 @@ class StoryManager:
                 })
 
         # --- NEW: Inject Return Quest Choices ---
-        # Check all completed quests (ready to return)
-        completed_quests = self.variables.get_var("completed_quests", [])
-        returned_quests = self.variables.get_var("returned_quests", [])
-        
+        # Only quests whose return scene is this node (project index), if completed
+        # (une quête terminée n'est jamais aussi rendue : un seul statut par quête)
         if self.project:
-            for q_id in completed_quests:
-                if q_id in returned_quests: continue
-                
-                quest = self.project.quests.get(q_id)
-                if not quest: continue
-                
-                # Check if we are at the return scene
-                if quest.return_scene_id and quest.return_scene_id == self.current_node.id:
+            for quest in self.project.get_quests_returned_at(self.current_node.id):
+                q_id = quest.id
+                if self.variables.quests.status(q_id) == QUEST_COMPLETED:
                     choices.append({
                         "text": f"Rendre la quête : {quest.title}",
                         "target_id": None, 
@@ -355,8 +452,16 @@ class StoryManager:
         return choices
 
     def make_choice(self, index: int):
-        """Le joueur clique sur un choix."""
-        choices = self.get_available_choices()
+        """
+        Le joueur clique sur un choix.
+        L'index est résolu sur la liste affichée au joueur (dernier résultat de
+        get_available_choices pour ce nœud), sans réévaluer les conditions.
+        """
+        cached = self._choices_cache
+        if cached is not None and cached[2] is self.current_node:
+            choices = cached[1]
+        else:
+            choices = self.get_available_choices()
         if 0 <= index < len(choices):
             choice = choices[index]
             
@@ -392,7 +497,9 @@ class StoryManager:
             print(f"[StoryManager] Navigating to target_id: {target_id}")
             
             navigated = False
-            if target_id:
+            if self._follow_pending_goto():
+                navigated = True
+            elif target_id:
                 self.set_current_node(target_id)
                 navigated = True
             else:
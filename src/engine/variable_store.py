@@ -1,9 +1,170 @@
 # src/engine/variable_store.py
-from typing import Any, Dict, Callable, List, Optional
+import copy
+from collections.abc import Mapping
+from contextlib import contextmanager
+from types import MappingProxyType
+from typing import Any, Dict, Callable, Iterable, List, Optional, Tuple, Union
+
+from src.engine.persistent import PMap, PVector, thaw
+from src.engine.quest_log import (QuestLog, QUEST_ACTIVE, QUEST_COMPLETED, QUEST_RETURNED,
+                                  QUEST_LIST_KEYS, QUEST_STATUS_BY_KEY)
+
+# Collections stockées sous forme persistante (mise à jour en O(log n), partage structurel)
+PERSISTENT_MAPS = ("inventory", "equipped", "visit_counts", "node_text_overrides", "quest_steps")
+PERSISTENT_VECTORS = ("used_choices",)
+
+
+class VariableView(Mapping):
+    """
+    Vue en lecture seule sur les variables, sans copie (style ChainMap) :
+    le contexte local (ex: 'visits') est superposé aux variables vivantes du store.
+    La vue n'offre aucune écriture et expose les dictionnaires imbriqués via
+    MappingProxyType, les listes en PVector (égal à la liste d'origine) et
+    les ensembles en frozenset : une condition ne peut pas modifier l'état à
+    travers elle.
+    """
+    __slots__ = ("_overlay", "_variables")
+
+    def __init__(self, variables: Dict[str, Any], overlay: Optional[Dict[str, Any]] = None):
+        self._variables = variables
+        self._overlay = overlay or {}
+
+    def __getitem__(self, name: str) -> Any:
+        if name in self._overlay:
+            value = self._overlay[name]
+        else:
+            value = self._variables[name]
+        if isinstance(value, dict):
+            return MappingProxyType(value)
+        if isinstance(value, list):
+            return PVector(value)
+        if isinstance(value, set):
+            return frozenset(value)
+        return value
+
+    def resolve(self, name: str) -> Any:
+        """Lecture d'une variable pour l'évaluateur (NameError si absente)."""
+        try:
+            return self[name]
+        except KeyError:
+            raise NameError(f"name '{name}' is not defined") from None
+
+    def __contains__(self, name) -> bool:
+        return name in self._overlay or name in self._variables
+
+    def __iter__(self):
+        yield from self._overlay
+        for name in self._variables:
+            if name not in self._overlay:
+                yield name
+
+    def __len__(self) -> int:
+        return len(self._variables) + sum(1 for name in self._overlay if name not in self._variables)
+
+
+_MISSING = object()
+# Valeurs modifiables sur place : copiées en profondeur à l'ouverture d'une transaction
+_MUTABLE_TYPES = (dict, list, set)
+
+
+def _differs(saved: Any, value: Any) -> bool:
+    """Changement depuis la copie de transaction : identité, ou égalité pour les copies profondes."""
+    if saved is value:
+        return False
+    if isinstance(saved, _MUTABLE_TYPES):
+        return type(saved) is not type(value) or saved != value
+    return True
+
+
+def _restore_in_place(value: Any, saved: Any) -> bool:
+    """Remet un conteneur modifié sur place à son contenu d'origine (False si types différents)."""
+    if type(value) is not type(saved) or not isinstance(value, _MUTABLE_TYPES):
+        return False
+    value.clear()
+    if isinstance(value, list):
+        value.extend(saved)
+    else:
+        value.update(saved)
+    return True
+
+
+class Subscription:
+    """
+    Abonnement à des variables : noms exacts ('health'), préfixes ('location_*')
+    ou toutes les variables ('*').
+    Un abonnement 'batch' reçoit un seul dict {nom: valeur} par lot de changements.
+    """
+    __slots__ = ("callback", "patterns", "batch", "order")
+
+    def __init__(self, callback: Callable, patterns: Tuple[str, ...], batch: bool, order: int):
+        self.callback = callback
+        self.patterns = patterns
+        self.batch = batch
+        self.order = order
+
+
+class StateCheckpoint:
+    """État complet à une position du journal (copie superficielle : les valeurs sont immuables)."""
+    __slots__ = ("position", "variables")
+
+    def __init__(self, position: int, variables: Dict[str, Any]):
+        self.position = position
+        self.variables = variables
+
+
+class StateSnapshot:
+    """
+    Instantané = checkpoint + delta (variables modifiées depuis ce checkpoint).
+    Sa capture ne coûte que le nombre de variables modifiées depuis le dernier checkpoint.
+    """
+    __slots__ = ("checkpoint", "delta", "position")
+
+    def __init__(self, checkpoint: StateCheckpoint, delta: Dict[str, Any], position: int):
+        self.checkpoint = checkpoint
+        self.delta = delta
+        self.position = position
+
+    def materialize(self) -> Dict[str, Any]:
+        """Reconstruit l'état complet (valeurs persistantes, non converties)."""
+        state = dict(self.checkpoint.variables)
+        for name, value in self.delta.items():
+            if value is _MISSING:
+                state.pop(name, None)
+            else:
+                state[name] = value
+        return state
+
+    def to_dict(self) -> Dict[str, Any]:
+        """État complet en types natifs (format de sauvegarde JSON)."""
+        return {name: thaw(value) for name, value in self.materialize().items()}
+
 
 class VariableStore:
+    # Au-delà, un checkpoint est pris automatiquement et le journal est tronqué
+    JOURNAL_LIMIT = 10000
+
     def __init__(self):
-        self._observers: List[Callable[[str, Any], None]] = []
+        # Abonnements, indexés par motif exact / préfixe / joker
+        self._subscriptions: List[Subscription] = []
+        self._exact_subs: Dict[str, List[Subscription]] = {}
+        self._prefix_subs: List[Tuple[str, Subscription]] = []
+        self._wildcard_subs: List[Subscription] = []
+        # Table de routage précalculée : nom de variable -> abonnements concernés
+        self._routes: Dict[str, Tuple[Subscription, ...]] = {}
+        self._subscription_order = 0
+        self._notification_stats = {"delivered": 0, "dropped": 0, "errors": 0}
+        # Transactions imbriquées : instantané des variables à l'ouverture de chaque niveau
+        self._transactions: List[Dict[str, Any]] = []
+        self._pending: Dict[str, None] = {}
+        # Compteur de version par variable (incrémenté à chaque changement)
+        self._versions: Dict[str, int] = {}
+        self.version = 0
+        # Index d'appartenance de 'used_choices' (reconstruit si la liste est remplacée)
+        self._used_index = PMap()
+        self._used_index_source = None
+        # État des quêtes (statuts O(1)) ; les listes *_quests en sont des vues publiées
+        self.quests = QuestLog()
+        self._publishing_quests = False
         self._variables: Dict[str, Any] = {
             "health": 100,
             "max_health": 100,
@@ -14,19 +175,29 @@ class VariableStore:
             "level": 1,
             "xp_next": 100,
             "gold": 0,
-            "inventory": {},
+            "inventory": PMap(),
             "active_quests": [],
             "completed_quests": [],
             "returned_quests": [],
             "active_quest_offer": None,
             "player_coordinates": {"x": 0, "y": 0, "continent": "Eldaron"},
         }
+        # Journal des changements (nom, ancienne valeur, nouvelle valeur) depuis le dernier checkpoint
+        self._journal: List[Tuple[str, Any, Any]] = []
+        self._journal_start = 0
+        # Dernière valeur de chaque variable modifiée depuis le checkpoint (delta des instantanés)
+        self._delta: Dict[str, Any] = {}
+        self._checkpoint = StateCheckpoint(0, dict(self._variables))
 
     def load_state(self, data: Dict[str, Any]):
         if not data:
             return
         for key, value in data.items():
+            value = self._freeze(key, value)
+            old_val = self._variables.get(key, _MISSING)
             self._variables[key] = value
+            self._record(key, old_val, value)
+            self._bump_version(key)
         coords = self._variables.get("player_coordinates")
         if not isinstance(coords, dict):
              self._variables["player_coordinates"] = {"x": 0, "y": 0, "continent": "Eldaron"}
@@ -34,142 +205,399 @@ class VariableStore:
              if "x" not in coords: coords["x"] = 0
              if "y" not in coords: coords["y"] = 0
              if "continent" not in coords: coords["continent"] = "Eldaron"
+        self._reload_quests()
+        # Nouvel état complet : les instantanés suivants partent de ce checkpoint
+        if not self._transactions:
+            self.checkpoint()
+
+    def _reload_quests(self):
+        self.quests.load_lists(self._variables.get("active_quests"),
+                               self._variables.get("completed_quests"),
+                               self._variables.get("returned_quests"),
+                               self._variables.get("quest_steps"))
 
     def set_var(self, name: str, value: Any):
         old_val = self._variables.get(name)
-        if old_val != value:
+        value = self._freeze(name, value)
+        # Collections persistantes : une nouvelle instance signifie un changement
+        # (comparaison par identité, sans parcours O(n))
+        if old_val is value:
+            return
+        if isinstance(value, (PMap, PVector)) or old_val != value:
+            previous = self._variables.get(name, _MISSING)
             self._variables[name] = value
-            self.notify(name, value)
+            self._record(name, previous, value)
+            self._bump_version(name)
+            if not self._publishing_quests:
+                self._sync_quests(name, value)
+            if self._transactions:
+                self._pending[name] = None
+            else:
+                self._dispatch({name: value})
+
+    def _sync_quests(self, name: str, value: Any):
+        """Écriture directe d'une liste de quêtes (script, sauvegarde) : mise à jour du QuestLog."""
+        if name in QUEST_STATUS_BY_KEY:
+            self.quests.sync_list(QUEST_STATUS_BY_KEY[name], value)
+        elif name == "quest_steps":
+            self.quests.sync_steps(value if isinstance(value, Mapping) else None)
+
+    def _publish_quests(self, *statuses: str, step_of: Optional[str] = None):
+        """Republie les vues liste (et l'étape d'une quête) après une transition du QuestLog."""
+        self._publishing_quests = True
+        try:
+            for status in statuses:
+                self.set_var(QUEST_LIST_KEYS[status], self.quests.ids(status))
+            if step_of is not None:
+                steps = self._get_map("quest_steps")
+                self.set_var("quest_steps", steps.set(step_of, self.quests.get_step(step_of)))
+        finally:
+            self._publishing_quests = False
+
+    @staticmethod
+    def _freeze(name: str, value: Any) -> Any:
+        """Convertit les collections connues (dict / list) en PMap / PVector."""
+        if name in PERSISTENT_MAPS:
+            if isinstance(value, Mapping) and not isinstance(value, PMap):
+                return PMap(value)
+        elif name in PERSISTENT_VECTORS:
+            if isinstance(value, (list, tuple)):
+                return PVector(value)
+        return value
+
+    def _get_map(self, name: str) -> PMap:
+        value = self._variables.get(name)
+        if isinstance(value, PMap):
+            return value
+        return PMap(value) if isinstance(value, Mapping) else PMap()
+
+    def _get_vector(self, name: str) -> PVector:
+        value = self._variables.get(name)
+        if isinstance(value, PVector):
+            return value
+        return PVector(value) if isinstance(value, (list, tuple)) else PVector()
+
+    def _bump_version(self, name: str):
+        self._versions[name] = self._versions.get(name, 0) + 1
+        self.version += 1
+
+    def get_version(self, name: str) -> int:
+        """Version d'une variable : change dès que sa valeur change (0 si jamais écrite)."""
+        return self._versions.get(name, 0)
 
     def get_var(self, name: str, default: Any = None) -> Any:
         return self._variables.get(name, default)
         
     def get_all(self) -> Dict[str, Any]:
-        return self._variables.copy()
+        """Copie des variables en types natifs (dict / list), prête pour la sauvegarde JSON."""
+        return {name: thaw(value) for name, value in self._variables.items()}
+
+    def view(self, extra_context: Optional[Dict[str, Any]] = None) -> VariableView:
+        """Vue en lecture seule (sans copie) des variables, avec contexte local optionnel."""
+        return VariableView(self._variables, extra_context)
+
+    def subscribe(self, patterns: Union[str, Iterable[str]], callback: Callable,
+                  batch: bool = False) -> Subscription:
+        """
+        Abonne `callback` aux variables désignées par `patterns` :
+        nom exact, préfixe terminé par '*' (ex: 'location_*') ou '*' pour tout.
+        - batch=False : callback(nom, valeur) pour chaque variable modifiée ;
+        - batch=True : callback({nom: valeur}) une fois par lot (transaction).
+        """
+        if isinstance(patterns, str):
+            patterns = (patterns,)
+        patterns = tuple(dict.fromkeys(patterns))
+
+        for sub in self._subscriptions:
+            if sub.callback == callback and sub.patterns == patterns and sub.batch == batch:
+                return sub
+
+        self._subscription_order += 1
+        sub = Subscription(callback, patterns, batch, self._subscription_order)
+        self._subscriptions.append(sub)
+        for pattern in patterns:
+            if pattern == "*":
+                self._wildcard_subs.append(sub)
+            elif pattern.endswith("*"):
+                self._prefix_subs.append((pattern[:-1], sub))
+            else:
+                self._exact_subs.setdefault(pattern, []).append(sub)
+        self._routes.clear()
+        return sub
+
+    def unsubscribe(self, subscription_or_callback: Union[Subscription, Callable]):
+        """Retire un abonnement (ou tous les abonnements d'un callback)."""
+        target = subscription_or_callback
+        removed = [sub for sub in self._subscriptions
+                   if sub is target or (not isinstance(target, Subscription) and sub.callback == target)]
+        if not removed:
+            return
+        for sub in removed:
+            self._subscriptions.remove(sub)
+        self._wildcard_subs = [sub for sub in self._wildcard_subs if sub not in removed]
+        self._prefix_subs = [(prefix, sub) for prefix, sub in self._prefix_subs if sub not in removed]
+        for name in list(self._exact_subs):
+            subs = [sub for sub in self._exact_subs[name] if sub not in removed]
+            if subs:
+                self._exact_subs[name] = subs
+            else:
+                del self._exact_subs[name]
+        self._routes.clear()
 
     def add_observer(self, callback: Callable[[str, Any], None]):
-        if callback not in self._observers:
-            self._observers.append(callback)
+        self.subscribe("*", callback)
+
+    def add_batch_observer(self, callback: Callable[[Dict[str, Any]], None]):
+        """Observer appelé une fois par lot de changements (transaction ou set_var isolé)."""
+        self.subscribe("*", callback, batch=True)
+
+    def _route(self, name: str) -> Tuple[Subscription, ...]:
+        route = self._routes.get(name)
+        if route is None:
+            matched = set(self._exact_subs.get(name, ()))
+            matched.update(sub for prefix, sub in self._prefix_subs if name.startswith(prefix))
+            matched.update(self._wildcard_subs)
+            route = tuple(sorted(matched, key=lambda sub: sub.order))
+            self._routes[name] = route
+        return route
+
+    def _deliver(self, sub: Subscription, *args):
+        try:
+            sub.callback(*args)
+            self._notification_stats["delivered"] += 1
+        except Exception as e:
+            self._notification_stats["errors"] += 1
+            print(f"[VariableStore] Erreur dans un observer : {e}")
 
     def notify(self, name: str, value: Any):
-        for callback in self._observers:
-            try:
-                callback(name, value)
-            except Exception as e:
-                print(f"[VariableStore] Erreur dans un observer : {e}")
+        """Notifie les abonnés (non-batch) d'une variable."""
+        self._dispatch({name: value}, include_batch=False)
+
+    def _dispatch(self, changes: Dict[str, Any], include_batch: bool = True):
+        if not self._subscriptions:
+            return
+        stats = self._notification_stats
+        subscription_count = len(self._subscriptions)
+        batches: Dict[Subscription, Dict[str, Any]] = {}
+        for name, value in changes.items():
+            route = self._route(name)
+            # Abonnés non concernés : notifications évitées par le routage
+            stats["dropped"] += subscription_count - len(route)
+            for sub in route:
+                if not sub.batch:
+                    self._deliver(sub, name, value)
+                elif include_batch:
+                    batches.setdefault(sub, {})[name] = value
+        for sub in sorted(batches, key=lambda sub: sub.order):
+            self._deliver(sub, batches[sub])
+
+    def get_notification_stats(self) -> Dict[str, int]:
+        """Compteurs : notifications délivrées, évitées par le routage, et en erreur."""
+        return dict(self._notification_stats, subscriptions=len(self._subscriptions))
+
+    def reset_notification_stats(self):
+        for key in self._notification_stats:
+            self._notification_stats[key] = 0
 
     def notify_all(self):
-        for name, value in self._variables.items():
-            self.notify(name, value)
+        self._dispatch(dict(self._variables))
+
+    @contextmanager
+    def transaction(self):
+        """
+        Regroupe les écritures : les observers reçoivent une seule notification
+        par variable (valeur finale) à la validation de la transaction la plus externe.
+        Si une exception traverse le bloc, les variables sont restaurées telles
+        qu'à l'ouverture de ce niveau et aucune notification n'est émise pour lui.
+
+            with store.transaction():
+                store.set_var("gold", 10)
+                store.add_item("potion")
+        """
+        snapshot = self._snapshot_variables()
+        self._transactions.append(snapshot)
+        try:
+            yield self
+        except BaseException:
+            self._transactions.pop()
+            self._rollback(snapshot)
+            if not self._transactions:
+                self._pending.clear()
+            raise
+        self._transactions.pop()
+        if not self._transactions:
+            self._commit(snapshot)
+
+    @property
+    def in_transaction(self) -> bool:
+        return bool(self._transactions)
+
+    def _snapshot_variables(self) -> Dict[str, Any]:
+        """
+        Copie des variables pour l'annulation. Les conteneurs persistants
+        sont partagés ; les dicts / listes ordinaires (player_coordinates,
+        listes de quêtes, variables de script) peuvent être modifiés sur
+        place et sont copiés en profondeur.
+        """
+        return {name: copy.deepcopy(value) if isinstance(value, _MUTABLE_TYPES) else value
+                for name, value in self._variables.items()}
+
+    def _rollback(self, snapshot: Dict[str, Any]):
+        # Valeurs annulées, copiées avant une éventuelle remise en état sur place (journal)
+        changed = [(name, copy.deepcopy(value) if isinstance(value, _MUTABLE_TYPES) else value)
+                   for name, value in self._variables.items() if _differs(snapshot.get(name, _MISSING), value)]
+        live = dict(self._variables)
+        self._variables.clear()
+        self._variables.update(snapshot)
+        for name, saved in snapshot.items():
+            value = live.get(name, _MISSING)
+            if not _differs(saved, value) or _restore_in_place(value, saved):
+                # L'objet vivant est gardé : les références déjà distribuées restent à jour
+                self._variables[name] = value
+        for name, value in changed:
+            # Le journal reste en ajout seul : l'annulation y est inscrite comme un changement inverse
+            self._record(name, value, self._variables.get(name, _MISSING))
+            # Nouvelle version (et non l'ancienne) : un cache rempli pendant la
+            # transaction ne doit pas être confondu avec l'état restauré
+            self._bump_version(name)
+        self._reload_quests()
+
+    def _commit(self, snapshot: Dict[str, Any]):
+        changes = {}
+        for name in self._pending:
+            value = self._variables.get(name)
+            old_val = snapshot.get(name, _MISSING)
+            if value is old_val:
+                continue
+            # Aller-retour dans la transaction (ex: 10 -> 20 -> 10) : rien à notifier
+            if not isinstance(value, (PMap, PVector)) and old_val == value:
+                continue
+            changes[name] = value
+        self._pending.clear()
+        if changes:
+            self._dispatch(changes)
+
+    # --- Journal des changements et instantanés ---
+    def _record(self, name: str, old_val: Any, new_val: Any):
+        self._journal.append((name, old_val, new_val))
+        self._delta[name] = new_val
+        if len(self._journal) >= self.JOURNAL_LIMIT and not self._transactions:
+            self.checkpoint()
+
+    @property
+    def journal_position(self) -> int:
+        """Position absolue dans le journal (nombre total de changements enregistrés)."""
+        return self._journal_start + len(self._journal)
+
+    def changes_since(self, position: int) -> List[Tuple[str, Any, Any]]:
+        """
+        Changements (nom, ancienne valeur, nouvelle valeur) depuis une position du journal.
+        Une valeur absente est représentée par None. Lève ValueError si cette
+        partie du journal a été tronquée par un checkpoint.
+        """
+        if position < self._journal_start:
+            raise ValueError(f"Journal tronqué : position {position} antérieure au checkpoint {self._journal_start}")
+        entries = self._journal[position - self._journal_start:]
+        return [(name, None if old is _MISSING else old, None if new is _MISSING else new)
+                for name, old, new in entries]
+
+    def checkpoint(self) -> StateCheckpoint:
+        """Fige l'état courant (O(nombre de variables)) et tronque le journal."""
+        self._checkpoint = StateCheckpoint(self.journal_position, dict(self._variables))
+        self._journal_start = self._checkpoint.position
+        self._journal = []
+        self._delta = {}
+        return self._checkpoint
+
+    def snapshot(self) -> StateSnapshot:
+        """Instantané en O(variables modifiées depuis le dernier checkpoint)."""
+        return StateSnapshot(self._checkpoint, dict(self._delta), self.journal_position)
+
+    def restore(self, snapshot: StateSnapshot):
+        """Revient à l'état d'un instantané (une seule notification groupée)."""
+        target = snapshot.materialize()
+        with self.transaction():
+            self._publishing_quests = True
+            try:
+                for name in [n for n in self._variables if n not in target]:
+                    self._record(name, self._variables.pop(name), _MISSING)
+                    self._bump_version(name)
+                    self._pending[name] = None
+                for name, value in target.items():
+                    self.set_var(name, value)
+            finally:
+                self._publishing_quests = False
+            self._reload_quests()
 
     def add_xp(self, amount: int):
-        current_xp = self.get_var("xp", 0)
-        current_lvl = self.get_var("level", 1)
-        xp_next = self.get_var("xp_next", 100)
+        with self.transaction():
+            current_xp = self.get_var("xp", 0)
+            current_lvl = self.get_var("level", 1)
+            xp_next = self.get_var("xp_next", 100)
         
-        current_xp += amount
+            current_xp += amount
         
-        leveled_up = False
-        while current_xp >= xp_next:
-            current_xp -= xp_next
-            current_lvl += 1
-            xp_next = int(current_lvl * 100 * 1.5) # Simple curve
-            leveled_up = True
+            leveled_up = False
+            while current_xp >= xp_next:
+                current_xp -= xp_next
+                current_lvl += 1
+                xp_next = int(current_lvl * 100 * 1.5) # Simple curve
+                leveled_up = True
             
-        self.set_var("xp", current_xp)
-        self.set_var("level", current_lvl)
-        self.set_var("xp_next", xp_next)
+            self.set_var("xp", current_xp)
+            self.set_var("level", current_lvl)
+            self.set_var("xp_next", xp_next)
         
-        if leveled_up:
-            print(f"[Jeu] Niveau supérieur ! Niveau {current_lvl}")
-            # Optionally trigger an event or heal player here
-            max_hp = self.get_var("max_health", 100)
-            self.set_var("health", max_hp)
+            if leveled_up:
+                print(f"[Jeu] Niveau supérieur ! Niveau {current_lvl}")
+                # Optionally trigger an event or heal player here
+                max_hp = self.get_var("max_health", 100)
+                self.set_var("health", max_hp)
 
     def add_item(self, item_id: str, qty: int = 1):
-        inv = self.get_var("inventory", {})
-        if not isinstance(inv, dict):
-            inv = {}
-        else:
-            inv = inv.copy()
-        if item_id in inv:
-            inv[item_id] += qty
-        else:
-            inv[item_id] = qty
-        self.set_var("inventory", inv)
+        inv = self._get_map("inventory")
+        self.set_var("inventory", inv.set(item_id, inv.get(item_id, 0) + qty))
         print(f"[Jeu] Ajout item : {item_id} x{qty}")
 
     def remove_item(self, item_id: str, qty: int = 1):
-        inv = self.get_var("inventory", {})
-        if not isinstance(inv, dict):
-            inv = {}
-        else:
-            inv = inv.copy()
+        inv = self._get_map("inventory")
         if item_id in inv:
-            inv[item_id] = max(0, inv[item_id] - qty)
-            if inv[item_id] == 0:
-                del inv[item_id]
+            remaining = max(0, inv[item_id] - qty)
+            if remaining == 0:
+                inv = inv.delete(item_id)
+            else:
+                inv = inv.set(item_id, remaining)
             self.set_var("inventory", inv)
 
     def start_quest(self, quest_id: str):
-        active = self.get_var("active_quests", [])
-        completed = self.get_var("completed_quests", [])
-        returned = self.get_var("returned_quests", [])
-        
         # Prevent restarting if already active, completed or returned
-        if quest_id in active or quest_id in completed or quest_id in returned:
+        if not self.quests.start(quest_id):
             return
 
-        active.append(quest_id)
-        self.set_var("active_quests", active)
-        
         # Initialize step progress
-        steps = self.get_var("quest_steps", {})
-        steps[quest_id] = 0
-        self.set_var("quest_steps", steps)
-        
+        self._publish_quests(QUEST_ACTIVE, step_of=quest_id)
         print(f"[Jeu] Quête démarrée : {quest_id}")
 
     def advance_quest_step(self, quest_id: str):
-        active = self.get_var("active_quests", [])
-        if quest_id not in active:
+        step = self.quests.advance(quest_id)
+        if step is None:
             return
-
-        steps = self.get_var("quest_steps", {})
-        current_step = steps.get(quest_id, 0)
-        steps[quest_id] = current_step + 1
-        self.set_var("quest_steps", steps)
-        print(f"[Jeu] Quête {quest_id} avancée à l'étape {current_step + 1}")
+        self._publish_quests(step_of=quest_id)
+        print(f"[Jeu] Quête {quest_id} avancée à l'étape {step}")
 
     def complete_quest(self, quest_id: str):
-        active = self.get_var("active_quests", [])
-        completed = self.get_var("completed_quests", [])
-        
         # Only complete if currently active
-        if quest_id in active:
-            active.remove(quest_id)
-            self.set_var("active_quests", active)
-            
-            if quest_id not in completed:
-                completed.append(quest_id)
-                self.set_var("completed_quests", completed)
-                print(f"[Jeu] Quête terminée : {quest_id}")
+        if self.quests.complete(quest_id):
+            self._publish_quests(QUEST_ACTIVE, QUEST_COMPLETED)
+            print(f"[Jeu] Quête terminée : {quest_id}")
         else:
             print(f"[Jeu] Tentative de terminer une quête non active : {quest_id}")
 
     def return_quest(self, quest_id: str):
-        completed = self.get_var("completed_quests", [])
-        returned = self.get_var("returned_quests", [])
-        
         # Only return if currently completed
-        if quest_id in completed:
-            completed.remove(quest_id)
-            self.set_var("completed_quests", completed)
-            
-            if quest_id not in returned:
-                returned.append(quest_id)
-                self.set_var("returned_quests", returned)
-                print(f"[Jeu] Quête rendue : {quest_id}")
+        if self.quests.mark_returned(quest_id):
+            self._publish_quests(QUEST_COMPLETED, QUEST_RETURNED)
+            print(f"[Jeu] Quête rendue : {quest_id}")
         else:
             print(f"[Jeu] Tentative de rendre une quête non terminée : {quest_id}")
 
@@ -181,58 +609,50 @@ class VariableStore:
         self.set_var("active_quest_offer", None)
 
     def equip_item(self, item_id: str, slot: str):
-        equipped = self.get_var("equipped", {})
-        if not isinstance(equipped, dict): equipped = {}
-        else: equipped = equipped.copy()
-        if slot in equipped:
-            pass
-        equipped[slot] = item_id
-        self.set_var("equipped", equipped)
+        self.set_var("equipped", self._get_map("equipped").set(slot, item_id))
         print(f"[Jeu] Item équipé : {item_id} sur {slot}")
 
     def unequip_item(self, slot: str):
-        equipped = self.get_var("equipped", {})
-        if not isinstance(equipped, dict): equipped = {}
-        else: equipped = equipped.copy()
+        equipped = self._get_map("equipped")
         if slot in equipped:
-            del equipped[slot]
-            self.set_var("equipped", equipped)
+            self.set_var("equipped", equipped.delete(slot))
             print(f"[Jeu] Item déséquipé du slot {slot}")
 
+    def _get_used_index(self, used: PVector) -> PMap:
+        if self._used_index_source is not used:
+            self._used_index = PMap((choice_id, True) for choice_id in used)
+            self._used_index_source = used
+        return self._used_index
+
     def mark_choice_used(self, choice_id: str):
-        used = self.get_var("used_choices", [])
-        if not isinstance(used, list): used = []
-        else: used = list(used)
-        if choice_id not in used:
-            used.append(choice_id)
+        used = self._get_vector("used_choices")
+        index = self._get_used_index(used)
+        if choice_id not in index:
+            used = used.append(choice_id)
+            self._used_index = index.set(choice_id, True)
+            self._used_index_source = used
             self.set_var("used_choices", used)
 
     def is_choice_used(self, choice_id: str) -> bool:
         used = self.get_var("used_choices", [])
+        if isinstance(used, PVector):
+            return choice_id in self._get_used_index(used)
         if not isinstance(used, list): return False
         return choice_id in used
 
     def set_node_text(self, node_id: str, text: str):
-        overrides = self.get_var("node_text_overrides", {})
-        if not isinstance(overrides, dict): overrides = {}
-        else: overrides = overrides.copy()
-        overrides[node_id] = text
-        self.set_var("node_text_overrides", overrides)
+        self.set_var("node_text_overrides", self._get_map("node_text_overrides").set(node_id, text))
 
     def get_node_text(self, node_id: str) -> Optional[str]:
         overrides = self.get_var("node_text_overrides", {})
-        if not isinstance(overrides, dict): return None
+        if not isinstance(overrides, Mapping): return None
         return overrides.get(node_id)
 
     def increment_visit_count(self, node_id: str):
-        visits = self.get_var("visit_counts", {})
-        if not isinstance(visits, dict): visits = {}
-        else: visits = visits.copy()
-        current = visits.get(node_id, 0)
-        visits[node_id] = current + 1
-        self.set_var("visit_counts", visits)
-        
+        visits = self._get_map("visit_counts")
+        self.set_var("visit_counts", visits.set(node_id, visits.get(node_id, 0) + 1))
+
     def get_visit_count(self, node_id: str) -> int:
         visits = self.get_var("visit_counts", {})
-        if not isinstance(visits, dict): return 0
-        return visits.get(node_id, 0)
\ No newline at end of file
+        if not isinstance(visits, Mapping): return 0
+        return visits.get(node_id, 0)
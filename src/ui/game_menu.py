@@ -1,4 +1,5 @@
 import os
+from collections.abc import Mapping
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, 
                              QListWidget, QFrame, QScrollArea, QStackedWidget, QListWidgetItem, 
                              QGraphicsDropShadowEffect, QMenu, QSizePolicy, QGraphicsOpacityEffect,
@@ -599,8 +600,8 @@ class GameMenu(QWidget):
         inv_data = self.story_manager.variables.get_var("inventory", {})
         equipped_data = self.story_manager.variables.get_var("equipped", {})
         
-        if not isinstance(inv_data, dict): inv_data = {}
-        if not isinstance(equipped_data, dict): equipped_data = {}
+        if not isinstance(inv_data, Mapping): inv_data = {}
+        if not isinstance(equipped_data, Mapping): equipped_data = {}
             
         project_items = self.story_manager.project.items if self.story_manager.project else {}
         assets_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "assets", "icons")
@@ -663,7 +664,7 @@ class GameMenu(QWidget):
         menu = ThemedMenu(self)
         
         equipped_data = self.story_manager.variables.get_var("equipped", {})
-        if not isinstance(equipped_data, dict): equipped_data = {}
+        if not isinstance(equipped_data, Mapping): equipped_data = {}
         
         # Check if equipped (value of any slot)
         equipped_slot = None
@@ -746,7 +747,7 @@ class GameMenu(QWidget):
         if not self.story_manager: return
         
         equipped = self.story_manager.variables.get_var("equipped", {})
-        if not isinstance(equipped, dict): equipped = {}
+        if not isinstance(equipped, Mapping): equipped = {}
         project_items = self.story_manager.project.items if self.story_manager.project else {}
         
         slots = ["head", "torso", "arms", "legs", "feet", "weapon"]
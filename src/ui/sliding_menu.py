@@ -1,4 +1,5 @@
 import os
+from collections.abc import Mapping
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, 
                              QListWidget, QFrame, QScrollArea, QStackedWidget, QListWidgetItem, QGraphicsDropShadowEffect, QMenu, QSizePolicy)
 from PyQt6.QtGui import QPixmap, QIcon
@@ -452,9 +453,9 @@ class SlidingMenu(QWidget):
         equipped_data = self.story_manager.variables.get_var("equipped", {})
         
         # Type safety checks
-        if not isinstance(inv_data, dict):
+        if not isinstance(inv_data, Mapping):
             inv_data = {}
-        if not isinstance(equipped_data, dict):
+        if not isinstance(equipped_data, Mapping):
             equipped_data = {}
             
         project_items = self.story_manager.project.items if self.story_manager.project else {}
@@ -529,7 +530,7 @@ class SlidingMenu(QWidget):
         if not self.story_manager: return
         
         equipped = self.story_manager.variables.get_var("equipped", {})
-        if not isinstance(equipped, dict):
+        if not isinstance(equipped, Mapping):
             equipped = {}
             
         project_items = self.story_manager.project.items if self.story_manager.project else {}
@@ -0,0 +1,56 @@
+import unittest
+from unittest.mock import patch
+from src.core.models import ProjectModel, NodeModel
+from src.core.definitions import NodeType
+from src.engine.variable_store import VariableStore
+from src.engine.script_parser import ScriptParser
+from src.engine.story_manager import StoryManager
+
+
+class TestChoiceDependencies(unittest.TestCase):
+    def setUp(self):
+        self.project = ProjectModel()
+        self.node = NodeModel(id="start", type=NodeType.START)
+        self.node.content["choices"] = [
+            {"id": "c1", "text": "Payer", "condition": "$gold >= 10", "target_node_id": "start"},
+            {"id": "c2", "text": "Menacer", "condition": "strength > 12", "target_node_id": "start"},
+        ]
+        self.project.add_node(self.node)
+        self.manager = StoryManager()
+        self.manager.load_project(self.project)
+
+    def test_dependencies_recorded(self):
+        parser = ScriptParser(VariableStore())
+        self.assertEqual(parser.get_condition_dependencies("$gold >= 10 and visits > 1"), {"gold", "visits"})
+        self.assertEqual(parser.get_condition_dependencies(""), frozenset())
+
+    def test_versions_per_key(self):
+        store = VariableStore()
+        self.assertEqual(store.get_version("gold"), 0)
+        store.set_var("gold", 5)
+        store.set_var("gold", 5)  # valeur identique : pas de nouvelle version
+        self.assertEqual(store.get_version("gold"), 1)
+
+    def test_only_changed_inputs_reevaluated(self):
+        self.assertEqual([c["text"] for c in self.manager.get_available_choices()], [])
+
+        with patch.object(self.manager.parser, "evaluate_condition",
+                          wraps=self.manager.parser.evaluate_condition) as evaluate:
+            self.manager.get_available_choices()
+            evaluate.assert_not_called()
+
+            self.manager.variables.set_var("gold", 20)
+            choices = self.manager.get_available_choices()
+            evaluate.assert_called_once_with("$gold >= 10")
+
+        self.assertEqual([c["text"] for c in choices], ["Payer"])
+
+    def test_quest_transitions_bump_versions(self):
+        store = self.manager.variables
+        version = store.get_version("active_quests")
+        store.start_quest("q1")
+        self.assertGreater(store.get_version("active_quests"), version)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+from unittest.mock import patch
+from src.core.models import ProjectModel, NodeModel
+from src.core.definitions import NodeType
+from src.engine.story_manager import StoryManager
+
+
+class TestChoiceMemo(unittest.TestCase):
+    def setUp(self):
+        project = ProjectModel()
+        start = NodeModel(id="start", type=NodeType.START)
+        start.content["choices"] = [
+            {"id": "c1", "text": "Riche", "target_node_id": "end", "condition": "$gold >= 10"},
+            {"id": "c2", "text": "Partir", "target_node_id": "end"},
+        ]
+        project.add_node(start)
+        project.add_node(NodeModel(id="end", type=NodeType.DIALOGUE))
+        self.manager = StoryManager()
+        self.manager.load_project(project)
+
+    def test_same_list_returned_when_nothing_changed(self):
+        first = self.manager.get_available_choices()
+        with patch.object(self.manager, "_compute_available_choices", wraps=self.manager._compute_available_choices) as spy:
+            self.assertIs(self.manager.get_available_choices(), first)
+            spy.assert_not_called()
+
+    def test_recomputed_after_state_change(self):
+        self.assertEqual(len(self.manager.get_available_choices()), 1)
+        self.manager.variables.set_var("gold", 20)
+        self.assertEqual(len(self.manager.get_available_choices()), 2)
+
+    def test_recomputed_when_choices_list_replaced(self):
+        self.manager.get_available_choices()
+        self.manager.current_node.content["choices"] = [{"id": "c3", "text": "Autre", "target_node_id": "end"}]
+        self.assertEqual(self.manager.get_available_choices()[0]["text"], "Autre")
+
+    def test_recomputed_after_choice_edited_in_place(self):
+        self.manager.variables.set_var("gold", 20)
+        self.manager.project.add_node(NodeModel(id="cave", type=NodeType.DIALOGUE))
+        self.assertEqual(self.manager.get_available_choices()[0]["target_id"], "end")
+        self.manager.current_node.content["choices"][0]["target_node_id"] = "cave"
+        self.manager.project.mark_modified()
+        self.assertEqual(self.manager.get_available_choices()[0]["target_id"], "cave")
+
+    def test_make_choice_uses_displayed_list(self):
+        displayed = self.manager.get_available_choices()
+        self.assertEqual(displayed[0]["text"], "Partir")
+        with patch.object(self.manager, "_compute_available_choices") as spy:
+            result = self.manager.make_choice(0)
+            spy.assert_not_called()
+        self.assertTrue(result["navigated"])
+        self.assertEqual(self.manager.current_node.id, "end")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import traceback
+import unittest
+from src.engine.variable_store import VariableStore
+from src.engine.script_parser import ScriptParser, CompiledCache, ConditionCache
+
+
+class TestConditionCache(unittest.TestCase):
+    def setUp(self):
+        self.store = VariableStore()
+        self.parser = ScriptParser(self.store)
+
+    def test_condition_compiled_once(self):
+        self.store.set_var("gold", 20)
+        self.assertTrue(self.parser.evaluate_condition("$gold >= 10"))
+        self.assertTrue(self.parser.evaluate_condition("$gold >= 10"))
+
+        stats = self.parser.get_condition_stats()
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["hits"], 1)
+
+    def test_variables_bound_at_evaluation(self):
+        self.store.set_var("gold", 5)
+        self.assertFalse(self.parser.evaluate_condition("${gold} >= 10"))
+        self.store.set_var("gold", 50)
+        self.assertTrue(self.parser.evaluate_condition("${gold} >= 10"))
+        self.assertTrue(self.parser.evaluate_condition("visits > 1", {"visits": 2}))
+
+    def test_syntax_error_cached(self):
+        self.assertFalse(self.parser.evaluate_condition("gold >="))
+        self.assertFalse(self.parser.evaluate_condition("gold >="))
+        self.assertEqual(self.parser.get_condition_stats()["misses"], 1)
+
+    def test_cached_error_does_not_grow(self):
+        cache = ConditionCache()
+        depths, errors = [], []
+        for _ in range(50):
+            try:
+                cache.get("gold >=")
+            except SyntaxError as e:
+                depths.append(len(traceback.extract_tb(e.__traceback__)))
+                errors.append(e)
+        # Une exception neuve à chaque appel : pile constante, message conservé
+        self.assertEqual(len(depths), 50)
+        self.assertEqual(len(set(depths)), 1)
+        self.assertIsNot(errors[0], errors[1])
+        self.assertEqual(errors[-1].msg, cache._entries["gold >="].msg)
+        self.assertIsNone(cache._entries["gold >="].__traceback__)
+
+    def test_compiled_cache_is_abstract(self):
+        with self.assertRaises(TypeError):
+            CompiledCache()
+
+        class Incomplete(CompiledCache):
+            pass
+
+        with self.assertRaises(TypeError):
+            Incomplete()
+
+    def test_lru_bound(self):
+        cache = ConditionCache(max_size=2)
+        cache.get("a == 1")
+        cache.get("b == 1")
+        cache.get("a == 1")  # 'a' devient le plus récent
+        cache.get("c == 1")  # évince 'b'
+
+        self.assertEqual(cache.stats()["size"], 2)
+        cache.get("a == 1")
+        self.assertEqual(cache.stats()["hits"], 2)
+        cache.get("b == 1")
+        self.assertEqual(cache.stats()["misses"], 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
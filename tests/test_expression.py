@@ -0,0 +1,79 @@
+import time
+import unittest
+from src.engine.expression import compile_expression, ExpressionError
+
+
+def evaluate(source, variables=None):
+    variables = variables or {}
+    return compile_expression(source).evaluate(lambda name: variables[name])
+
+
+class TestExpression(unittest.TestCase):
+    def test_arithmetic_and_comparisons(self):
+        self.assertTrue(evaluate("gold * 2 + 1 >= 21", {"gold": 10}))
+        self.assertTrue(evaluate("1 < level <= 3", {"level": 3}))
+        self.assertFalse(evaluate("1 < level <= 3", {"level": 4}))
+        self.assertEqual(evaluate("7 // 2 + 7 % 2"), 4)
+
+    def test_dollar_syntax_and_membership(self):
+        variables = {"inventory": {"sword": 1}, "active_quests": ["q1"]}
+        self.assertTrue(evaluate("'sword' in $inventory and 'q2' not in ${active_quests}", variables))
+
+    def test_attribute_index_and_get(self):
+        variables = {"player_coordinates": {"x": 12, "continent": "Eldaron"}, "inventory": {}}
+        self.assertTrue(evaluate("player_coordinates.x > 10", variables))
+        self.assertTrue(evaluate("player_coordinates['continent'] == 'Eldaron'", variables))
+        self.assertEqual(evaluate("inventory.get('potion', 0)", variables), 0)
+
+    def test_dict_literals(self):
+        variables = {"inventory": {}, "flags": {"a": 1}}
+        self.assertFalse(evaluate("inventory != {}", variables))
+        self.assertTrue(evaluate('flags == {"a": 1}', variables))
+        self.assertTrue(evaluate("{**flags, 'b': gold} == {'a': 1, 'b': 2}", dict(variables, gold=2)))
+        self.assertEqual(compile_expression("{'a': gold}").names, frozenset({"gold"}))
+        self.assertTrue(compile_expression("{'a': 1} == {'a': 1}").is_constant)
+
+    def test_short_circuit(self):
+        # 'missing' n'est jamais lu
+        self.assertFalse(evaluate("False and missing"))
+        self.assertEqual(evaluate("gold or missing", {"gold": 5}), 5)
+
+    def test_constant_folding(self):
+        expression = compile_expression("(2 + 3) * 4 == 20 or gold > 0")
+        self.assertTrue(expression.is_constant)
+        self.assertEqual(expression.names, frozenset())
+
+        expression = compile_expression("visits > 1 and gold >= 10 - 5")
+        self.assertEqual(expression.names, frozenset({"visits", "gold"}))
+
+    def test_repetition_bounded(self):
+        # Pas d'allocation géante au pliage des constantes ni à l'évaluation
+        for source in ('"a" * 10**9', "[0] * 10**9", "10**9 * (1, 2)", "('ab' * 1000) * 1000"):
+            expression = compile_expression(source)
+            self.assertFalse(expression.is_constant, msg=source)
+            with self.assertRaises(ExpressionError, msg=source):
+                expression.evaluate(lambda name: None)
+        with self.assertRaises(ExpressionError):
+            evaluate("name * count", {"name": "x", "count": 10**9})
+        self.assertEqual(evaluate("'-' * 3 + name", {"name": "x"}), "---x")
+        self.assertEqual(evaluate("gold * 2.5", {"gold": 4}), 10.0)
+
+    def test_power_bounded(self):
+        # Puissances enchaînées : refusées au pliage, sans calcul démesuré
+        start = time.perf_counter()
+        for source in ("(((10**64)**64)**64)**64", "(2**64)**64", "base ** 64"):
+            with self.assertRaises(ExpressionError, msg=source):
+                evaluate(source, {"base": 10**64})
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertEqual(evaluate("(2**8)**8"), 2**64)
+        self.assertEqual(evaluate("gold ** 2", {"gold": 1.5}), 2.25)
+
+    def test_forbidden_constructs(self):
+        for source in ("__import__('os')", "len(inventory)", "[x for x in inventory]",
+                       "lambda: 1", "inventory.__class__", "2 ** 1000"):
+            with self.assertRaises(ExpressionError, msg=source):
+                evaluate(source, {"inventory": {}})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import math
+import unittest
+from src.core.location_table import LocationTable, LocationRecord
+from src.core.lore_manager import LoreManager
+
+
+def make_locations():
+    return [
+        {"id": "a", "name": "Lorn", "x": 1.0, "y": 2.0, "continent": "Eldaron", "city": "Lorn",
+         "place": "", "type": "Ville", "scale": "macro", "main_location_name": None},
+        {"id": "b", "name": "Port", "x": 4, "y": 6, "continent": "Eldaron", "city": "Lorn",
+         "place": "Quai", "type": "Port", "scale": "micro", "main_location_name": "Lorn"},
+        {"id": "c", "name": "Col", "x": 0.0, "y": 0.0, "continent": "Helrun", "city": "",
+         "place": "", "type": "Col", "scale": "micro", "main_location_name": None},
+    ]
+
+
+class TestLocationTable(unittest.TestCase):
+    def test_records_read_like_dicts(self):
+        locations = make_locations()
+        table = LocationTable(locations)
+        self.assertEqual(len(table), 3)
+        self.assertEqual(table, locations)
+        record = table[1]
+        self.assertIsInstance(record, LocationRecord)
+        self.assertEqual(record["x"], 4.0)
+        self.assertEqual(record.get("main_location_name"), "Lorn")
+        self.assertIsNone(table[0]["main_location_name"])
+        self.assertEqual(record.get("missing", "défaut"), "défaut")
+        self.assertIs(table[1], record)
+        self.assertEqual(dict(table[-1]), locations[2])
+
+    def test_repeated_strings_share_codes(self):
+        table = LocationTable(make_locations())
+        self.assertIs(table[0]["continent"], table[1]["continent"])
+        self.assertEqual(list(table.rows_of("Eldaron")), [0, 1])
+        self.assertEqual(list(table.rows_of("Nowhere")), [])
+
+    def test_vectorized_distances(self):
+        table = LocationTable(make_locations())
+        rows = table.rows_of("Eldaron")
+        self.assertEqual([round(d, 6) for d in table.distances(1.0, 2.0, rows)], [0.0, 5.0])
+        self.assertEqual(len(table.distances(0.0, 0.0)), 3)
+
+        manager = LoreManager()
+        manager.locations = make_locations()
+        rows, distances = manager.get_distances(0.0, 0.0, "Eldaron")
+        self.assertEqual(manager.locations[rows[0]]["id"], "a")
+        self.assertAlmostEqual(distances[0], math.sqrt(5))
+
+    def test_append_after_read(self):
+        table = LocationTable(make_locations()[:1])
+        self.assertEqual(table[0]["name"], "Lorn")
+        table.append(make_locations()[1])
+        self.assertEqual(table[1]["place"], "Quai")
+        self.assertEqual(table[0]["name"], "Lorn")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+import glob
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from src.core import lore_manager
+from src.core.lore_manager import LoreManager, LORE_EAGER, LORE_LAZY
+
+LORE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "server", "lore"))
+
+
+class TestLoreLoading(unittest.TestCase):
+    def setUp(self):
+        self.lore_dir = tempfile.mkdtemp()
+        for path in glob.glob(os.path.join(LORE_DIR, "*.json")):
+            shutil.copy(path, self.lore_dir)
+        self.cache_dir = tempfile.mkdtemp()
+        # Le cache utilisateur réel n'est jamais touché par les tests
+        patcher = mock.patch.dict(os.environ, {"XDG_CACHE_HOME": self.cache_dir})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.lore_dir)
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def test_parallel_eager_matches_serial(self):
+        serial = LoreManager(self.lore_dir, workers=1)
+        parallel = LoreManager(self.lore_dir, mode=LORE_EAGER, workers=4)
+        self.assertEqual(serial.locations, parallel.locations)
+        self.assertTrue(serial.locations)
+
+    def test_small_lore_parsed_without_pool(self):
+        with mock.patch.object(lore_manager, "ProcessPoolExecutor") as pool:
+            manager = LoreManager(self.lore_dir)
+        self.assertTrue(manager.locations)
+        pool.assert_not_called()
+
+        paths = [path for path, _ in manager._files]
+        self.assertEqual(manager._pool_size(paths), 1)
+        with mock.patch.multiple(lore_manager, PARALLEL_MIN_BYTES=0, PARALLEL_MIN_FILES=0):
+            self.assertEqual(manager._pool_size(paths), os.cpu_count() or 1)
+
+    def test_lazy_loads_only_queried_continent(self):
+        eager = LoreManager(self.lore_dir)
+        LoreManager(self.lore_dir, mode=LORE_LAZY)  # construit l'index des en-têtes
+        # L'index va dans le cache utilisateur, pas dans le dossier de lore
+        self.assertEqual(len(os.listdir(os.path.join(self.cache_dir, lore_manager.CACHE_SUBDIR))), 1)
+        self.assertTrue(all(name.endswith(".json") for name in os.listdir(self.lore_dir)))
+
+        lazy = LoreManager(self.lore_dir, mode=LORE_LAZY)
+        self.assertEqual(lazy._file_locations, {})
+        headers = lazy.get_lore_headers()
+        self.assertEqual(headers["helrun.json"]["Helrun"]["count"], 36)
+
+        for loc in eager.locations:
+            if loc["continent"] != "Helrun":
+                continue
+            found = lazy.get_location_at(loc["x"], loc["y"], "Helrun")
+            self.assertEqual(found, eager.get_location_at(loc["x"], loc["y"], "Helrun"))
+        self.assertEqual(sorted(os.path.basename(p) for p in lazy._file_locations), ["helrun.json", "velkarum.json"])
+
+        # Accès à la liste complète : même contenu et même ordre que le mode normal
+        self.assertEqual(lazy.locations, eager.locations)
+
+    def test_lazy_without_writable_cache(self):
+        # Cache inutilisable (un fichier à la place du dossier) : pas d'index, mais le chargement fonctionne
+        blocked = os.path.join(self.cache_dir, "bloque")
+        open(blocked, "w").close()
+        lazy = LoreManager(self.lore_dir, mode=LORE_LAZY, cache_dir=blocked)
+        self.assertEqual(lazy.get_lore_headers()["helrun.json"]["Helrun"]["count"], 36)
+        self.assertIsNotNone(lazy.get_location_at(*self._first_helrun(), "Helrun"))
+        self.assertTrue(all(name.endswith(".json") for name in os.listdir(self.lore_dir)))
+
+    def _first_helrun(self):
+        loc = next(loc for loc in LoreManager(self.lore_dir).locations if loc["continent"] == "Helrun")
+        return loc["x"], loc["y"]
+
+    def test_modified_file_refreshes_header(self):
+        LoreManager(self.lore_dir, mode=LORE_LAZY)
+        path = os.path.join(self.lore_dir, "helrun.json")
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        data["nodes"]["new_place"] = {"x": 1.0, "y": 2.0, "continent": "Helrun", "name": "Nouveau"}
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+
+        lazy = LoreManager(self.lore_dir, mode=LORE_LAZY)
+        self.assertEqual(lazy.get_lore_headers()["helrun.json"]["Helrun"]["count"], 37)
+        self.assertEqual(lazy.get_location_at(1.0, 2.0, "Helrun")["name"], "Nouveau")
+
+    def test_facets_and_sorted_views(self):
+        manager = LoreManager(self.lore_dir)
+        order = list(manager.locations)
+
+        def legacy(continent=None, type_filter=None):
+            filtered = [loc for loc in manager.locations
+                        if (not continent or loc.get("continent") == continent)
+                        and (not type_filter or loc.get("type") == type_filter)]
+            return sorted(filtered, key=lambda x: (x.get("city") or "", x.get("place") or x.get("name") or ""))
+
+        self.assertEqual(list(manager.get_locations()), legacy())
+        for continent in manager.get_continents():
+            self.assertEqual(list(manager.get_locations(continent)), legacy(continent))
+            for loc_type in manager.get_location_types():
+                self.assertEqual(list(manager.get_locations(continent, loc_type)), legacy(continent, loc_type))
+        # Listes comme avant l'index : les modifier ne touche pas aux vues en cache
+        helrun = manager.get_locations("Helrun")
+        self.assertIsInstance(helrun, list)
+        helrun.clear()
+        manager.get_continents().append("Intrus")
+        self.assertEqual(manager.get_locations("Helrun"), legacy("Helrun"))
+        self.assertNotIn("Intrus", manager.get_continents())
+        # La liste source n'est plus triée sur place
+        self.assertEqual(manager.locations, order)
+
+        manager.locations = [dict(order[0], continent="Autre")]
+        self.assertEqual(manager.get_continents(), ["Autre"])
+
+    def test_lazy_continents_from_headers(self):
+        LoreManager(self.lore_dir, mode=LORE_LAZY)
+        lazy = LoreManager(self.lore_dir, mode=LORE_LAZY)
+        self.assertIn("Helrun", lazy.get_continents())
+        self.assertEqual(lazy._file_locations, {})
+        self.assertEqual(lazy.get_continents(), LoreManager(self.lore_dir).get_continents())
+
+
+if __name__ == '__main__':
+    unittest.main()
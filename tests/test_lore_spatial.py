@@ -0,0 +1,101 @@
+import math
+import os
+import random
+import unittest
+from src.core.lore_manager import LoreManager
+from src.core.spatial_index import SpatialGrid
+
+LORE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "server", "lore"))
+
+
+def linear_location_at(locations, x, y, continent, tolerance=0.1):
+    """Ancien parcours linéaire de LoreManager.get_location_at (référence)."""
+    candidates = []
+    for loc in locations:
+        if loc["continent"] == continent:
+            dist = math.sqrt((loc["x"] - x) ** 2 + (loc["y"] - y) ** 2)
+            if dist <= tolerance:
+                candidates.append((dist, loc))
+    if not candidates:
+        return None
+    candidates.sort(key=lambda c: c[0])
+    close = [c for c in candidates if abs(c[0] - candidates[0][0]) < 0.001]
+    micro = next((c for c in close if c[1]["scale"] == "micro"), None)
+    return micro[1] if micro else candidates[0][1]
+
+
+def make_location(index, x, y, continent, scale):
+    return {"id": f"loc_{index}", "name": f"Lieu {index}", "x": x, "y": y, "continent": continent,
+            "city": "", "place": "", "type": "Ville", "scale": scale, "main_location_name": ""}
+
+
+class TestLoreSpatialIndex(unittest.TestCase):
+    def test_matches_linear_scan_with_micro_priority(self):
+        rng = random.Random(2)
+        manager = LoreManager()
+        locations = []
+        for i in range(2000):
+            x, y = round(rng.uniform(0, 100), 1), round(rng.uniform(0, 100), 1)
+            locations.append(make_location(i, x, y, rng.choice(["eldaron", "helrun"]), rng.choice(["micro", "macro"])))
+        # Superpositions exactes macro / micro
+        locations.append(make_location("m", 50.0, 50.0, "eldaron", "macro"))
+        locations.append(make_location("u", 50.0, 50.0, "eldaron", "micro"))
+        manager.locations = locations
+
+        for _ in range(2000):
+            x, y = round(rng.uniform(-5, 105), 2), round(rng.uniform(-5, 105), 2)
+            continent = rng.choice(["eldaron", "helrun", "nowhere"])
+            tolerance = rng.choice([0.1, 0.5, 3.0])
+            # Les lieux sont stockés en colonnes : comparaison par valeur avec les dicts d'origine
+            self.assertEqual(manager.get_location_at(x, y, continent, tolerance),
+                             linear_location_at(locations, x, y, continent, tolerance))
+        self.assertEqual(manager.get_location_at(50.0, 50.0, "eldaron")["scale"], "micro")
+
+    def test_nearest(self):
+        rng = random.Random(5)
+        points = [(rng.uniform(0, 100), rng.uniform(0, 100), i) for i in range(500)]
+        grid = SpatialGrid(points)
+        for _ in range(200):
+            x, y = rng.uniform(-20, 120), rng.uniform(-20, 120)
+            expected = sorted((math.sqrt((px - x) ** 2 + (py - y) ** 2), i) for px, py, i in points)[:3]
+            self.assertEqual(grid.nearest(x, y, k=3), expected)
+        self.assertEqual(grid.nearest(500, 500, max_distance=1), [])
+
+    def test_degenerate_layouts(self):
+        # Points confondus ou alignés : la taille de cellule ne doit pas s'effondrer
+        grid = SpatialGrid([(0, 0, 0), (100, 0, 1)])
+        self.assertGreaterEqual(grid.cell_size, 1.0)
+        self.assertEqual(grid.nearest(50, 50, k=2), [(math.sqrt(5000), 0), (math.sqrt(5000), 1)])
+
+        same = SpatialGrid([(0, 0, 0), (0, 0, 1), (0, 0, 2)])
+        self.assertEqual(same.nearest(50, 50), [(math.sqrt(5000), 0)])
+        self.assertEqual([v for _, v in same.within(0, 0, 0.1)], [0, 1, 2])
+
+        rng = random.Random(3)
+        line = [(rng.uniform(0, 1000), 7.0, i) for i in range(300)]
+        grid = SpatialGrid(line)
+        for x, y in ((500, 7), (500, 900), (-1e6, 1e6), (1e9, 7)):
+            expected = sorted((math.sqrt((px - x) ** 2 + (py - y) ** 2), i) for px, py, i in line)[:3]
+            self.assertEqual(grid.nearest(x, y, k=3), expected)
+        # Rayon immense : seules les cellules occupées sont lues
+        self.assertEqual(len(grid.within(0, 0, 1e9)), 300)
+
+    def test_overlapping_project_locations(self):
+        # Lieux de projet sans coordonnées : tous à (0, 0)
+        manager = LoreManager()
+        manager.locations = [make_location(i, 0.0, 0.0, "eldaron", "macro") for i in range(2)]
+        self.assertEqual(manager.get_location_at(0, 0, "eldaron")["id"], "loc_0")
+        self.assertEqual(manager.get_nearest_locations(30, 40, "eldaron")[0][0], 50.0)
+
+    def test_index_built_from_lore_files(self):
+        manager = LoreManager(LORE_DIR)
+        self.assertTrue(manager.locations)
+        for loc in manager.locations[:50]:
+            found = manager.get_location_at(loc["x"], loc["y"], loc["continent"])
+            self.assertIs(found, linear_location_at(manager.locations, loc["x"], loc["y"], loc["continent"]))
+        loc = manager.locations[0]
+        self.assertEqual(manager.get_nearest_locations(loc["x"], loc["y"], loc["continent"])[0][0], 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+from src.core.models import ProjectModel, NodeModel
+from src.core.definitions import NodeType, MACRO_DEFINITIONS
+from src.engine.variable_store import VariableStore
+from src.engine.script_parser import ScriptParser, normalize_macro_name
+from src.engine.story_manager import StoryManager
+
+
+class TestMacroRegistry(unittest.TestCase):
+    def setUp(self):
+        self.store = VariableStore()
+        self.parser = ScriptParser(self.store)
+
+    def test_aliases_share_handler(self):
+        self.assertIs(self.parser.get_handler("addItem"), self.parser.get_handler("add_item"))
+        self.assertIs(self.parser.get_handler("set"), self.parser.get_handler("setVariable"))
+
+    def test_declared_macros_registered(self):
+        for name in MACRO_DEFINITIONS:
+            self.assertIn(normalize_macro_name(name), self.parser.handlers)
+
+    def test_command_args_bound_from_definitions(self):
+        self.parser.execute_script(['<<addItem "Épée courte" 2>>', "<<set gold 15>>"])
+        self.assertEqual(self.store.get_var("inventory"), {"Épée courte": 2})
+        self.assertEqual(self.store.get_var("gold"), 15)
+
+    def test_missing_required_args_ignored(self):
+        self.parser.execute_script(["<<set gold>>"])
+        self.assertEqual(self.store.get_var("gold"), 0)
+
+    def test_plugged_handler_and_stats(self):
+        received = []
+        self.parser.register_handler("setrelation", received.append)
+        self.parser.execute_script(["<<setrelation guard_01 50>>"])
+        self.parser.execute_events([{"type": "setrelation", "parameters": {"id": "guard_01", "value": 10}}])
+
+        self.assertEqual(received, [{"id": "guard_01", "value": 50}, {"id": "guard_01", "value": 10}])
+        stats = self.parser.get_macro_stats()
+        self.assertEqual(stats["setrelation"]["calls"], 2)
+
+    def test_goto_navigates_after_script(self):
+        project = ProjectModel()
+        start = NodeModel(id="start", type=NodeType.START)
+        start.logic["on_enter"] = [{"type": "goto", "parameters": {"target": "hall"}}]
+        project.add_node(start)
+        project.add_node(NodeModel(id="hall"))
+
+        manager = StoryManager()
+        manager.load_project(project)
+        self.assertEqual(manager.current_node.id, "hall")
+        self.assertEqual(manager.history, ["start"])
+
+
+if __name__ == '__main__':
+    unittest.main()
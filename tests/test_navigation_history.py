@@ -0,0 +1,69 @@
+import random
+import unittest
+from src.core.models import ProjectModel, NodeModel
+from src.core.definitions import NodeType
+from src.engine.navigation_history import NavigationHistory
+from src.engine.save_system import SaveSystem
+from src.engine.story_manager import StoryManager
+
+
+class TestNavigationHistory(unittest.TestCase):
+    def test_hub_loops_are_run_length_encoded(self):
+        history = NavigationHistory(max_depth=None)
+        for _ in range(500):
+            history.append("hub")
+            history.append("shop")
+        history.append("wait")
+        history.append("wait")
+        self.assertEqual(len(history), 1002)
+        self.assertEqual(history.runs(), [(("hub", "shop"), 500), (("wait",), 2)])
+        self.assertEqual(history[-3], "shop")
+        self.assertEqual(history[2], "hub")
+
+    def test_pop_and_truncate_unfold_patterns(self):
+        history = NavigationHistory(["a", "b", "a", "b", "a", "b"])
+        self.assertEqual(history.pop(), "b")
+        self.assertEqual(history, ["a", "b", "a", "b", "a"])
+        self.assertEqual(history.peek(), "a")
+        history.truncate(1)
+        self.assertEqual(history, ["a"])
+
+    def test_matches_list_model(self):
+        rng = random.Random(4)
+        nodes = ["hub", "shop", "inn", "road"]
+        for depth in (None, 1, 7, 50):
+            history, model = NavigationHistory(max_depth=depth), []
+            for _ in range(3000):
+                if model and rng.random() < 0.2:
+                    self.assertEqual(history.pop(), model.pop())
+                else:
+                    node_id = rng.choice(nodes[:2]) if rng.random() < 0.7 else rng.choice(nodes)
+                    history.append(node_id)
+                    model.append(node_id)
+                    if depth is not None:
+                        del model[:-depth]
+                self.assertEqual(len(history), len(model))
+            self.assertEqual(history.to_list(), model)
+            self.assertEqual(list(reversed(history)), model[::-1])
+
+    def test_story_manager_depth_and_save_format(self):
+        project = ProjectModel()
+        hub = NodeModel(id="hub", type=NodeType.START)
+        hub.content["choices"] = [{"id": "loop", "text": "Encore", "target_node_id": "hub"}]
+        project.add_node(hub)
+
+        manager = StoryManager(history_depth=10)
+        manager.load_project(project)
+        for _ in range(25):
+            manager.make_choice(0)
+        self.assertEqual(len(manager.history), 10)
+
+        data = SaveSystem.create_save_data(manager)
+        self.assertEqual(data["history"], ["hub"] * 10)
+        manager.history = ["hub"] * 30
+        self.assertEqual(len(manager.history), 10)
+        self.assertEqual(manager.history.max_depth, 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
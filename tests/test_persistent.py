@@ -0,0 +1,161 @@
+import json
+import random
+import unittest
+from unittest import mock
+from src.engine import persistent
+from src.engine.persistent import PMap, PVector, thaw
+from src.engine.variable_store import VariableStore
+
+
+class CollidingKey:
+    """Clé au hash constant pour exercer les nœuds de collision."""
+    def __init__(self, name):
+        self.name = name
+
+    def __hash__(self):
+        return 42
+
+    def __eq__(self, other):
+        return isinstance(other, CollidingKey) and other.name == self.name
+
+
+class TestPMap(unittest.TestCase):
+    def test_matches_dict_under_random_operations(self):
+        rng = random.Random(7)
+        pmap, reference = PMap(), {}
+        for _ in range(5000):
+            key = f"k{rng.randrange(800)}"
+            if rng.random() < 0.3:
+                pmap = pmap.delete(key)
+                reference.pop(key, None)
+            else:
+                value = rng.randrange(100)
+                pmap = pmap.set(key, value)
+                reference[key] = value
+        self.assertEqual(len(pmap), len(reference))
+        self.assertEqual(pmap, reference)
+        self.assertEqual(pmap.to_dict(), reference)
+        self.assertEqual(sorted(pmap), sorted(reference))
+
+    def test_old_versions_unchanged(self):
+        v1 = PMap({"sword": 1})
+        v2 = v1.set("sword", 2).set("shield", 1)
+        v3 = v2.delete("sword")
+        self.assertEqual(v1, {"sword": 1})
+        self.assertEqual(v2, {"sword": 2, "shield": 1})
+        self.assertEqual(v3, {"shield": 1})
+
+    def test_noop_updates_return_same_instance(self):
+        pmap = PMap({"a": 1})
+        self.assertIs(pmap.set("a", 1), pmap)
+        self.assertIs(pmap.delete("absent"), pmap)
+
+    def test_hash_collisions(self):
+        keys = [CollidingKey(str(i)) for i in range(5)]
+        pmap = PMap()
+        for i, key in enumerate(keys):
+            pmap = pmap.set(key, i)
+        self.assertEqual([pmap[k] for k in keys], list(range(5)))
+        pmap = pmap.delete(keys[2])
+        self.assertNotIn(keys[2], pmap)
+        self.assertEqual(len(pmap), 4)
+        pmap = pmap.set("normal", 1)
+        self.assertEqual(pmap["normal"], 1)
+        self.assertEqual(pmap[keys[4]], 4)
+
+
+class TestPMapHamt(TestPMap):
+    """Mêmes tests, HAMT forcé dès la première clé (SMALL_MAP_SIZE = 0)."""
+
+    def setUp(self):
+        patcher = mock.patch.object(persistent, "SMALL_MAP_SIZE", 0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_uses_hamt(self):
+        self.assertIsNone(PMap({"a": 1})._small)
+        self.assertIsNone(PMap().set("a", 1)._small)
+
+
+class TestPMapSmallToHamt(unittest.TestCase):
+    def test_switches_to_hamt_past_threshold(self):
+        with mock.patch.object(persistent, "SMALL_MAP_SIZE", 4):
+            small = PMap({f"k{i}": i for i in range(4)})
+            self.assertIsNotNone(small._small)
+            self.assertIs(small.set("k0", 0), small)
+            large = small.set("k4", 4)
+            self.assertIsNone(large._small)
+            # L'ancienne version (dict) reste intacte
+            self.assertEqual(small, {f"k{i}": i for i in range(4)})
+            self.assertEqual(large, {f"k{i}": i for i in range(5)})
+            self.assertEqual(large.delete("k4"), small)
+            self.assertIsNone(PMap({f"k{i}": i for i in range(5)})._small)
+
+
+class TestPVector(unittest.TestCase):
+    def test_append_and_index(self):
+        vector = PVector()
+        versions = []
+        for i in range(2000):
+            vector = vector.append(i)
+            if i in (0, 31, 32, 1023, 1024, 1999):
+                versions.append(vector)
+        self.assertEqual(list(vector), list(range(2000)))
+        self.assertEqual(vector[1500], 1500)
+        self.assertEqual(vector[-1], 1999)
+        self.assertEqual([len(v) for v in versions], [1, 32, 33, 1024, 1025, 2000])
+        self.assertEqual(list(versions[2]), list(range(33)))
+
+    def test_set_is_persistent(self):
+        original = PVector(range(100))
+        changed = original.set(10, "x").set(99, "y")
+        self.assertEqual(original[10], 10)
+        self.assertEqual(changed[10], "x")
+        self.assertEqual(changed[99], "y")
+        self.assertEqual(original, list(range(100)))
+
+
+class TestStoreCollections(unittest.TestCase):
+    def setUp(self):
+        self.store = VariableStore()
+
+    def test_updates_keep_previous_values(self):
+        self.store.add_item("potion", 2)
+        before = self.store.get_var("inventory")
+        self.store.add_item("potion", 1)
+        self.store.remove_item("potion", 3)
+        self.assertEqual(before, {"potion": 2})
+        self.assertEqual(self.store.get_var("inventory", {}), {})
+
+    def test_observer_notified_once_per_change(self):
+        events = []
+        self.store.add_observer(lambda name, value: events.append(name))
+        self.store.increment_visit_count("n1")
+        self.store.set_node_text("n1", "Texte")
+        self.store.mark_choice_used("c1")
+        self.store.mark_choice_used("c1")
+        self.store.equip_item("sword", "weapon")
+        self.store.equip_item("sword", "weapon")
+        self.assertEqual(events, ["visit_counts", "node_text_overrides", "used_choices", "equipped"])
+
+    def test_get_all_is_json_serializable(self):
+        self.store.add_item("potion", 2)
+        self.store.mark_choice_used("c1")
+        self.store.increment_visit_count("n1")
+        data = json.loads(json.dumps(self.store.get_all()))
+        self.assertEqual(data["inventory"], {"potion": 2})
+        self.assertEqual(data["used_choices"], ["c1"])
+
+        restored = VariableStore()
+        restored.load_state(data)
+        self.assertIsInstance(restored.get_var("visit_counts"), PMap)
+        self.assertEqual(restored.get_visit_count("n1"), 1)
+        self.assertTrue(restored.is_choice_used("c1"))
+
+    def test_thaw_nested(self):
+        value = PMap({"a": PVector([1, PMap({"b": 2})])})
+        self.assertEqual(thaw(value), {"a": [1, {"b": 2}]})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+from src.core.models import ProjectModel, NodeModel, EdgeModel
+from src.core.definitions import NodeType
+from src.engine.story_manager import StoryManager
+
+
+class TestProjectIndexes(unittest.TestCase):
+    def setUp(self):
+        self.project = ProjectModel()
+        for node_id, node_type in (("a", NodeType.DIALOGUE), ("start", NodeType.START), ("b", NodeType.DIALOGUE)):
+            self.project.add_node(NodeModel(id=node_id, type=node_type))
+        self.e1 = EdgeModel("start", "a", start_socket_index=1)
+        self.e0 = EdgeModel("start", "b", start_socket_index=0)
+        self.e2 = EdgeModel("a", "b")
+        for edge in (self.e1, self.e0, self.e2):
+            self.project.add_edge(edge)
+
+    def test_start_node_and_types(self):
+        self.assertEqual(self.project.get_start_node().id, "start")
+        self.assertEqual([n.id for n in self.project.get_nodes_by_type(NodeType.DIALOGUE)], ["a", "b"])
+
+    def test_adjacency(self):
+        self.assertEqual(self.project.get_outgoing_edges("start"), [self.e0, self.e1])
+        self.assertEqual(self.project.get_outgoing_edges("start", 1), [self.e1])
+        self.assertEqual(self.project.get_incoming_edges("b"), [self.e0, self.e2])
+
+    def test_remove_node_removes_attached_edges(self):
+        self.project.remove_node("a")
+        self.assertEqual(self.project.edges, [self.e0])
+        self.assertEqual(self.project.get_outgoing_edges("start"), [self.e0])
+        self.assertEqual(self.project.get_incoming_edges("b"), [self.e0])
+        self.project.remove_edge(self.e0)
+        self.assertEqual(self.project.get_outgoing_edges("start"), [])
+
+    def test_direct_mutation_triggers_rebuild(self):
+        self.project.nodes["s2"] = NodeModel(id="s2", type=NodeType.START)
+        self.project.edges.append(EdgeModel("b", "s2"))
+        self.assertEqual(len(self.project.get_nodes_by_type(NodeType.START)), 2)
+        self.assertEqual(self.project.get_outgoing_edges("b")[0].end_node_id, "s2")
+
+    def test_in_place_edit_needs_mark_modified(self):
+        manager = StoryManager()
+        manager.load_project(self.project)
+        self.assertEqual([c["target_id"] for c in manager.get_available_choices()], ["b", "a"])
+        revision = self.project.revision
+
+        # Lien reciblé sur place : invisible tant qu'il n'est pas signalé
+        self.e1.start_node_id = "b"
+        self.project.mark_modified()
+        self.assertGreater(self.project.revision, revision)
+        self.assertEqual(self.project.get_outgoing_edges("start"), [self.e0])
+        self.assertEqual(self.project.get_outgoing_edges("b"), [self.e1])
+        self.assertEqual([c["target_id"] for c in manager.get_available_choices()], ["b"])
+
+    def test_from_dict_builds_indexes(self):
+        loaded = ProjectModel.from_dict(self.project.to_dict())
+        self.assertEqual(loaded.get_start_node().id, "start")
+        self.assertEqual([e.end_node_id for e in loaded.get_outgoing_edges("start")], ["b", "a"])
+
+    def test_fallback_first_node(self):
+        project = ProjectModel()
+        project.add_node(NodeModel(id="only"))
+        self.assertEqual(project.get_start_node().id, "only")
+        self.assertIsNone(ProjectModel().get_start_node())
+
+    def test_legacy_choices_use_edge_index(self):
+        manager = StoryManager()
+        manager.load_project(self.project)
+        self.assertEqual(manager.current_node.id, "start")
+        choices = manager.get_available_choices()
+        self.assertEqual([c["target_id"] for c in choices], ["b", "a"])
+
+
+if __name__ == '__main__':
+    unittest.main()
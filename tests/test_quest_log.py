@@ -0,0 +1,72 @@
+import json
+import unittest
+from src.engine.quest_log import QuestLog, QUEST_ACTIVE, QUEST_COMPLETED, QUEST_RETURNED
+from src.engine.variable_store import VariableStore
+
+
+class TestQuestLog(unittest.TestCase):
+    def test_transitions(self):
+        log = QuestLog()
+        self.assertTrue(log.start("q1"))
+        self.assertFalse(log.start("q1"))
+        self.assertFalse(log.mark_returned("q1"))
+        self.assertEqual(log.advance("q1"), 1)
+        self.assertTrue(log.complete("q1"))
+        self.assertIsNone(log.advance("q1"))
+        self.assertTrue(log.mark_returned("q1"))
+        self.assertEqual(log.status("q1"), QUEST_RETURNED)
+        self.assertFalse(log.start("q1"))
+
+    def test_ordered_views(self):
+        log = QuestLog()
+        for qid in ("a", "b", "c"):
+            log.start(qid)
+        log.complete("b")
+        self.assertEqual(log.ids(QUEST_ACTIVE), ["a", "c"])
+        self.assertEqual(log.ids(QUEST_COMPLETED), ["b"])
+
+    def test_load_lists_priority(self):
+        log = QuestLog()
+        log.load_lists(["q1", "q2"], ["q1"], [], {"q2": 3})
+        self.assertEqual(log.status("q1"), QUEST_COMPLETED)
+        self.assertEqual(log.ids(QUEST_ACTIVE), ["q2"])
+        self.assertEqual(log.get_step("q2"), 3)
+
+
+class TestStoreQuestState(unittest.TestCase):
+    def setUp(self):
+        self.store = VariableStore()
+
+    def test_lists_published_on_transitions(self):
+        self.store.start_quest("q1")
+        self.store.start_quest("q2")
+        self.store.advance_quest_step("q1")
+        self.store.complete_quest("q1")
+        self.assertEqual(self.store.get_var("active_quests"), ["q2"])
+        self.assertEqual(self.store.get_var("completed_quests"), ["q1"])
+        self.assertEqual(self.store.get_var("quest_steps"), {"q1": 1, "q2": 0})
+
+    def test_direct_set_var_resyncs(self):
+        self.store.set_var("active_quests", ["q1"])
+        self.assertEqual(self.store.quests.status("q1"), QUEST_ACTIVE)
+        self.store.complete_quest("q1")
+        self.assertEqual(self.store.get_var("completed_quests"), ["q1"])
+        self.store.set_var("completed_quests", [])
+        self.assertFalse(self.store.quests.is_known("q1"))
+
+    def test_save_roundtrip(self):
+        self.store.start_quest("q1")
+        self.store.start_quest("q2")
+        self.store.complete_quest("q2")
+        data = json.loads(json.dumps(self.store.get_all()))
+        self.assertEqual(data["completed_quests"], ["q2"])
+
+        restored = VariableStore()
+        restored.load_state(data)
+        self.assertEqual(restored.quests.status("q1"), QUEST_ACTIVE)
+        restored.return_quest("q2")
+        self.assertEqual(restored.get_var("returned_quests"), ["q2"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+from src.core.models import ProjectModel, NodeModel, QuestModel
+from src.core.definitions import NodeType
+from src.engine.story_manager import StoryManager
+
+
+class TestQuestReturnIndex(unittest.TestCase):
+    def setUp(self):
+        self.project = ProjectModel()
+        self.project.add_node(NodeModel(id="start", type=NodeType.START))
+        self.project.add_node(NodeModel(id="inn", type=NodeType.DIALOGUE))
+        self.project.quests["q1"] = QuestModel(id="q1", title="Rats", return_scene_id="inn")
+        self.project.quests["q2"] = QuestModel(id="q2", title="Loup", return_scene_id="start")
+        self.project.quests["q3"] = QuestModel(id="q3", title="Sans retour")
+
+    def test_lookup_by_scene(self):
+        self.assertEqual([q.id for q in self.project.get_quests_returned_at("inn")], ["q1"])
+        self.assertEqual(self.project.get_quests_returned_at("nowhere"), [])
+
+    def test_incremental_reindex(self):
+        self.project.get_quests_returned_at("inn")
+        self.project.quests["q2"].return_scene_id = "inn"
+        self.project.reindex_quest("q2")
+        self.assertEqual([q.id for q in self.project.get_quests_returned_at("inn")], ["q1", "q2"])
+        self.assertEqual(self.project.get_quests_returned_at("start"), [])
+
+    def test_added_and_removed_quests_detected(self):
+        self.project.get_quests_returned_at("inn")
+        self.project.quests["q4"] = QuestModel(id="q4", return_scene_id="inn")
+        self.assertEqual(len(self.project.get_quests_returned_at("inn")), 2)
+        del self.project.quests["q1"]
+        self.assertEqual([q.id for q in self.project.get_quests_returned_at("inn")], ["q4"])
+
+    def test_replaced_quest_after_invalidation(self):
+        self.project.get_quests_returned_at("inn")
+        self.project.quests["q1"] = QuestModel(id="q1", return_scene_id="start")
+        self.project.invalidate_quest_index()
+        self.assertEqual(sorted(q.id for q in self.project.get_quests_returned_at("start")), ["q1", "q2"])
+
+    def test_return_choice_injected_only_at_return_scene(self):
+        manager = StoryManager()
+        manager.load_project(self.project)
+        for qid in ("q1", "q2"):
+            manager.variables.start_quest(qid)
+            manager.variables.complete_quest(qid)
+        texts = [c["text"] for c in manager.get_available_choices()]
+        self.assertEqual(texts, ["Rendre la quête : Loup"])
+
+        manager.set_current_node("inn")
+        texts = [c["text"] for c in manager.get_available_choices()]
+        self.assertEqual(texts, ["Rendre la quête : Rats"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import io
+import unittest
+from contextlib import redirect_stdout
+from unittest.mock import patch
+from src.core.models import ProjectModel, NodeModel
+from src.core.definitions import NodeType
+from src.engine.variable_store import VariableStore
+from src.engine.script_parser import ScriptParser
+from src.engine.story_manager import StoryManager
+
+
+class TestScriptCompilation(unittest.TestCase):
+    def setUp(self):
+        self.store = VariableStore()
+        self.parser = ScriptParser(self.store)
+
+    def test_typed_arguments(self):
+        commands = self.parser.compile_script(['<<set vivant true>>', '<<set ratio 0.5>>', '<<addItem "Pomme rouge" 3>>'])
+        self.assertEqual([params for _, params, _ in commands], [
+            {"name": "vivant", "value": True},
+            {"name": "ratio", "value": 0.5},
+            {"item_id": "Pomme rouge", "qty": 3},
+        ])
+
+    def test_invalid_lines_reported_once(self):
+        lines = ["<<addItem sword 1>>", "texte libre", "<<inconnue 1>>", "<<addItem potion beaucoup>>"]
+        out = io.StringIO()
+        with redirect_stdout(out):
+            first = self.parser.compile_script(lines)
+            second = self.parser.compile_script(list(lines))
+
+        self.assertIs(first, second)
+        self.assertEqual(len(first), 1)
+        self.assertEqual(out.getvalue().count("[ScriptParser]"), 3)
+
+    def test_script_cache_bounded(self):
+        self.parser.scripts.max_size = 2
+        for i in range(5):
+            self.parser.compile_script([f"<<set compteur {i}>>"])
+        self.assertEqual(self.parser.get_script_stats()["size"], 2)
+        self.parser.compile_script(["<<set compteur 4>>"])
+        self.assertEqual(self.parser.get_script_stats()["hits"], 1)
+
+    def test_node_transitions_do_not_parse(self):
+        project = ProjectModel()
+        start = NodeModel(id="start", type=NodeType.START)
+        hub = NodeModel(id="hub")
+        hub.logic["on_enter"] = ["<<addItem torch 1>>"]
+        project.add_node(start)
+        project.add_node(hub)
+
+        manager = StoryManager()
+        manager.load_project(project)
+
+        with patch("src.engine.script_parser.MACRO_TOKEN_PATTERN") as pattern:
+            for _ in range(3):
+                manager.set_current_node("hub")
+            pattern.findall.assert_not_called()
+
+        self.assertEqual(manager.variables.get_var("inventory"), {"torch": 3})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+import os
+import sys
+import unittest
+from src.core.models import ProjectModel, NodeModel
+from src.core.definitions import NodeType
+from src.engine.simulator import (ChoicePolicy, PlaythroughSimulator, RandomPolicy, ScriptedPolicy,
+                                  SimulationReport, WeightedPolicy)
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "tools")))
+from explore_story import explore
+
+
+def make_project():
+    project = ProjectModel()
+    start = NodeModel(id="start", type=NodeType.START)
+    start.content["choices"] = [
+        {"id": "go_forest", "text": "Forêt", "target_node_id": "forest", "weight": 3},
+        {"id": "go_cave", "text": "Grotte", "target_node_id": "cave", "weight": 1},
+        {"id": "secret", "text": "Secret", "target_node_id": "end", "condition": "$gold > 1000"},
+        {"id": "broken", "text": "Nulle part", "target_node_id": "missing", "weight": 0},
+        {"id": "bad", "text": "Erreur", "target_node_id": "end", "condition": "$unknown_var > 1"},
+    ]
+    forest = NodeModel(id="forest", type=NodeType.DIALOGUE)
+    forest.logic["on_enter"] = [{"type": "addItem", "parameters": {"item_id": "herb", "qty": 1}}]
+    forest.content["choices"] = [{"id": "f_end", "text": "Sortir", "target_node_id": "end"}]
+    cave = NodeModel(id="cave", type=NodeType.DIALOGUE)  # impasse
+    end = NodeModel(id="end", type=NodeType.END)
+    for node in (start, forest, cave, end):
+        project.add_node(node)
+    return project
+
+
+class TestSimulator(unittest.TestCase):
+    def setUp(self):
+        self.project = make_project()
+
+    def test_report_counts(self):
+        report = PlaythroughSimulator(self.project, RandomPolicy(), seed=1).run(300)
+        self.assertEqual(report.runs, 300)
+        self.assertEqual(report.node_visits["start"], 300)
+        self.assertIn("cave", report.dead_ends)
+        self.assertIn("end", report.endings)
+        self.assertIn(("start", "missing"), report.broken_links)
+        self.assertIn(("start", "secret"), report.unreachable_choices)
+        self.assertIn("$unknown_var > 1", report.condition_errors)
+
+    def test_state_reset_between_runs(self):
+        simulator = PlaythroughSimulator(self.project, ScriptedPolicy(["go_forest", "f_end"]), seed=0)
+        simulator.run(5)
+        self.assertEqual(simulator.manager.variables.get_var("inventory"), {"herb": 1})
+
+    def test_weighted_policy_and_reproducibility(self):
+        report_a = PlaythroughSimulator(self.project, WeightedPolicy(), seed=7).run(400)
+        report_b = PlaythroughSimulator(self.project, WeightedPolicy(), seed=7).run(400)
+        self.assertEqual(report_a.to_dict(), report_b.to_dict())
+        self.assertGreater(report_a.node_visits["forest"], report_a.node_visits["cave"])
+        self.assertNotIn(("start", "missing"), report_a.broken_links)
+
+    def test_policy_must_implement_choose(self):
+        class NoChoice(ChoicePolicy):
+            pass
+
+        with self.assertRaises(TypeError):
+            NoChoice()
+
+        class FirstChoice(ChoicePolicy):
+            def choose(self, choices, manager, rng):
+                return choices[0][0]
+
+        report = PlaythroughSimulator(self.project, FirstChoice(), seed=0).run(5)
+        self.assertEqual(report.runs, 5)
+
+    def test_max_steps_truncates_loops(self):
+        project = ProjectModel()
+        loop = NodeModel(id="loop", type=NodeType.START)
+        loop.content["choices"] = [{"id": "again", "text": "Encore", "target_node_id": "loop"}]
+        project.add_node(loop)
+        report = PlaythroughSimulator(project, max_steps=20, seed=0).run(3)
+        self.assertEqual(report.truncated_runs, 3)
+        self.assertEqual(report.steps, 60)
+
+    def test_reach_quests_and_variable_ranges(self):
+        self.project.nodes["forest"].logic["on_enter"].append(
+            {"type": "startQuest", "parameters": {"quest_id": "q_herb"}})
+        self.project.nodes["forest"].logic["on_enter"].append(
+            {"type": "completeQuest", "parameters": {"quest_id": "q_herb"}})
+        simulator = PlaythroughSimulator(self.project, RandomPolicy(), seed=3, track_variables=["gold", "health"])
+        report = simulator.run(200)
+        reach = report.reach_probability()
+        self.assertEqual(reach["start"], 1.0)
+        self.assertAlmostEqual(sum(reach[n] for n in ("forest", "cave")) + report.broken_links[("start", "missing")] / 200, 1.0)
+        self.assertEqual(report.quest_completions["q_herb"], report.node_reach["forest"])
+        self.assertEqual(sum(report.completed_quest_counts.values()), 200)
+        self.assertEqual(report.variable_ranges["start"]["health"], [100, 100])
+
+    def test_merge_matches_single_run(self):
+        part_a = PlaythroughSimulator(self.project, seed=1).run(50)
+        part_b = PlaythroughSimulator(self.project, seed=2).run(70)
+        merged = SimulationReport().merge(part_a).merge(part_b)
+        self.assertEqual(merged.runs, 120)
+        self.assertEqual(merged.node_visits["start"], 120)
+        self.assertEqual(merged.node_reach, part_a.node_reach + part_b.node_reach)
+
+    def test_parallel_explore_is_reproducible(self):
+        data = self.project.to_dict()
+        serial = explore(data, 300, workers=1, seed=5, chunk_size=40)
+        parallel = explore(data, 300, workers=2, seed=5, chunk_size=40)
+        self.assertEqual(serial.runs, 300)
+        self.assertEqual(serial.to_dict(), parallel.to_dict())
+
+
+if __name__ == '__main__':
+    unittest.main()
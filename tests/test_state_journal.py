@@ -0,0 +1,111 @@
+import json
+import unittest
+from src.core.models import ProjectModel, NodeModel
+from src.core.definitions import NodeType
+from src.engine.variable_store import VariableStore
+from src.engine.story_manager import StoryManager
+from src.engine.save_system import SaveSystem
+
+
+class TestStateJournal(unittest.TestCase):
+    def setUp(self):
+        self.store = VariableStore()
+
+    def test_journal_records_old_and_new(self):
+        start = self.store.journal_position
+        self.store.set_var("gold", 10)
+        self.store.set_var("gold", 15)
+        self.store.set_var("new_flag", True)
+        self.assertEqual(self.store.changes_since(start),
+                         [("gold", 0, 10), ("gold", 10, 15), ("new_flag", None, True)])
+
+    def test_snapshot_is_delta_since_checkpoint(self):
+        self.store.checkpoint()
+        self.store.set_var("gold", 5)
+        self.store.increment_visit_count("n1")
+        self.store.increment_visit_count("n1")
+        snap = self.store.snapshot()
+        self.assertEqual(set(snap.delta), {"gold", "visit_counts"})
+        self.assertEqual(snap.to_dict()["visit_counts"], {"n1": 2})
+        json.dumps(snap.to_dict())
+
+    def test_snapshots_taken_in_sequence_are_independent(self):
+        self.store.checkpoint()
+        snapshots = []
+        for gold in range(1, 4):
+            self.store.set_var("gold", gold)
+            snapshots.append(self.store.snapshot())
+        self.store.set_var("temp", 1)
+        self.assertEqual([s.to_dict()["gold"] for s in snapshots], [1, 2, 3])
+        self.assertNotIn("temp", snapshots[-1].to_dict())
+        # Le delta ne grossit pas avec le nombre d'écritures
+        self.assertEqual(len(self.store.snapshot().delta), 2)
+
+        self.store.restore(snapshots[0])
+        self.assertNotIn("temp", self.store.snapshot().to_dict())
+        self.assertEqual(self.store.snapshot().to_dict()["gold"], 1)
+
+    def test_restore_snapshot(self):
+        self.store.start_quest("q1")
+        snap = self.store.snapshot()
+        self.store.set_var("gold", 99)
+        self.store.complete_quest("q1")
+        self.store.set_var("temp", 1)
+
+        batches = []
+        self.store.add_batch_observer(batches.append)
+        self.store.restore(snap)
+
+        self.assertEqual(self.store.get_var("gold"), 0)
+        self.assertIsNone(self.store.get_var("temp"))
+        self.assertEqual(self.store.get_var("active_quests"), ["q1"])
+        self.assertEqual(self.store.quests.status("q1"), "active")
+        self.assertEqual(len(batches), 1)
+
+    def test_rollback_is_journaled(self):
+        start = self.store.journal_position
+        try:
+            with self.store.transaction():
+                self.store.set_var("gold", 3)
+                raise RuntimeError()
+        except RuntimeError:
+            pass
+        self.assertEqual(self.store.changes_since(start), [("gold", 0, 3), ("gold", 3, 0)])
+
+    def test_journal_truncated_by_checkpoint(self):
+        self.store.set_var("gold", 1)
+        self.store.checkpoint()
+        with self.assertRaises(ValueError):
+            self.store.changes_since(0)
+
+    def test_auto_checkpoint_keeps_snapshots_valid(self):
+        self.store.JOURNAL_LIMIT = 50
+        for i in range(120):
+            self.store.increment_visit_count(f"n{i}")
+        self.assertLess(len(self.store.snapshot().delta), 50)
+        self.assertEqual(len(self.store.snapshot().to_dict()["visit_counts"]), 120)
+
+
+class TestSaveSystemStates(unittest.TestCase):
+    def test_capture_and_restore_state(self):
+        project = ProjectModel()
+        project.add_node(NodeModel(id="start", type=NodeType.START))
+        project.add_node(NodeModel(id="room", type=NodeType.DIALOGUE))
+        manager = StoryManager()
+        manager.load_project(project)
+        manager.set_current_node("start")
+
+        state = SaveSystem.capture_state(manager)
+        history = list(manager.history)
+        manager.set_current_node("room")
+        manager.variables.set_var("gold", 12)
+
+        self.assertTrue(SaveSystem.restore_state(manager, state))
+        self.assertEqual(manager.current_node.id, "start")
+        self.assertEqual(manager.variables.get_var("gold"), 0)
+        self.assertEqual(manager.variables.get_visit_count("room"), 0)
+        self.assertEqual(list(manager.history), history)
+
+
+if __name__ == '__main__':
+    unittest.main()
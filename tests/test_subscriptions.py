@@ -0,0 +1,73 @@
+import unittest
+from src.engine.variable_store import VariableStore
+
+
+class TestSubscriptions(unittest.TestCase):
+    def setUp(self):
+        self.store = VariableStore()
+        self.received = []
+
+    def record(self, name, value):
+        self.received.append(name)
+
+    def test_exact_prefix_and_wildcard(self):
+        exact, prefix, everything = [], [], []
+        self.store.subscribe("health", lambda n, v: exact.append(n))
+        self.store.subscribe("location_*", lambda n, v: prefix.append(n))
+        self.store.subscribe("*", lambda n, v: everything.append(n))
+
+        self.store.set_var("health", 50)
+        self.store.set_var("location_text", "Ici")
+        self.store.increment_visit_count("n1")
+
+        self.assertEqual(exact, ["health"])
+        self.assertEqual(prefix, ["location_text"])
+        self.assertEqual(everything, ["health", "location_text", "visit_counts"])
+
+    def test_counters(self):
+        self.store.subscribe("health", self.record)
+        self.store.subscribe("gold", self.record)
+        self.store.increment_visit_count("n1")
+        self.store.set_var("health", 10)
+        stats = self.store.get_notification_stats()
+        self.assertEqual(stats["delivered"], 1)
+        self.assertEqual(stats["dropped"], 3)
+        self.assertEqual(stats["subscriptions"], 2)
+
+        self.store.reset_notification_stats()
+        self.assertEqual(self.store.get_notification_stats()["dropped"], 0)
+
+    def test_batch_subscription_once_per_transaction(self):
+        batches = []
+        self.store.subscribe(["xp", "level", "xp_next"], batches.append, batch=True)
+        self.store.add_xp(500)
+        self.assertEqual(len(batches), 1)
+        self.assertEqual(set(batches[0]), {"xp", "level", "xp_next"})
+
+    def test_overlapping_patterns_deliver_once(self):
+        self.store.subscribe(["location_*", "location_city", "*"], self.record)
+        self.store.set_var("location_city", "Port")
+        self.assertEqual(self.received, ["location_city"])
+
+    def test_unsubscribe_and_route_cache(self):
+        self.store.set_var("gold", 1)
+        sub = self.store.subscribe("gold", self.record)
+        self.store.set_var("gold", 2)
+        self.store.unsubscribe(sub)
+        self.store.set_var("gold", 3)
+        self.store.subscribe("g*", self.record)
+        self.store.set_var("gold", 4)
+        self.assertEqual(self.received, ["gold", "gold"])
+
+    def test_failing_callback_counted(self):
+        def broken(name, value):
+            raise ValueError("x")
+        self.store.subscribe("gold", broken)
+        self.store.subscribe("gold", self.record)
+        self.store.set_var("gold", 5)
+        self.assertEqual(self.received, ["gold"])
+        self.assertEqual(self.store.get_notification_stats()["errors"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+from src.core.models import ProjectModel, NodeModel
+from src.core.definitions import NodeType
+from src.engine.variable_store import VariableStore
+from src.engine.script_parser import ScriptParser, TextTemplate
+from src.engine.story_manager import StoryManager
+
+
+class TestTextTemplates(unittest.TestCase):
+    def setUp(self):
+        self.store = VariableStore()
+        self.parser = ScriptParser(self.store)
+
+    def test_template_segments(self):
+        template = TextTemplate("Bonjour ${player_name}, tu as ${gold} pièces.")
+        self.assertEqual(template.literals, ["Bonjour ", ", tu as ", " pièces."])
+        self.assertEqual(template.names, ["player_name", "gold"])
+
+    def test_parse_text_uses_cache(self):
+        self.store.set_var("player_name", "Arthur")
+        self.assertEqual(self.parser.parse_text("Bonjour ${player_name}"), "Bonjour Arthur")
+        self.store.set_var("player_name", "Morgane")
+        self.assertEqual(self.parser.parse_text("Bonjour ${player_name}"), "Bonjour Morgane")
+
+        stats = self.parser.get_template_stats()
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["hits"], 1)
+
+    def test_extra_context_and_missing_variable(self):
+        text = "Visites : ${visits} / ${inconnu}"
+        self.assertEqual(self.parser.parse_text(text, {"visits": 3}), "Visites : 3 / ERR:inconnu")
+
+    def test_invalidate_text(self):
+        self.parser.parse_text("Texte ${gold}")
+        self.parser.invalidate_text("Texte ${gold}")
+        self.parser.parse_text("Texte ${gold}")
+        self.assertEqual(self.parser.get_template_stats()["misses"], 2)
+
+    def test_project_texts_precompiled_on_load(self):
+        project = ProjectModel()
+        node = NodeModel(id="start", type=NodeType.START)
+        node.content["text"] = "Or : ${gold}"
+        node.content["text_variants"] = [{"condition": "$visits > 1", "text": "Encore toi ! ${gold}"}]
+        project.add_node(node)
+
+        manager = StoryManager()
+        manager.load_project(project)
+        misses = manager.parser.get_template_stats()["misses"]
+
+        self.assertEqual(manager.get_parsed_text(), "Or : 0")
+        self.assertEqual(manager.parser.get_template_stats()["misses"], misses)
+
+
+if __name__ == '__main__':
+    unittest.main()
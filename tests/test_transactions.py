@@ -0,0 +1,119 @@
+import unittest
+from src.core.models import ProjectModel, NodeModel
+from src.core.definitions import NodeType
+from src.engine.variable_store import VariableStore
+from src.engine.story_manager import StoryManager
+
+
+class TestTransactions(unittest.TestCase):
+    def setUp(self):
+        self.store = VariableStore()
+        self.events = []
+        self.batches = []
+        self.store.add_observer(lambda name, value: self.events.append((name, value)))
+        self.store.add_batch_observer(lambda changes: self.batches.append(dict(changes)))
+
+    def test_coalesced_notifications(self):
+        with self.store.transaction():
+            self.store.set_var("gold", 10)
+            self.store.set_var("gold", 20)
+            self.store.add_item("potion")
+            self.store.add_item("potion")
+            self.assertEqual(self.events, [])
+        self.assertEqual(self.events, [("gold", 20), ("inventory", {"potion": 2})])
+        self.assertEqual(len(self.batches), 1)
+
+    def test_round_trip_not_notified(self):
+        with self.store.transaction():
+            self.store.set_var("gold", 50)
+            self.store.set_var("gold", 0)
+        self.assertEqual(self.events, [])
+        self.assertEqual(self.batches, [])
+
+    def test_rollback_on_exception(self):
+        self.store.start_quest("q1")
+        self.events.clear()
+        version = self.store.get_version("gold")
+        with self.assertRaises(RuntimeError):
+            with self.store.transaction():
+                self.store.set_var("gold", 99)
+                self.store.complete_quest("q1")
+                raise RuntimeError("script")
+        self.assertEqual(self.store.get_var("gold"), 0)
+        self.assertEqual(self.store.get_var("active_quests"), ["q1"])
+        self.assertEqual(self.store.get_var("completed_quests"), [])
+        self.assertEqual(self.store.quests.status("q1"), "active")
+        self.assertGreater(self.store.get_version("gold"), version)
+        self.assertEqual(self.events, [])
+
+    def test_rollback_restores_in_place_mutations(self):
+        coords = self.store.get_var("player_coordinates")
+        self.store.set_var("flags", ["porte"])
+        flags = self.store.get_var("flags")
+        self.events.clear()
+        with self.assertRaises(RuntimeError):
+            with self.store.transaction():
+                self.store.load_state({"player_coordinates": coords})
+                coords["x"] = 42
+                del coords["continent"]
+                flags.append("coffre")
+                raise RuntimeError("script")
+        self.assertEqual(self.store.get_var("player_coordinates"), {"x": 0, "y": 0, "continent": "Eldaron"})
+        self.assertEqual(self.store.get_var("flags"), ["porte"])
+        # Remise en état sur place : les références déjà lues voient l'état restauré
+        self.assertIs(self.store.get_var("flags"), flags)
+        self.assertEqual(coords["x"], 0)
+        self.assertEqual(self.events, [])
+
+    def test_nested_rollback_keeps_outer_changes(self):
+        with self.store.transaction():
+            self.store.set_var("gold", 5)
+            try:
+                with self.store.transaction():
+                    self.store.set_var("gold", 7)
+                    self.store.set_var("xp", 3)
+                    raise ValueError()
+            except ValueError:
+                pass
+        self.assertEqual(self.events, [("gold", 5)])
+
+    def test_add_xp_single_batch(self):
+        self.store.add_xp(150)
+        self.assertEqual(len(self.batches), 1)
+        self.assertIn("level", self.batches[0])
+
+
+class TestNodeTransitionTransaction(unittest.TestCase):
+    def setUp(self):
+        project = ProjectModel()
+        start = NodeModel(id="start", type=NodeType.START)
+        room = NodeModel(id="room", type=NodeType.DIALOGUE)
+        room.logic["on_enter"] = [{"type": "addItem", "parameters": {"item_id": "key", "qty": 1}},
+                                  {"type": "set_variable", "parameters": {"var_name": "gold", "value": 5}}]
+        project.add_node(start)
+        project.add_node(room)
+        self.manager = StoryManager()
+        self.manager.load_project(project)
+        self.manager.set_current_node("start")
+        self.batches = []
+        self.manager.variables.add_batch_observer(lambda changes: self.batches.append(changes))
+
+    def test_transition_notifies_once(self):
+        self.manager.set_current_node("room")
+        self.assertEqual(len(self.batches), 1)
+        self.assertIn("visit_counts", self.batches[0])
+        self.assertIn("inventory", self.batches[0])
+
+    def test_transition_rolled_back_on_error(self):
+        def failing(events):
+            raise RuntimeError("boom")
+        self.manager.parser.execute_events = failing
+        with self.assertRaises(RuntimeError):
+            self.manager.set_current_node("room")
+        self.assertEqual(self.manager.current_node.id, "start")
+        self.assertEqual(self.manager.variables.get_visit_count("room"), 0)
+        self.assertEqual(self.batches, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+from unittest.mock import patch
+from src.engine.variable_store import VariableStore
+from src.engine.script_parser import ScriptParser
+
+
+class TestVariableView(unittest.TestCase):
+    def setUp(self):
+        self.store = VariableStore()
+        self.parser = ScriptParser(self.store)
+
+    def test_overlay_and_live_values(self):
+        view = self.store.view({"visits": 3, "gold": 99})
+        self.assertEqual(view["visits"], 3)
+        self.assertEqual(view["gold"], 99)  # le contexte local masque le store
+        self.assertEqual(view["health"], 100)
+
+        self.store.set_var("health", 40)
+        self.assertEqual(view["health"], 40)  # pas de copie
+        self.assertIn("visits", view)
+        self.assertEqual(len(view), len(self.store.get_all()) + 1)
+
+    def test_view_is_read_only(self):
+        self.store.set_var("inventory", {"sword": 1})
+        view = self.store.view()
+        with self.assertRaises(TypeError):
+            view["gold"] = 10
+        with self.assertRaises(TypeError):
+            view["inventory"]["sword"] = 5
+        self.assertEqual(self.store.get_var("inventory"), {"sword": 1})
+
+    def test_sequences_are_read_only(self):
+        self.store.start_quest("q1")
+        self.store.set_var("tags", {"brave"})
+        view = self.store.view()
+        with self.assertRaises(TypeError):
+            view["active_quests"][0] = "q2"
+        view["active_quests"].append("q2")  # PVector : nouvelle version, store intact
+        self.assertFalse(hasattr(view["tags"], "add"))
+        self.assertEqual(view["active_quests"], ["q1"])
+        self.assertTrue(self.parser.evaluate_condition("'q1' in active_quests and completed_quests == []"))
+        self.assertFalse(self.parser.evaluate_condition("active_quests.append('q2')"))
+        self.assertEqual(self.store.get_var("active_quests"), ["q1"])
+
+    def test_condition_does_not_copy_store(self):
+        with patch.object(VariableStore, "get_all", side_effect=AssertionError("copie")):
+            self.assertTrue(self.parser.evaluate_condition("visits > 1 and gold == 0", {"visits": 2}))
+
+    def test_missing_variable(self):
+        with self.assertRaises(NameError):
+            self.store.view().resolve("inconnue")
+        self.assertFalse(self.parser.evaluate_condition("inconnue > 1"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,176 @@
+import os
+import random
+import sys
+import time
+import unittest
+
+# Les modules serveur s'importent à plat (server/)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "server")))
+
+try:
+    import pydantic
+except ImportError:
+    pydantic = None
+
+if pydantic is not None:
+    from core_models import GameItem, InventoryManager, ItemType, Location, WorldGraph
+    from npc_agent import GameAwareNPC, NPCState
+
+
+def make_world(points, continent="Eldaron"):
+    world = WorldGraph()
+    for i, (x, y) in enumerate(points):
+        world.add_location(Location(loc_id=f"L{i}", name=f"Lieu {i}", description="", x=x, y=y, continent=continent))
+    return world
+
+
+def linear_nearest(world, x, y, continent, k=1):
+    """Ancien parcours linéaire de find_nearest_location (référence)."""
+    found = []
+    for rank, loc in enumerate(world.locations.values()):
+        if loc.continent.lower() == continent.lower():
+            found.append((((loc.x - x) ** 2 + (loc.y - y) ** 2) ** 0.5, rank, loc.loc_id))
+    return [(loc_id, dist) for dist, _, loc_id in sorted(found)[:k]]
+
+
+@unittest.skipIf(pydantic is None, "pydantic requis par les modèles serveur")
+class TestWorldGraphSpatialIndex(unittest.TestCase):
+    def assertNearest(self, world, x, y, continent, k=1):
+        found = [(loc.loc_id, dist) for loc, dist in world.find_nearest_locations(x, y, continent, k=k)]
+        self.assertEqual(found, linear_nearest(world, x, y, continent, k))
+
+    def test_matches_linear_scan(self):
+        rng = random.Random(4)
+        world = WorldGraph()
+        for i in range(1500):
+            world.add_location(Location(loc_id=f"L{i}", name=f"Lieu {i}", description="",
+                                        x=round(rng.uniform(0, 100)), y=round(rng.uniform(0, 100)),
+                                        continent=rng.choice(["Eldaron", "Varnal"])))
+        world.build_spatial_index()
+        for _ in range(500):
+            x, y = rng.uniform(-50, 150), rng.uniform(-50, 150)
+            self.assertNearest(world, x, y, rng.choice(["eldaron", "VARNAL"]), k=rng.choice([1, 5]))
+        self.assertEqual(world.find_nearest_location(0, 0, "Nulle-part"), (None, float('inf')))
+
+    def test_degenerate_layouts(self):
+        # Deux lieux sur une ligne : la grille ne doit pas se réduire à des cellules infimes
+        world = make_world([(0, 0), (100, 0)])
+        loc, dist = world.find_nearest_location(50, 50, "eldaron")
+        self.assertEqual((loc.loc_id, dist), ("L0", 5000 ** 0.5))
+
+        world = make_world([(0, 0), (0, 0), (0, 0)])
+        self.assertNearest(world, 50, 50, "Eldaron", k=3)
+
+        rng = random.Random(1)
+        world = make_world([(rng.uniform(0, 1000), 3.0) for _ in range(200)])
+        for x, y in ((500, 3), (500, 800), (-1e6, 1e6), (1e9, 3)):
+            self.assertNearest(world, x, y, "Eldaron", k=3)
+
+    def test_index_rebuilt_after_add_location(self):
+        world = make_world([(0, 0), (10, 10)])
+        world.build_spatial_index()
+        world.add_location(Location(loc_id="new", name="Nouveau", description="", x=5, y=5))
+        self.assertEqual(world.find_nearest_location(5, 4, "Eldaron")[0].loc_id, "new")
+
+
+def make_network():
+    """
+    L0 --10-- L1 --10-- L2 ; L0 --3-- L3 --3-- L2 ; L0 -> L2 direct (1s) mais verrouillé.
+    L4 est isolé.
+    """
+    world = make_world([(0, 0), (1, 0), (2, 0), (1, 2), (9, 9)])
+    for a, b, cost in (("L0", "L1", 10), ("L1", "L2", 10), ("L0", "L3", 3), ("L3", "L2", 3)):
+        world.add_connection(a, b, cost)
+        world.add_connection(b, a, cost)
+    key = GameItem(name="Clé", description="", item_type=ItemType.KEY)
+    world.add_connection("L0", "L2", 1, locked=True, key_id=key.item_id)
+    return world, key
+
+
+@unittest.skipIf(pydantic is None, "pydantic requis par les modèles serveur")
+class TestWorldGraphRoutes(unittest.TestCase):
+    def test_multi_hop_route_avoids_locked_edge(self):
+        world, _ = make_network()
+        route = world.find_route("L0", "L2")
+        self.assertEqual(route.path, ["L0", "L3", "L2"])
+        self.assertEqual(route.leg_times, [3, 3])
+        self.assertEqual(route.total_seconds, 6)
+        self.assertEqual(world.travel_times_from("L0"), {"L0": 0, "L1": 10, "L3": 3, "L2": 6})
+        # Itinéraire lu depuis l'arbre Dijkstra en cache : même résultat
+        world._routes.clear()
+        self.assertEqual(world.find_route("L0", "L2").path, ["L0", "L3", "L2"])
+        self.assertEqual(world.find_route("L1", "L1").path, ["L1"])
+
+    def test_no_route(self):
+        world, _ = make_network()
+        self.assertIsNone(world.find_route("L0", "L4"))
+        self.assertIsNone(world.find_route("L0", "inconnu"))
+        self.assertIsNone(world.get_route_cost("L4", "L0"))
+
+    def test_cache_invalidated_by_unlock_path(self):
+        world, key = make_network()
+        self.assertEqual(world.get_route_cost("L0", "L2"), 6)
+        self.assertTrue(world.unlock_path("L0", "L2", key))
+        self.assertEqual(world.find_route("L0", "L2").path, ["L0", "L2"])
+        # Le passage n'est ouvert que dans un sens
+        self.assertEqual(world.get_route_cost("L2", "L0"), 6)
+
+    def test_cache_invalidated_by_add_connection(self):
+        world, _ = make_network()
+        self.assertIsNone(world.find_route("L0", "L4"))
+        self.assertEqual(world.travel_times_from("L0").get("L4"), None)
+        self.assertTrue(world.add_connection("L3", "L4", 5))
+        self.assertEqual(world.find_route("L0", "L4").path, ["L0", "L3", "L4"])
+        self.assertEqual(world.travel_times_from("L0")["L4"], 8)
+        self.assertFalse(world.add_connection("inconnu", "L4", 5))
+
+    def test_cache_invalidated_by_lock_toggle(self):
+        world, _ = make_network()
+        self.assertEqual(world.find_route("L0", "L2").path, ["L0", "L3", "L2"])
+        self.assertTrue(world.set_connection_locked("L0", "L2", False))
+        self.assertEqual(world.find_route("L0", "L2").path, ["L0", "L2"])
+        self.assertTrue(world.set_connection_locked("L0", "L2", True))
+        self.assertTrue(world.set_connection_locked("L0", "L3", True))
+        self.assertEqual(world.find_route("L0", "L2").path, ["L0", "L1", "L2"])
+        self.assertEqual(world.travel_times_from("L0")["L3"], 23)
+        self.assertFalse(world.set_connection_locked("L0", "L4", False))
+
+    def test_caches_are_per_graph(self):
+        world, _ = make_network()
+        other, _ = make_network()
+        other.find_route("L0", "L2")
+        world.add_connection("L3", "L4", 5)
+        # Une modification d'un autre graphe ne vide pas ce cache
+        self.assertIn(("L0", "L2"), other._routes)
+        # Modification directe : à signaler par invalidate_routes()
+        other.locations["L0"].connections["L3"].travel_time_seconds = 100
+        other.invalidate_routes()
+        self.assertEqual(other.find_route("L0", "L2").path, ["L0", "L1", "L2"])
+
+    def test_start_travel_uses_multi_hop_time(self):
+        world, _ = make_network()
+        npc = GameAwareNPC("Garde", "L0", world, InventoryManager(), "Un garde.")
+        before = time.time()
+        message = npc.start_travel("L2")
+        self.assertIn("Lieu 3", message)
+        self.assertIn("6 secondes", message)
+        self.assertEqual(npc.state, NPCState.MOVING)
+        self.assertEqual([stop for stop, _ in npc.travel_plan], ["L3", "L2"])
+        self.assertAlmostEqual(npc.travel_plan[0][1] - before, 3, delta=0.5)
+        self.assertAlmostEqual(npc.arrival_time - before, 6, delta=0.5)
+
+        # Passage par l'étape intermédiaire, puis arrivée
+        npc.travel_plan = [(stop, at - 4) for stop, at in npc.travel_plan]
+        npc.arrival_time -= 4
+        npc.update()
+        self.assertEqual((npc.current_location_id, npc.state), ("L3", NPCState.MOVING))
+        npc.travel_plan = [(stop, at - 4) for stop, at in npc.travel_plan]
+        npc.arrival_time -= 4
+        npc.update()
+        self.assertEqual((npc.current_location_id, npc.state), ("L2", NPCState.IDLE))
+
+        self.assertIn("Aucun chemin", npc.start_travel("L4"))
+
+
+if __name__ == '__main__':
+    unittest.main()
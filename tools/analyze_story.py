@@ -0,0 +1,45 @@
+"""
+Analyse statique d'un projet : nœuds inaccessibles depuis START, liens vers
+des nœuds inexistants, cycles sans sortie et composantes fortement connexes.
+
+Usage : python tools/analyze_story.py test.json [--json out.json] [--strict]
+Avec --strict, le code de retour vaut 1 si un problème est détecté (CI).
+"""
+import argparse
+import json
+import os
+import sys
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.core.graph_analysis import StoryGraph
+from src.core.serializer import ProjectSerializer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyse statique du graphe d'un projet narratif.")
+    parser.add_argument("project", help="Fichier projet (.json)")
+    parser.add_argument("--json", help="Écrit le rapport complet dans ce fichier")
+    parser.add_argument("--strict", action="store_true", help="Code de retour 1 si un problème est détecté")
+    args = parser.parse_args()
+
+    project = ProjectSerializer.load_project(args.project)
+    if project is None:
+        sys.exit(2)
+
+    graph = StoryGraph.from_project(project)
+    report = graph.analyze()
+    print(f"{len(project.nodes)} nœuds, {len(graph.links)} liens")
+    print(report.format_summary(project.nodes))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report.to_dict(), f, indent=4, ensure_ascii=False)
+
+    if args.strict and not report.is_clean:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
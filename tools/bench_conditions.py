@@ -0,0 +1,118 @@
+"""
+Benchmark : évaluation des conditions via eval() (ancien chemin) vs moteur AST.
+
+Usage : python tools/bench_conditions.py [projet.json] [--repeat N]
+Les conditions sont extraites du projet (choix et variantes de texte) ;
+un jeu de conditions représentatives complète la liste si le projet en contient peu.
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.core.serializer import ProjectSerializer
+from src.engine.variable_store import VariableStore
+from src.engine.script_parser import ScriptParser
+
+SAMPLE_CONDITIONS = [
+    "$gold >= 10",
+    "$visits > 1",
+    "level >= 3 and not 'quest_01' in active_quests",
+    "'sword_01' in inventory and strength > 12",
+    "health < max_health / 2 or gold > 100",
+    "player_coordinates['continent'] == 'Eldaron' and xp + 50 >= xp_next",
+    "${dexterity} + ${strength} > 25 and resistance >= 0",
+    "inventory.get('potion_soin', 0) >= 2",
+]
+
+
+def collect_conditions(project):
+    conditions = []
+    for node in project.nodes.values():
+        for choice in node.content.get("choices", []):
+            if choice.get("condition"):
+                conditions.append(choice["condition"])
+        for variant in node.content.get("text_variants", []):
+            if variant.get("condition"):
+                conditions.append(variant["condition"])
+    return conditions
+
+
+def make_store():
+    store = VariableStore()
+    store.set_var("gold", 42)
+    store.set_var("inventory", {f"item_{i}": i for i in range(200)})
+    store.set_var("visit_counts", {f"node_{i}": 1 for i in range(2000)})
+    store.set_var("node_text_overrides", {f"node_{i}": "..." for i in range(300)})
+    return store
+
+
+def legacy_evaluate(variables, condition, extra_context):
+    """
+    Reproduction de l'ancien ScriptParser.evaluate_condition (copie + re.sub + eval).
+    `variables` : valeurs simples (dicts Python), comme l'ancien VariableStore ;
+    l'ancien get_all() n'en faisait qu'une copie superficielle.
+    """
+    context = variables.copy()
+    if extra_context:
+        context.update(extra_context)
+    try:
+        clean_condition = re.sub(r'\$\{([a-zA-Z0-9_]+)\}', r'\1', condition)
+        clean_condition = re.sub(r'\$([a-zA-Z0-9_]+)', r'\1', clean_condition)
+        return bool(eval(clean_condition, {"__builtins__": {}}, context))
+    except Exception:
+        return False
+
+
+def bench(label, fn, conditions, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for condition in conditions:
+            fn(condition)
+    elapsed = time.perf_counter() - start
+    per_call = elapsed / (repeat * len(conditions)) * 1e6
+    print(f"{label:<12} {elapsed * 1000:9.1f} ms   {per_call:7.2f} µs/condition")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("project", nargs="?", help="Fichier projet JSON")
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    conditions = []
+    if args.project:
+        project = ProjectSerializer.load_project(args.project)
+        if project:
+            conditions = collect_conditions(project)
+            print(f"{len(conditions)} conditions extraites de {args.project}")
+    if len(conditions) < len(SAMPLE_CONDITIONS):
+        conditions += SAMPLE_CONDITIONS
+
+    store = make_store()
+    script_parser = ScriptParser(store)
+    extra_context = {"visits": 2}
+    # get_all() convertit les conteneurs persistants en dicts : fait une seule
+    # fois, hors mesure, pour retrouver le coût réel de l'ancien chemin
+    variables = store.get_all()
+
+    # Les deux chemins doivent donner les mêmes résultats
+    for condition in conditions:
+        expected = legacy_evaluate(variables, condition, extra_context)
+        got = script_parser.evaluate_condition(condition, extra_context)
+        if expected != got:
+            print(f"DIVERGENCE sur '{condition}': eval={expected} ast={got}")
+
+    legacy = bench("eval()", lambda c: legacy_evaluate(variables, c, extra_context), conditions, args.repeat)
+    ast_time = bench("AST", lambda c: script_parser.evaluate_condition(c, extra_context), conditions, args.repeat)
+    print(f"Accélération : x{legacy / ast_time:.1f}")
+    print(f"Cache : {script_parser.get_condition_stats()}")
+
+
+if __name__ == "__main__":
+    main()
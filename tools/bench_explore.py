@@ -0,0 +1,82 @@
+"""
+Benchmark : passage à l'échelle de l'exploration Monte Carlo (tools/explore_story.py).
+
+Usage : python tools/bench_explore.py [--runs 10000] [--workers 2 4 8] [--depth 12] [--width 6]
+Génère une histoire qui se termine toujours (graphe en couches : chaque
+nœud mène à la couche suivante, la dernière couche est faite de nœuds END,
+avec conditions et scripts comme une vraie histoire), puis mesure les
+parties/s en série (1 processus) et avec N processus. Vérifie que les
+rapports sont identiques quel que soit le nombre de processus.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.core.definitions import NodeType
+from src.core.models import ProjectModel, NodeModel
+from explore_story import explore
+
+
+def make_layered_story(depth, width, seed=0):
+    """Histoire en `depth` couches de `width` nœuds ; toutes les parties atteignent un nœud END."""
+    rng = random.Random(seed)
+    project = ProjectModel()
+    start = NodeModel(id="start", type=NodeType.START)
+    project.add_node(start)
+    previous = [start]
+    for layer in range(depth):
+        node_type = NodeType.END if layer == depth - 1 else NodeType.DIALOGUE
+        current = [NodeModel(id=f"n{layer}_{i}", type=node_type) for i in range(width)]
+        for node in current:
+            node.logic["on_enter"] = [{"type": "addItem", "parameters": {"item_id": f"objet_{rng.randrange(20)}", "qty": 1}}]
+            project.add_node(node)
+        for node in previous:
+            targets = rng.sample(current, min(3, width))
+            node.content["choices"] = [
+                {"id": f"{node.id}_{k}", "text": f"Choix {k}", "target_node_id": target.id,
+                 # Le premier choix reste toujours possible : pas d'impasse
+                 "condition": "" if k == 0 else f"$gold >= {rng.randrange(0, 50)} or visits > 1"}
+                for k, target in enumerate(targets)
+            ]
+        previous = current
+    return project
+
+
+def timed_explore(project_data, runs, workers, chunk_size):
+    start = time.perf_counter()
+    report = explore(project_data, runs, workers=workers, seed=1, chunk_size=chunk_size)
+    return report, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parties/s de explore_story en série et sur N processus.")
+    parser.add_argument("--runs", type=int, default=10000)
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({2, os.cpu_count() or 1}))
+    parser.add_argument("--depth", type=int, default=12)
+    parser.add_argument("--width", type=int, default=6)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    args = parser.parse_args()
+
+    project_data = make_layered_story(args.depth, args.width).to_dict()
+    print(f"Histoire : {args.depth} couches x {args.width} nœuds, {args.runs} parties, "
+          f"{os.cpu_count()} cœur(s) visibles")
+
+    serial, serial_time = timed_explore(project_data, args.runs, 1, args.chunk_size)
+    print(f"{1:>3} processus : {serial_time:7.2f}s  {args.runs / serial_time:9.0f} parties/s  "
+          f"(tronquées : {serial.truncated_runs})")
+    for workers in args.workers:
+        if workers == 1:
+            continue
+        report, elapsed = timed_explore(project_data, args.runs, workers, args.chunk_size)
+        same = "identique" if report.to_dict() == serial.to_dict() else "DIFFÉRENT"
+        print(f"{workers:>3} processus : {elapsed:7.2f}s  {args.runs / elapsed:9.0f} parties/s  "
+              f"x{serial_time / elapsed:.2f}  rapport {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Benchmark : LoreManager.get_location_at (parcours linéaire vs grille spatiale).
+
+Usage : python tools/bench_lore_lookup.py [--sizes 430 5000 50000] [--queries N] [--memory 100000]
+Mesure aussi le lore réel (server/lore) et vérifie que les deux méthodes
+retournent le même lieu. --memory compare la mémoire des lieux en dicts et
+en colonnes (LocationTable).
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.core.location_table import LocationTable
+from src.core.lore_manager import LoreManager
+
+CONTINENTS = ["velkarum", "eldaron", "helrun", "iskarion", "thaurgrim", "varnal"]
+
+
+def linear_location_at(locations, x, y, continent, tolerance=0.1):
+    """Ancienne implémentation (parcours et tri de tous les lieux du continent)."""
+    candidates = []
+    for loc in locations:
+        if loc["continent"] == continent:
+            dist = math.sqrt((loc["x"] - x)**2 + (loc["y"] - y)**2)
+            if dist <= tolerance:
+                candidates.append((dist, loc))
+    if not candidates:
+        return None
+    candidates.sort(key=lambda x: x[0])
+    best_dist = candidates[0][0]
+    close_matches = [c for c in candidates if abs(c[0] - best_dist) < 0.001]
+    micro_match = next((c for c in close_matches if c[1]["scale"] == "micro"), None)
+    return micro_match[1] if micro_match else candidates[0][1]
+
+
+def synthetic_locations(size, rng):
+    for i in range(size):
+        yield {
+            "id": f"loc_{i}", "name": f"Lieu {i}",
+            "x": round(rng.uniform(0, 100), 2), "y": round(rng.uniform(0, 100), 2),
+            "continent": rng.choice(CONTINENTS), "city": f"Ville {i % 300}", "place": f"Place {i}",
+            "type": "Ville", "scale": rng.choice(["micro", "macro"]), "main_location_name": "",
+        }
+
+
+def synthetic_manager(size, rng):
+    manager = LoreManager()
+    manager.locations = list(synthetic_locations(size, rng))
+    return manager
+
+
+def bench_memory(size, seed):
+    tracemalloc.start()
+    as_dicts = list(synthetic_locations(size, random.Random(seed)))
+    dict_bytes = tracemalloc.get_traced_memory()[0]
+    del as_dicts
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    manager = LoreManager()
+    manager.locations = LocationTable(synthetic_locations(size, random.Random(seed)))
+    table_bytes = tracemalloc.get_traced_memory()[0]
+    manager.get_location_at(0, 0, CONTINENTS[0])
+    indexed_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    print(f"Mémoire pour {size} lieux : dicts {dict_bytes / 1e6:.1f} Mo | colonnes {table_bytes / 1e6:.1f} Mo "
+          f"(x{dict_bytes / table_bytes:.1f} plus compact) | colonnes + grille {indexed_bytes / 1e6:.1f} Mo")
+
+
+def make_queries(manager, count, rng):
+    # Moitié sur un lieu existant (cas d'une scène placée sur la carte), moitié au hasard
+    queries = []
+    for i in range(count):
+        if i % 2 and manager.locations:
+            loc = rng.choice(manager.locations)
+            queries.append((loc["x"], loc["y"], loc["continent"]))
+        else:
+            queries.append((rng.uniform(0, 100), rng.uniform(0, 100), rng.choice(CONTINENTS)))
+    return queries
+
+
+def bench(label, manager, queries):
+    start = time.perf_counter()
+    manager._rebuild_index()
+    build = time.perf_counter() - start
+
+    # Référence : ancien stockage (liste de dicts)
+    as_dicts = manager.locations.to_dicts()
+    start = time.perf_counter()
+    expected = [linear_location_at(as_dicts, x, y, c) for x, y, c in queries]
+    linear = time.perf_counter() - start
+
+    start = time.perf_counter()
+    found = [manager.get_location_at(x, y, c) for x, y, c in queries]
+    indexed = time.perf_counter() - start
+
+    mismatches = sum(1 for a, b in zip(expected, found) if a != b)
+    per_query = 1e6 / len(queries)
+    print(f"{label:>14} | {len(manager.locations):>7} lieux | index {build * 1000:7.1f} ms | "
+          f"linéaire {linear * per_query:8.1f} µs | grille {indexed * per_query:6.1f} µs | "
+          f"x{linear / indexed:6.1f} | écarts {mismatches}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la recherche de lieu par coordonnées.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[430, 5000, 50000])
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--memory", type=int, default=100000, help="Nombre de lieux pour la mesure mémoire (0 : ignorée)")
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    lore_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "server", "lore"))
+    manager = LoreManager(lore_dir)
+    if manager.locations:
+        bench("server/lore", manager, make_queries(manager, args.queries, rng))
+
+    for size in args.sizes:
+        manager = synthetic_manager(size, rng)
+        bench("synthétique", manager, make_queries(manager, args.queries, rng))
+
+    if args.memory:
+        bench_memory(args.memory, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Benchmark : mises à jour des collections du VariableStore (copie complète vs persistant).
+
+Usage : python tools/bench_variable_store.py [--sizes 100 1000 5000 20000] [--updates N]
+Simule une sauvegarde (de quelques centaines à des milliers de nœuds visités)
+puis mesure le coût de increment_visit_count / add_item / mark_choice_used,
+et celui d'un instantané par étape avec retour arrière (snapshot_rollback).
+
+Lecture des résultats : l'inventaire (size / 10 objets) et les petites
+tables restent des dicts recopiés (persistent.SMALL_MAP_SIZE) ; l'écriture
+y coûte à peu près l'ancienne copie, plus le journal et les notifications
+du store. Le HAMT n'est gagnant en écriture qu'au-delà de ~1000 clés ; le
+gain principal est sur les instantanés / annulations, qui ne recopient plus
+les collections.
+"""
+import argparse
+import os
+import sys
+import time
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.engine.variable_store import VariableStore
+
+
+def make_save(size):
+    return {
+        "visit_counts": {f"node_{i}": 1 for i in range(size)},
+        "inventory": {f"item_{i}": 1 for i in range(size // 10)},
+        "used_choices": [f"choice_{i}" for i in range(size // 10)],
+    }
+
+
+class LegacyStore:
+    """
+    Reproduction des anciennes mises à jour : copie du dict / de la liste à
+    chaque appel, puis set_var qui comparait l'ancienne et la nouvelle valeur
+    (O(n)) avant de monter la version.
+    """
+    def __init__(self, data):
+        self.vars = {k: (dict(v) if isinstance(v, dict) else list(v)) for k, v in data.items()}
+        self.versions = {}
+
+    def set_var(self, name, value):
+        if self.vars.get(name) != value:
+            self.vars[name] = value
+            self.versions[name] = self.versions.get(name, 0) + 1
+
+    def increment_visit_count(self, node_id):
+        visits = self.vars["visit_counts"].copy()
+        visits[node_id] = visits.get(node_id, 0) + 1
+        self.set_var("visit_counts", visits)
+
+    def add_item(self, item_id, qty=1):
+        inv = self.vars["inventory"].copy()
+        inv[item_id] = inv.get(item_id, 0) + qty
+        self.set_var("inventory", inv)
+        print(f"[Jeu] Ajout item : {item_id} x{qty}")
+
+    def mark_choice_used(self, choice_id):
+        used = list(self.vars["used_choices"])
+        if choice_id not in used:
+            used.append(choice_id)
+            self.set_var("used_choices", used)
+
+    def snapshot(self):
+        # Ancienne capture : copie de chaque collection
+        return {k: (v.copy() if isinstance(v, (dict, list)) else v) for k, v in self.vars.items()}
+
+    def restore(self, snapshot):
+        self.vars = {k: (v.copy() if isinstance(v, (dict, list)) else v) for k, v in snapshot.items()}
+
+
+OPERATIONS = [
+    ("increment_visit_count", lambda i, size: f"node_{i % size}"),
+    ("add_item", lambda i, size: f"item_{i % 50}"),
+    ("mark_choice_used", lambda i, size: f"new_choice_{i}"),
+]
+
+
+def run(store, method, make_arg, size, updates):
+    fn = getattr(store, method)
+    start = time.perf_counter()
+    for i in range(updates):
+        fn(make_arg(i, size))
+    return time.perf_counter() - start
+
+
+def run_snapshots(store, size, updates):
+    """Une visite + un instantané par étape, retour arrière de 10 étapes toutes les 50."""
+    snapshots = []
+    start = time.perf_counter()
+    for i in range(updates):
+        store.increment_visit_count(f"node_{i % size}")
+        snapshots.append(store.snapshot())
+        if i % 50 == 49:
+            store.restore(snapshots[-10])
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 5000, 20000])
+    parser.add_argument("--updates", type=int, default=2000)
+    args = parser.parse_args()
+
+    # Les messages "[Jeu] Ajout item" de add_item fausseraient la mesure
+    devnull = open(os.devnull, "w")
+    print(f"{'noeuds':>8} {'opération':<24} {'copie':>10} {'persistant':>11} {'gain':>6}")
+    for size in args.sizes:
+        data = make_save(size)
+        legacy = LegacyStore(data)
+        store = VariableStore()
+        store.load_state(data)
+
+        for method, make_arg in OPERATIONS + [("snapshot_rollback", None)]:
+            stdout, sys.stdout = sys.stdout, devnull
+            try:
+                if make_arg is None:
+                    legacy_time = run_snapshots(legacy, size, args.updates)
+                    store_time = run_snapshots(store, size, args.updates)
+                else:
+                    legacy_time = run(legacy, method, make_arg, size, args.updates)
+                    store_time = run(store, method, make_arg, size, args.updates)
+            finally:
+                sys.stdout = stdout
+            print(f"{size:>8} {method:<24} {legacy_time * 1000:8.1f}ms {store_time * 1000:9.1f}ms"
+                  f"  x{legacy_time / store_time:.1f}")
+    devnull.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Benchmark : pathfinding du serveur PNJ (WorldGraph.find_route).
+
+Usage : python tools/bench_world_routes.py [--queries N] [--sizes 2000 10000]
+Charge le réseau de routes réel (server/lore, comme NPCServer) puis des
+réseaux synthétiques, et compare pour les mêmes paires (départ, arrivée) :
+Dijkstra sans heuristique, A* (cache vide), itinéraire en cache, et le
+calcul de toutes les paires (un arbre Dijkstra par départ). Vérifie que
+toutes les méthodes donnent la même durée.
+Nécessite les dépendances du serveur (pydantic).
+"""
+import argparse
+import heapq
+import os
+import random
+import sys
+import time
+
+# Add server dir to path (les modules serveur s'importent à plat)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "server")))
+
+from core_models import Location, WorldGraph
+
+
+def dijkstra_cost(world, start_id, end_id):
+    """Référence : Dijkstra arrêté à l'arrivée, sans heuristique ni cache."""
+    costs = {start_id: 0}
+    heap = [(0, start_id)]
+    while heap:
+        cost, loc_id = heapq.heappop(heap)
+        if loc_id == end_id:
+            return cost
+        if cost > costs[loc_id]:
+            continue
+        for target_id, conn in world.locations[loc_id].connections.items():
+            if conn.is_locked or target_id not in world.locations:
+                continue
+            new_cost = cost + conn.travel_time_seconds
+            if new_cost < costs.get(target_id, float('inf')):
+                costs[target_id] = new_cost
+                heapq.heappush(heap, (new_cost, target_id))
+    return None
+
+
+def load_lore_world():
+    """Réseau réel, chargé comme NPCServer._load_geography."""
+    from game_server import NPCServer
+    return NPCServer().world
+
+
+def synthetic_world(size, rng):
+    """Grille perturbée de `size` lieux, routes vers les voisins (durée ~ distance), 5% verrouillées."""
+    side = max(2, int(size ** 0.5))
+    world = WorldGraph()
+    for i in range(side * side):
+        x, y = i % side + rng.uniform(-0.3, 0.3), i // side + rng.uniform(-0.3, 0.3)
+        world.add_location(Location(loc_id=f"loc_{i}", name=f"Lieu {i}", description="", x=x, y=y))
+    for i in range(side * side):
+        loc = world.locations[f"loc_{i}"]
+        for j in (i + 1 if (i + 1) % side else None, i + side if i + side < side * side else None):
+            if j is None:
+                continue
+            other = world.locations[f"loc_{j}"]
+            dist = ((loc.x - other.x) ** 2 + (loc.y - other.y) ** 2) ** 0.5
+            time_cost = int(dist * 100 * rng.uniform(1.0, 1.5))
+            locked = rng.random() < 0.05
+            loc.add_connection(other.loc_id, time_cost, locked=locked)
+            other.add_connection(loc.loc_id, time_cost, locked=locked)
+    world.invalidate_routes()
+    return world
+
+
+def bench(label, world, queries, all_pairs=True):
+    ids = list(world.locations)
+    pairs = [(random.choice(ids), random.choice(ids)) for _ in range(queries)]
+    edges = sum(len(loc.connections) for loc in world.locations.values())
+
+    start = time.perf_counter()
+    expected = [dijkstra_cost(world, a, b) for a, b in pairs]
+    dijkstra = time.perf_counter() - start
+
+    world.invalidate_routes()
+    start = time.perf_counter()
+    for a, b in pairs:
+        world._routes.clear()  # A* à froid pour chaque requête
+        world.find_route(a, b)
+    astar = time.perf_counter() - start
+
+    world.invalidate_routes()
+    costs = [world.get_route_cost(a, b) for a, b in pairs]
+    start = time.perf_counter()
+    cached_costs = [world.get_route_cost(a, b) for a, b in pairs]
+    cached = time.perf_counter() - start
+
+    mismatches = sum(1 for e, c, k in zip(expected, costs, cached_costs) if not e == c == k)
+    per_query = 1e6 / len(pairs)
+    print(f"{label:>14} | {len(ids):>6} lieux {edges:>6} tronçons | dijkstra {dijkstra * per_query:8.1f} µs | "
+          f"A* {astar * per_query:8.1f} µs | cache {cached * per_query:5.1f} µs | écarts {mismatches}")
+
+    if all_pairs:
+        world.invalidate_routes()
+        start = time.perf_counter()
+        reachable = sum(len(world.travel_times_from(loc_id)) for loc_id in ids)
+        precompute = time.perf_counter() - start
+        print(f"{'':>14} | toutes paires : {precompute * 1000:8.1f} ms ({reachable} paires accessibles)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du pathfinding du WorldGraph.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2000, 10000])
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    random.seed(args.seed)
+    rng = random.Random(args.seed)
+
+    world = load_lore_world()
+    if len(world.locations) > 1:
+        bench("server/lore", world, args.queries)
+
+    for size in args.sizes:
+        bench("synthétique", synthetic_world(size, rng), args.queries, all_pairs=size <= 2000)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Exploration Monte Carlo d'un projet : des milliers de parties réparties sur
+un pool de processus (PlaythroughSimulator sans interface).
+
+Usage : python tools/explore_story.py test.json [--runs 100000] [--workers 8] [--seed 42]
+                                      [--policy random|weighted] [--max-steps 500]
+                                      [--chunk-size 500] [--track-variables] [--json out.json]
+
+Le projet est envoyé une seule fois à chaque processus (initialiseur du pool) ;
+seuls les rapports agrégés (SimulationReport) remontent au processus principal.
+Chaque lot de parties a sa propre graine, dérivée de --seed et du numéro de
+lot : le résultat est reproductible quel que soit le nombre de processus.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.core.models import ProjectModel
+from src.core.serializer import ProjectSerializer
+from src.engine.simulator import PlaythroughSimulator, RandomPolicy, SimulationReport, WeightedPolicy
+
+POLICIES = {"random": RandomPolicy, "weighted": WeightedPolicy}
+
+# Simulateur du processus courant (créé une fois par l'initialiseur du pool)
+_simulator = None
+
+
+def _init_worker(project_data, policy_name, max_steps, track_variables):
+    global _simulator
+    project = ProjectModel.from_dict(project_data)
+    _simulator = PlaythroughSimulator(project, POLICIES[policy_name](), max_steps=max_steps,
+                                      track_variables=track_variables or None)
+
+
+def _run_chunk(seed, runs):
+    _simulator.rng = random.Random(seed)
+    return _simulator.run(runs)
+
+
+def chunk_plan(runs, chunk_size, base_seed):
+    """Découpe `runs` en lots (graine, nombre de parties) indépendants du nombre de processus."""
+    chunk_size = max(1, chunk_size)
+    plan = []
+    for index, start in enumerate(range(0, runs, chunk_size)):
+        seed = random.Random(f"{base_seed}:{index}").getrandbits(64)
+        plan.append((seed, min(chunk_size, runs - start)))
+    return plan
+
+
+def explore(project_data, runs, workers=None, seed=0, policy="random", max_steps=500,
+            chunk_size=500, track_variables=False):
+    """
+    Joue `runs` parties sur `workers` processus (un par cœur par défaut) et
+    retourne le rapport fusionné. Avec un seul processus utile (un cœur, ou
+    un seul lot), les parties sont jouées sur place, sans pool.
+    """
+    plan = chunk_plan(runs, chunk_size, seed)
+    report = SimulationReport()
+    init_args = (project_data, policy, max_steps, track_variables)
+    workers = min(workers or os.cpu_count() or 1, len(plan))
+    if workers <= 1:
+        _init_worker(*init_args)
+        for chunk_seed, count in plan:
+            report.merge(_run_chunk(chunk_seed, count))
+        return report
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=init_args) as pool:
+        # Fusion dans l'ordre du plan : le rapport ne dépend pas de l'ordonnancement
+        for partial in pool.map(_run_chunk, *zip(*plan)):
+            report.merge(partial)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exploration Monte Carlo d'un projet narratif.")
+    parser.add_argument("project", help="Fichier projet (.json)")
+    parser.add_argument("--runs", type=int, default=10000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="random")
+    parser.add_argument("--max-steps", type=int, default=500)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--track-variables", action="store_true",
+                        help="Relève les bornes min/max des variables numériques à chaque nœud")
+    parser.add_argument("--json", help="Écrit le rapport complet dans ce fichier")
+    args = parser.parse_args()
+
+    project = ProjectSerializer.load_project(args.project)
+    if project is None:
+        sys.exit(1)
+
+    start = time.perf_counter()
+    report = explore(project.to_dict(), args.runs, args.workers, args.seed, args.policy,
+                     args.max_steps, args.chunk_size, args.track_variables)
+    elapsed = time.perf_counter() - start
+
+    print(report.format_summary(project))
+    print("Probabilité d'atteindre chaque nœud :")
+    for node_id, probability in sorted(report.reach_probability().items(), key=lambda item: item[1]):
+        node = project.nodes.get(node_id)
+        print(f"  {probability:7.2%}  {node.title if node else node_id}")
+    unreached = [node for node_id, node in project.nodes.items() if node_id not in report.node_reach]
+    if unreached:
+        print(f"Nœuds jamais atteints ({len(unreached)}) :")
+        for node in unreached:
+            print(f"  {node.title} ({node.id})")
+    print("Quêtes terminées par partie :")
+    for count, runs in sorted(report.completed_quest_counts.items()):
+        print(f"  {count} : {runs / report.runs:.1%}")
+    print(f"{report.runs} parties en {elapsed:.2f}s ({report.runs / elapsed:.0f} parties/s, {args.workers} processus)")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report.to_dict(), f, indent=4, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()